@@ -3,6 +3,7 @@ Flask application for Union Budget RAG.
 Phase 2: Full RAG API with authentication.
 """
 import logging
+import os
 import sys
 from flask import Flask
 from flask_cors import CORS
@@ -23,6 +24,7 @@ logger = logging.getLogger(__name__)
 def create_app() -> Flask:
     """
     Create and configure the Flask application.
+    Starts no threads or clients; see start_background_services().
 
     Returns:
         Configured Flask app
@@ -58,22 +60,43 @@ def create_app() -> Flask:
     app.register_blueprint(chats_bp, url_prefix='/api/chats')
     
     logger.info("Flask application created with all routes registered")
+
     return app
 
 
+def start_background_services():
+    """
+    Start client warm-up and the in-process ingestion worker.
+    Called by the serving process (gunicorn's post_worker_init, run.py),
+    never on import, so CLI tools and tests that import the app start no
+    threads and forked workers do not inherit clients.
+    """
+    if Config.WARMUP_ENABLED:
+        from app.warmup import start_warmup
+        start_warmup()
+
+    if Config.INGEST_WORKER_IN_PROCESS:
+        from app.ingest_worker import start_worker_thread
+        start_worker_thread()
+
+
 # Create app instance
 app = create_app()
 
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint."""
+    """Health check endpoint (503 until the worker has warmed up)."""
     from flask import jsonify
+    from app.warmup import is_ready, get_warmup_status
+    ready = is_ready()
     return jsonify({
-        "status": "healthy",
+        "status": "healthy" if ready else "starting",
+        "ready": ready,
         "service": "Union Budget RAG",
-        "version": "2.0"
-    }), 200
+        "version": "2.0",
+        "warmup": get_warmup_status()
+    }), 200 if ready else 503
 
 
 if __name__ == '__main__':
@@ -85,6 +108,10 @@ if __name__ == '__main__':
         logger.error(f"Configuration error: {e}")
         sys.exit(1)
 
+    # With the debug reloader, only the child process serves requests
+    if not Config.FLASK_DEBUG or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background_services()
+
     logger.info(f"Starting Union Budget RAG API on port {Config.FLASK_PORT}")
     app.run(
         host='0.0.0.0',
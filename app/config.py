@@ -31,14 +31,53 @@ class Config:
     PDF_SOURCE_DIR = os.getenv("PDF_SOURCE_DIR", "./docs")
 
     # Embedding Model Configuration
+    # Backend: "cohere" (API) or "hashing" (local, deterministic, no network)
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "cohere")
     EMBEDDING_MODEL_NAME = os.getenv(
         "EMBEDDING_MODEL_NAME",
         "embed-english-light-v3.0"  # Cohere embedding model (free tier available)
     )
     EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "384"))  # Dimension for embed-english-v3.0
     
+    # Persistent embedding cache (content-addressed, LRU-bounded)
+    EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "1") == "1"
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", ".embedding_cache.sqlite3")
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "200000"))
+
+    # Query embedding cache (TTL + LRU): "local" per worker, "shared" across workers, or "none"
+    QUERY_EMBEDDING_CACHE_BACKEND = os.getenv("QUERY_EMBEDDING_CACHE_BACKEND", "local")
+    QUERY_EMBEDDING_CACHE_PATH = os.getenv("QUERY_EMBEDDING_CACHE_PATH", ".query_embedding_cache.sqlite3")
+    QUERY_EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("QUERY_EMBEDDING_CACHE_MAX_ENTRIES", "2048"))
+    QUERY_EMBEDDING_CACHE_TTL_SECONDS = int(os.getenv("QUERY_EMBEDDING_CACHE_TTL_SECONDS", "3600"))
+
     # Cohere API Configuration (required for embeddings - free tier available)
     COHERE_API_KEY = os.getenv("COHERE_API_KEY")
+    COHERE_API_URL = os.getenv("COHERE_API_URL", "https://api.cohere.ai/v1/embed")  # Override for local stand-ins
+    COHERE_MAX_CONCURRENCY = int(os.getenv("COHERE_MAX_CONCURRENCY", "4"))  # Batches in flight
+    COHERE_REQUESTS_PER_MINUTE = int(os.getenv("COHERE_REQUESTS_PER_MINUTE", "100"))  # 0 = unlimited
+    COHERE_TEXTS_PER_MINUTE = int(os.getenv("COHERE_TEXTS_PER_MINUTE", "0"))  # 0 = unlimited
+    COHERE_MAX_RETRIES = int(os.getenv("COHERE_MAX_RETRIES", "5"))  # Retries on 429/5xx
+    COHERE_REQUEST_TIMEOUT = float(os.getenv("COHERE_REQUEST_TIMEOUT", "30"))  # Per attempt (seconds)
+    COHERE_CALL_DEADLINE = float(os.getenv("COHERE_CALL_DEADLINE", "90"))  # Per call incl. retries (seconds)
+    COHERE_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("COHERE_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    COHERE_CIRCUIT_RESET_SECONDS = float(os.getenv("COHERE_CIRCUIT_RESET_SECONDS", "30"))
+
+    # Adaptive embedding batching (packs by token/byte budget, tunes size from latency and 429s)
+    EMBEDDING_BATCH_ADAPTIVE = os.getenv("EMBEDDING_BATCH_ADAPTIVE", "1") == "1"
+    EMBEDDING_BATCH_MIN_TEXTS = int(os.getenv("EMBEDDING_BATCH_MIN_TEXTS", "8"))
+    EMBEDDING_BATCH_INITIAL_TEXTS = int(os.getenv("EMBEDDING_BATCH_INITIAL_TEXTS", "48"))
+    EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "24000"))
+    EMBEDDING_BATCH_MAX_BYTES = int(os.getenv("EMBEDDING_BATCH_MAX_BYTES", "262144"))
+    EMBEDDING_BATCH_TARGET_LATENCY = float(os.getenv("EMBEDDING_BATCH_TARGET_LATENCY", "3.0"))  # Seconds
+
+    # Compact embedding type requested from Cohere v3: "none" (float), "int8" or "binary".
+    # Only the embedding caches keep the compact codes; vectors are expanded to float32
+    # before they reach the index (Pinecone or the local vector store).
+    EMBEDDING_QUANTIZATION = os.getenv("EMBEDDING_QUANTIZATION", "none")
+
+    # Coalesce concurrent query embeddings into one request (needs threaded workers; 0 = off)
+    EMBEDDING_COALESCE_WINDOW_MS = float(os.getenv("EMBEDDING_COALESCE_WINDOW_MS", "0"))
+    EMBEDDING_COALESCE_MAX_BATCH = int(os.getenv("EMBEDDING_COALESCE_MAX_BATCH", "32"))
 
     # Chunking Configuration
     CHUNK_SIZE = int(os.getenv("CHUNK_SIZE", "400"))
@@ -48,27 +87,102 @@ class Config:
     RAG_TOP_K = int(os.getenv("RAG_TOP_K", "5"))
     CHAT_HISTORY_LIMIT = int(os.getenv("CHAT_HISTORY_LIMIT", "8"))
 
+    # Scoped retrieval: route queries to the namespaces they name ("bh1.pdf", "budget speech")
+    ROUTER_ENABLED = os.getenv("ROUTER_ENABLED", "1") == "1"
+    RETRIEVAL_MAX_PARALLEL_NAMESPACES = int(os.getenv("RETRIEVAL_MAX_PARALLEL_NAMESPACES", "8"))
+
     # Flask Configuration
     FLASK_ENV = os.getenv("FLASK_ENV", "development")
     FLASK_DEBUG = os.getenv("FLASK_DEBUG", "1") == "1"
     FLASK_PORT = int(os.getenv("FLASK_PORT", "4000"))
     MAX_UPLOAD_SIZE_MB = int(os.getenv("MAX_UPLOAD_SIZE_MB", "50"))
 
-    # Pinecone batch size for upserts
+    # Build clients, prompts and langdetect profiles before serving traffic
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+    WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "60"))  # Seconds a gunicorn worker waits before accepting traffic
+
+    # Chunks embedded per pipeline batch (upsert requests are re-packed by payload size)
     PINECONE_BATCH_SIZE = 100
 
+    # Vector store: "pinecone" or "local" (in-process NumPy engine persisted to disk; always
+    # float32 vectors, whatever EMBEDDING_QUANTIZATION is)
+    VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "pinecone")
+    LOCAL_VECTOR_STORE_PATH = os.getenv("LOCAL_VECTOR_STORE_PATH", ".local_vector_store")
+    LOCAL_VECTOR_INDEX = os.getenv("LOCAL_VECTOR_INDEX", "flat")  # "flat" (exact) or "ivf" (approximate)
+    LOCAL_VECTOR_IVF_LISTS = int(os.getenv("LOCAL_VECTOR_IVF_LISTS", "0"))  # 0 = sqrt(vector count)
+    LOCAL_VECTOR_IVF_PROBE = int(os.getenv("LOCAL_VECTOR_IVF_PROBE", "8"))
+    LOCAL_VECTOR_IVF_MIN_VECTORS = int(os.getenv("LOCAL_VECTOR_IVF_MIN_VECTORS", "5000"))
+
+    # Chunk text store: "none" (text in vector metadata), "sqlite" (local file) or "postgres" (DATABASE_URL)
+    DOCSTORE_BACKEND = os.getenv("DOCSTORE_BACKEND", "none")
+    DOCSTORE_PATH = os.getenv("DOCSTORE_PATH", ".docstore.sqlite3")
+
+    # Ingestion ledger (per-file hash, status, chunks, vector IDs, timings): "sqlite" (local file) or "postgres" (DATABASE_URL)
+    INGEST_LEDGER_BACKEND = os.getenv("INGEST_LEDGER_BACKEND", "sqlite")
+    INGEST_LEDGER_PATH = os.getenv("INGEST_LEDGER_PATH", ".ingest_ledger.sqlite3")
+    # Seconds after which a file left "processing" by a crashed ingest may be claimed again
+    INGEST_LEDGER_LEASE_SECONDS = float(os.getenv("INGEST_LEDGER_LEASE_SECONDS", "3600"))
+
+    # Background ingestion jobs and their uploaded files. Unset keeps them in a local SQLite
+    # file, reachable only from this machine; a separate worker process needs a database
+    # URL shared with the web processes (e.g. the DATABASE_URL Postgres)
+    INGEST_JOBS_URL = os.getenv("INGEST_JOBS_URL", "")
+    INGEST_JOBS_PATH = os.getenv("INGEST_JOBS_PATH", ".ingest_jobs.sqlite3")
+    # Local directory the worker writes each job's uploaded files to while ingesting them
+    INGEST_UPLOAD_DIR = os.getenv("INGEST_UPLOAD_DIR", ".ingest_uploads")
+    INGEST_JOB_POLL_SECONDS = float(os.getenv("INGEST_JOB_POLL_SECONDS", "2"))
+    # Workers renew their lease on a job; a job silent for the lease is picked up by another worker
+    INGEST_JOB_HEARTBEAT_SECONDS = float(os.getenv("INGEST_JOB_HEARTBEAT_SECONDS", "15"))
+    INGEST_JOB_LEASE_SECONDS = float(os.getenv("INGEST_JOB_LEASE_SECONDS", "120"))
+    INGEST_JOB_MAX_ATTEMPTS = int(os.getenv("INGEST_JOB_MAX_ATTEMPTS", "3"))
+    # Run a job worker thread in each web process; set to 0 when ingest_worker.py runs separately
+    INGEST_WORKER_IN_PROCESS = os.getenv("INGEST_WORKER_IN_PROCESS", "1") == "1"
+
+    # Index stats are cached, refreshed in the background after the TTL or once an ingestion job finishes
+    INDEX_STATS_TTL_SECONDS = float(os.getenv("INDEX_STATS_TTL_SECONDS", "30"))
+    INDEX_STATS_MAX_STALE_SECONDS = float(os.getenv("INDEX_STATS_MAX_STALE_SECONDS", "600"))
+
+    # Ingestion namespaces: "none" (default namespace) or "document" (one per PDF)
+    PINECONE_NAMESPACE_MODE = os.getenv("PINECONE_NAMESPACE_MODE", "none")
+
+    # Direct upserts: "auto" uses gRPC when pinecone[grpc] is installed
+    PINECONE_USE_GRPC = os.getenv("PINECONE_USE_GRPC", "auto")
+    PINECONE_UPSERT_CONCURRENCY = int(os.getenv("PINECONE_UPSERT_CONCURRENCY", "4"))  # Requests in flight
+    PINECONE_UPSERT_MAX_BYTES = int(os.getenv("PINECONE_UPSERT_MAX_BYTES", "1800000"))  # Below the 2 MB limit
+    PINECONE_UPSERT_MAX_RECORDS = int(os.getenv("PINECONE_UPSERT_MAX_RECORDS", "1000"))
+
+    # Failed upsert batches are kept with their vectors and retried in the background
+    UPSERT_RETRY_ENABLED = os.getenv("UPSERT_RETRY_ENABLED", "1") == "1"
+    UPSERT_RETRY_QUEUE_PATH = os.getenv("UPSERT_RETRY_QUEUE_PATH", ".upsert_retry_queue.sqlite3")
+    UPSERT_RETRY_INTERVAL_SECONDS = float(os.getenv("UPSERT_RETRY_INTERVAL_SECONDS", "60"))
+    UPSERT_RETRY_BACKOFF_SECONDS = float(os.getenv("UPSERT_RETRY_BACKOFF_SECONDS", "30"))
+    UPSERT_RETRY_MAX_ATTEMPTS = int(os.getenv("UPSERT_RETRY_MAX_ATTEMPTS", "10"))
+
+    # Embed/upsert pipeline: batches buffered between stages and concurrent upsert threads
+    INGEST_PIPELINE_QUEUE_SIZE = int(os.getenv("INGEST_PIPELINE_QUEUE_SIZE", "4"))
+    INGEST_UPSERT_WORKERS = int(os.getenv("INGEST_UPSERT_WORKERS", "2"))
+
+    # Files ingested in parallel by run_ingestion (parse in processes, embed/upsert in threads)
+    INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "1"))
+
+    # Per-document chunk hashes; re-ingests only upsert changed chunks
+    INGEST_MANIFEST_DIR = os.getenv("INGEST_MANIFEST_DIR", ".ingest_manifests")
+
     @classmethod
     def validate(cls):
         """Validate that all required configuration is present."""
         errors = []
 
-        if not cls.PINECONE_API_KEY:
+        if cls.VECTOR_STORE_BACKEND == "pinecone" and not cls.PINECONE_API_KEY:
             errors.append("PINECONE_API_KEY is required")
 
+        if cls.VECTOR_STORE_BACKEND not in ("pinecone", "local"):
+            errors.append("VECTOR_STORE_BACKEND must be 'pinecone' or 'local'")
+
         if not cls.PINECONE_INDEX_NAME:
             errors.append("PINECONE_INDEX_NAME is required")
         
-        if not cls.COHERE_API_KEY:
+        if cls.EMBEDDING_BACKEND == "cohere" and not cls.COHERE_API_KEY:
             errors.append("COHERE_API_KEY is required for embeddings (get free key at https://cohere.com/)")
 
         if errors:
@@ -33,8 +33,68 @@ CREATE TABLE IF NOT EXISTS chat_messages (
     created_at TIMESTAMP DEFAULT NOW()
 );
 
+-- Migration 005 — Chunk texts (docstore for DOCSTORE_BACKEND=postgres)
+CREATE TABLE IF NOT EXISTS chunk_texts (
+    namespace TEXT NOT NULL DEFAULT '',
+    id TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (namespace, id)
+);
+
+-- Migration 006 — Ingestion ledger (INGEST_LEDGER_BACKEND=postgres)
+CREATE TABLE IF NOT EXISTS ingest_ledger (
+    filename TEXT PRIMARY KEY,
+    file_hash TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    namespace TEXT,
+    status TEXT NOT NULL,
+    claim_id TEXT,
+    chunks INTEGER NOT NULL DEFAULT 0,
+    vector_ids TEXT NOT NULL DEFAULT '[]',
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    duration_seconds DOUBLE PRECISION,
+    updated_at TIMESTAMP NOT NULL
+);
+
+-- Migration 007 — Background ingestion jobs (INGEST_JOBS_URL pointing at this database)
+CREATE TABLE IF NOT EXISTS ingest_jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL DEFAULT '{}',
+    progress TEXT NOT NULL DEFAULT '{}',
+    result TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    created_at TIMESTAMP NOT NULL,
+    started_at TIMESTAMP,
+    heartbeat_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+-- Migration 008 — Uploaded PDFs waiting for their ingestion job
+CREATE TABLE IF NOT EXISTS ingest_uploads (
+    id TEXT PRIMARY KEY,
+    job_id TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    data BYTEA NOT NULL,
+    created_at TIMESTAMP NOT NULL
+);
+
 -- Indexes for better query performance
 CREATE INDEX IF NOT EXISTS idx_chat_sessions_user_id ON chat_sessions(user_id);
 CREATE INDEX IF NOT EXISTS idx_chat_messages_session_id ON chat_messages(session_id);
 CREATE INDEX IF NOT EXISTS idx_chat_messages_created_at ON chat_messages(created_at);
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
+CREATE INDEX IF NOT EXISTS idx_chunk_texts_doc_id ON chunk_texts(namespace, doc_id);
+CREATE INDEX IF NOT EXISTS idx_ingest_ledger_status ON ingest_ledger(status);
+CREATE INDEX IF NOT EXISTS idx_ingest_ledger_doc_id ON ingest_ledger(doc_id);
+CREATE INDEX IF NOT EXISTS idx_ingest_jobs_queue ON ingest_jobs(status, priority, created_at);
+CREATE INDEX IF NOT EXISTS idx_ingest_uploads_job_id ON ingest_uploads(job_id);
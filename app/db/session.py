@@ -3,7 +3,9 @@ Database session management using SQLAlchemy.
 Connects to Neon PostgreSQL.
 """
 import logging
-from sqlalchemy import create_engine
+from pathlib import Path
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from app.config import Config
 
@@ -37,6 +39,28 @@ def get_engine():
     return _engine
 
 
+def create_sqlite_engine(path: str) -> Engine:
+    """
+    Create an engine for a local SQLite file shared by threads and processes.
+
+    Args:
+        path: Database file path (parent directories are created)
+
+    Returns:
+        SQLAlchemy engine
+    """
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, _):
+        # WAL lets gunicorn workers read while ingestion writes
+        dbapi_connection.execute("PRAGMA journal_mode=WAL")
+        dbapi_connection.execute("PRAGMA synchronous=NORMAL")
+
+    return engine
+
+
 def get_session_factory():
     """Get the session factory."""
     global _SessionLocal
@@ -72,6 +96,10 @@ def init_db():
     from app.models.user import User
     from app.models.chat_session import ChatSession
     from app.models.chat_message import ChatMessage
+    from app.models.chunk_text import ChunkText
+    from app.models.ingest_record import IngestRecord
+    from app.models.ingest_job import IngestJob
+    from app.models.ingest_upload import IngestUpload
 
     engine = get_engine()
     Base.metadata.create_all(bind=engine)
@@ -1,52 +1,38 @@
 """
 Main ingestion runner for processing PDFs from local directory.
-Orchestrates the full pipeline: scan -> load -> chunk -> embed -> store
+Orchestrates the full pipeline: scan -> load -> chunk -> diff -> embed -> store
+Pages, chunks and embedding batches stream through the pipeline, so memory
+stays bounded regardless of PDF size.
 """
 import logging
-import json
-from typing import Dict, List, Optional
+import multiprocessing
+import os
+from itertools import chain
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional
 from pathlib import Path
 
 from app.config import Config
 from app.utils.file_scanner import scan_pdf_directory, ensure_directory_exists
-from app.utils.id_generator import generate_doc_id, generate_file_hash
-from app.services.pdf_loader import load_pdf
-from app.services.chunker import chunk_documents
-from app.services.pinecone_client import add_documents, delete_by_doc_id
+from app.utils.id_generator import (
+    generate_file_hash, generate_stable_doc_id, generate_vector_id
+)
+from app.services.pdf_loader import chunk_pdf, iter_pdf_pages
+from app.services.chunker import iter_chunks
+from app.services.chunk_manifest import (
+    chunk_hash, diff_chunks, embedding_signature, load_manifest, save_manifest
+)
+from app.services.pinecone_client import (
+    add_documents, adjust_index_stats, delete_by_doc_id, delete_ids, get_index,
+    get_upsert_retry_queue, list_ids_by_prefix
+)
+from app.services.docstore import get_docstore
+from app.services.ingest_ledger import get_ingest_ledger
+from app.rag.router import namespace_for_document
 from app.services.embeddings import preload_model
 
 logger = logging.getLogger(__name__)
 
-# Track processed files for idempotency (by filename + hash)
-# In production, this should be persisted to a database
-_processed_files: Dict[str, str] = {}
-
-
-def load_processed_files_cache(cache_path: str = ".processed_files.json"):
-    """Load the processed files cache from disk."""
-    global _processed_files
-    cache_file = Path(cache_path)
-
-    if cache_file.exists():
-        try:
-            with open(cache_file, "r") as f:
-                _processed_files = json.load(f)
-            logger.info(f"Loaded {len(_processed_files)} processed files from cache")
-        except Exception as e:
-            logger.warning(f"Could not load cache: {e}")
-            _processed_files = {}
-
-
-def save_processed_files_cache(cache_path: str = ".processed_files.json"):
-    """Save the processed files cache to disk."""
-    try:
-        with open(cache_path, "w") as f:
-            json.dump(_processed_files, f, indent=2)
-        logger.debug("Saved processed files cache")
-    except Exception as e:
-        logger.warning(f"Could not save cache: {e}")
-
-
 def is_file_processed(filename: str, file_hash: str) -> bool:
     """
     Check if a file has already been processed.
@@ -59,25 +45,59 @@ def is_file_processed(filename: str, file_hash: str) -> bool:
     Returns:
         True if file was already processed with same hash
     """
-    return _processed_files.get(filename) == file_hash
+    return get_ingest_ledger().is_processed(filename, file_hash)
 
 
-def mark_file_processed(filename: str, file_hash: str, doc_id: str):
-    """Mark a file as processed in the cache."""
-    _processed_files[filename] = file_hash
-    save_processed_files_cache()
+def _previous_chunks(
+    doc_id: str,
+    manifest: Optional[Dict],
+    force: bool,
+    namespace: Optional[str] = None
+) -> Optional[Dict[str, Optional[str]]]:
+    """
+    Get the chunks currently stored for a document.
+
+    Args:
+        doc_id: Stable document ID
+        manifest: The document's manifest, if any
+        force: If True, forget the stored hashes so every chunk is re-embedded
+        namespace: Pinecone namespace of the document
+
+    Returns:
+        Vector ID -> chunk hash (None where unknown), or None if the stored
+        vectors cannot be determined
+    """
+    if manifest is not None:
+        if not force and manifest.get("embedding") == embedding_signature():
+            return manifest["chunks"]
+        if not force:
+            logger.info(f"Embedding setup changed since {manifest.get('filename')} was ingested, re-embedding all chunks")
+        return {vector_id: None for vector_id in manifest["chunks"]}
+
+    # No usable manifest: look up what is in the index so vanished chunks are still removed
+    try:
+        return {vector_id: None for vector_id in list_ids_by_prefix(f"{doc_id}_", namespace=namespace)}
+    except Exception as e:
+        logger.warning(f"Could not list existing vectors for doc_id {doc_id}: {str(e)}")
+        return None
 
 
 def ingest_single_pdf(
     pdf_path: str,
-    force: bool = False
+    force: bool = False,
+    namespace: Optional[str] = None,
+    parser: Optional[Executor] = None
 ) -> Optional[Dict]:
     """
     Ingest a single PDF file into Pinecone.
+    Chunks are diffed against the document's manifest: only new or changed
+    chunks are embedded and upserted, and vanished chunks are deleted.
 
     Args:
         pdf_path: Path to the PDF file
-        force: If True, re-ingest even if already processed
+        force: If True, re-ingest even if already processed and re-embed every chunk
+        namespace: Collection namespace (defaults to PINECONE_NAMESPACE_MODE)
+        parser: Optional process pool to load and chunk the PDF in
 
     Returns:
         Dict with ingestion results or None if skipped
@@ -91,26 +111,34 @@ def ingest_single_pdf(
     file_hash = generate_file_hash(pdf_path)
 
     # Check if already processed (idempotency)
-    if not force and is_file_processed(filename, file_hash):
+    ledger = get_ingest_ledger()
+    if not force and ledger.is_processed(filename, file_hash):
         logger.info(f"Skipping {filename} - already processed with same content")
         return None
 
-    # Generate document ID
-    doc_id = generate_doc_id(filename, file_hash)
+    # Stable per-filename ID, so a new version of the file updates its vectors in place
+    doc_id = generate_stable_doc_id(filename)
+    namespace = namespace_for_document(filename, namespace)
+
+    # Claim the file, so concurrent ingests (other workers or nodes) skip it
+    previous_record = ledger.get(filename)
+    claim_id = ledger.begin(filename, file_hash, doc_id, namespace, force=force)
+    if claim_id is None:
+        logger.info(f"Skipping {filename} - already processed or being ingested elsewhere")
+        return None
 
     try:
-        # If force mode, delete existing vectors first
-        if force:
-            try:
-                delete_by_doc_id(doc_id)
-                logger.info(f"Deleted existing vectors for {filename}")
-            except Exception:
-                pass  # Ignore if no vectors exist
-
-        # Step 1: Load PDF
-        documents = load_pdf(pdf_path)
-        if not documents:
+        # Steps 1-2: Load and chunk the PDF. Pages and chunks are streamed, so only
+        # a bounded window of them is held in memory; a parse worker returns just the chunks
+        if parser is not None:
+            chunks = iter(parser.submit(chunk_pdf, pdf_path).result())
+        else:
+            chunks = iter_chunks(iter_pdf_pages(pdf_path))
+
+        first_chunk = next(chunks, None)
+        if first_chunk is None:
             logger.warning(f"No content extracted from {filename}")
+            ledger.finish(filename, claim_id, "warning", chunks=0, error="No content extracted")
             return {
                 "status": "warning",
                 "filename": filename,
@@ -118,29 +146,121 @@ def ingest_single_pdf(
                 "chunks": 0
             }
 
-        # Step 2: Chunk documents
-        chunked_docs = chunk_documents(documents)
-
-        # Step 3: Add to Pinecone (embeddings generated automatically by LangChain)
-        vector_ids = add_documents(chunked_docs, doc_id, filename)
-
-        # Mark as processed
-        mark_file_processed(filename, file_hash, doc_id)
+        # Step 3: Diff against the chunks already stored for this document
+        vectors_deleted = 0
+        manifest = load_manifest(doc_id)
+        moved_from = None
+        if manifest is not None and manifest.get("namespace") != namespace:
+            # Vectors are rewritten in the new namespace and removed from the old one
+            moved_from, manifest = manifest, None
+        previous = _previous_chunks(doc_id, manifest, force, namespace)
+        if previous is None:
+            previous = {}
+            if force:
+                # Stored vectors are unknown; clear the document (a failure aborts the
+                # re-ingest rather than leaving stale vectors behind)
+                vectors_deleted = delete_by_doc_id(doc_id, namespace=namespace)
+
+        # Only IDs and hashes of the chunks are kept; unchanged chunks are dropped as they stream past
+        current: Dict[str, str] = {}
+        pages = set()
+
+        def changed_chunks():
+            for doc in chain([first_chunk], chunks):
+                vector_id = generate_vector_id(doc_id, doc.metadata.get("page", 0) + 1, doc.metadata["chunk_index"])
+                current[vector_id] = chunk_hash(doc.page_content)
+                pages.add(doc.metadata.get("page", 0))
+                if previous.get(vector_id) != current[vector_id]:
+                    yield doc
+
+        # Step 4: Embed and upsert the changed chunks to Pinecone
+        pipeline_stats = {}
+        queued_ids: List[str] = []
+        vector_ids = add_documents(
+            changed_chunks(), doc_id, filename, stats=pipeline_stats, namespace=namespace, queued_ids=queued_ids
+        )
+        # Changed chunks overwrite their vectors; only new IDs add to the index count
+        adjust_index_stats(namespace, sum(1 for vector_id in vector_ids if vector_id not in previous))
+
+        changed, unchanged, vanished = diff_chunks(previous, current)
+        logger.info(
+            f"{filename}: {len(changed)} new or changed, {len(unchanged)} unchanged, "
+            f"{len(vanished)} vanished chunks"
+        )
+
+        # Chunks that failed to embed or upsert stay out of the manifest and are retried on
+        # the next run. Upserts queued for background retry are recorded, as their vectors
+        # will be written and a later re-ingest has to be able to delete them
+        stored = {vector_id: current[vector_id] for vector_id in unchanged}
+        stored.update({vector_id: current[vector_id] for vector_id in chain(vector_ids, queued_ids)})
+
+        # Step 5: Delete vanished chunks. They stay in the manifest until the delete
+        # succeeds, so a failed delete is retried on the next run
+        if vanished:
+            save_manifest(doc_id, filename, file_hash, {**{v: previous[v] for v in vanished}, **stored}, namespace)
+            deleted = delete_ids(vanished, namespace=namespace)
+            vectors_deleted = deleted if vectors_deleted < 0 else vectors_deleted + deleted
+        save_manifest(doc_id, filename, file_hash, stored, namespace)
+
+        if moved_from is not None:
+            # By ID rather than delete_by_doc_id, which would also drop retries queued for the new namespace
+            old_namespace = moved_from.get("namespace")
+            delete_ids(list_ids_by_prefix(f"{doc_id}_", namespace=old_namespace), namespace=old_namespace)
+            logger.info(f"Moved {filename} from namespace {old_namespace or 'default'} to {namespace or 'default'}")
+
+        # Vectors of this file ingested under the old content-hash doc_id
+        elif manifest is None and previous_record and previous_record["doc_id"] != doc_id:
+            legacy_doc_id = previous_record["doc_id"]
+            deleted = delete_by_doc_id(legacy_doc_id)
+            if deleted:
+                logger.info(f"Removed {deleted if deleted >= 0 else 'legacy'} vectors of {filename} stored under doc_id {legacy_doc_id}")
+
+        # Partial ingests are not marked processed, so the next run retries them
+        embed_failures = pipeline_stats.get("embed", {}).get("failed_batches", 0)
+        upsert_failures = pipeline_stats.get("upsert", {}).get("failed_batches", 0)
+        failures = []
+        if embed_failures:
+            failures.append(f"{embed_failures} batch(es) failed to embed")
+        if upsert_failures:
+            failures.append(f"{upsert_failures} batch(es) failed to upsert ({len(queued_ids)} vectors queued for retry)")
+        status = "partial" if failures else "success"
+        ledger.finish(
+            filename, claim_id, status,
+            doc_id=doc_id,
+            chunks=len(current),
+            vector_ids=list(stored),
+            error=", ".join(failures) or None
+        )
 
         result = {
-            "status": "success",
+            "status": status,
             "filename": filename,
             "doc_id": doc_id,
-            "pages": len(documents),
-            "chunks": len(chunked_docs),
-            "vectors_added": len(vector_ids)
+            "namespace": namespace,
+            "pages": len(pages),
+            "chunks": len(current),
+            "chunks_unchanged": len(unchanged),
+            "vectors_added": len(vector_ids),
+            "vectors_deleted": vectors_deleted,
+            "vectors_queued": len(queued_ids),
+            "pipeline": pipeline_stats
         }
 
-        logger.info(f"Successfully ingested {filename}: {len(chunked_docs)} chunks")
+        if failures:
+            logger.warning(f"Partially ingested {filename}: {', '.join(failures)}, will retry on next run")
+        else:
+            logger.info(
+                f"Successfully ingested {filename}: {len(vector_ids)} chunks upserted, "
+                f"{len(unchanged)} unchanged, {len(vanished)} removed"
+            )
         return result
 
     except Exception as e:
         logger.error(f"Failed to ingest {filename}: {str(e)}", exc_info=True)
+        try:
+            ledger.finish(filename, claim_id, "error", error=str(e))
+        except Exception as ledger_error:
+            logger.error(f"Could not record failure of {filename} in the ingestion ledger: {str(ledger_error)}")
         return {
             "status": "error",
             "filename": filename,
@@ -148,9 +268,72 @@ def ingest_single_pdf(
         }
 
 
+def _ingest_parallel(
+    pdf_paths: List[str],
+    workers: int,
+    force: bool = False,
+    namespace: Optional[str] = None
+) -> Iterator[Optional[Dict]]:
+    """
+    Ingest several PDFs concurrently.
+    Parsing and chunking run in a process pool; embedding and upserting run
+    in threads that share the embedding client and its rate limiter.
+
+    Args:
+        pdf_paths: Paths of the PDF files
+        workers: Number of files processed at once
+        force: If True, re-ingest even if already processed
+        namespace: Collection namespace for all files
+
+    Yields:
+        Results in the order of pdf_paths (None for skipped files). Files not
+        yet started are cancelled if the caller stops early.
+    """
+    # Open the shared clients before the threads start, so they are created once
+    get_index()
+    get_docstore()
+    get_upsert_retry_queue()
+    get_ingest_ledger()
+
+    # Parsing only gains from processes with spare cores; spawned rather than
+    # forked, as the parent already runs embedding and refresh threads
+    parse_workers = min(workers, os.cpu_count() or 1)
+    parser = None
+    if parse_workers > 1:
+        parser = ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ingest") as pool:
+            futures = [
+                pool.submit(ingest_single_pdf, path, force=force, namespace=namespace, parser=parser)
+                for path in pdf_paths
+            ]
+
+            try:
+                for position, (path, future) in enumerate(zip(pdf_paths, futures), start=1):
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # ingest_single_pdf reports its own errors; this covers anything before its try block
+                        logger.error(f"Failed to ingest {Path(path).name}: {str(e)}", exc_info=True)
+                        result = {"status": "error", "filename": Path(path).name, "error": str(e)}
+                    logger.info(f"[{position}/{len(pdf_paths)}] {Path(path).name}: {result['status'] if result else 'skipped'}")
+                    yield result
+            finally:
+                for future in futures:
+                    future.cancel()
+    finally:
+        if parser is not None:
+            parser.shutdown()
+
+
 def run_ingestion(
     source_dir: str = None,
-    force: bool = False
+    force: bool = False,
+    namespace: Optional[str] = None,
+    workers: Optional[int] = None,
+    pdf_paths: Optional[List[str]] = None,
+    on_progress: Optional[Callable[[str, Optional[Dict]], None]] = None
 ) -> Dict:
     """
     Run the full ingestion pipeline on all PDFs in the source directory.
@@ -158,31 +341,37 @@ def run_ingestion(
     Args:
         source_dir: Directory containing PDF files (defaults to config)
         force: If True, re-ingest all files even if already processed
+        namespace: Collection namespace for all files (defaults to PINECONE_NAMESPACE_MODE)
+        workers: Number of files ingested in parallel (defaults to INGEST_WORKERS)
+        pdf_paths: Ingest these files instead of scanning source_dir
+        on_progress: Called with each file's path and result (None if skipped),
+            in order; an exception raised by it stops the run
 
     Returns:
         Dict with overall ingestion statistics
     """
     if source_dir is None:
         source_dir = Config.PDF_SOURCE_DIR
+    if workers is None:
+        workers = Config.INGEST_WORKERS
 
     logger.info("=" * 50)
     logger.info("Starting document ingestion pipeline")
-    logger.info(f"Source directory: {source_dir}")
+    logger.info(f"Source directory: {source_dir if pdf_paths is None else f'{len(pdf_paths)} given files'}")
     logger.info("=" * 50)
 
-    # Ensure directory exists
-    ensure_directory_exists(source_dir)
-
-    # Load processed files cache
-    load_processed_files_cache()
+    # Open the ingestion ledger (imports a legacy .processed_files.json)
+    get_ingest_ledger()
 
     # Preload embedding model
     preload_model()
 
     # Scan for PDFs
-    pdf_files = scan_pdf_directory(source_dir)
+    if pdf_paths is None:
+        ensure_directory_exists(source_dir)
+        pdf_paths = [pdf_info["path"] for pdf_info in scan_pdf_directory(source_dir)]
 
-    if not pdf_files:
+    if not pdf_paths:
         logger.warning("No PDF files found in source directory")
         return {
             "status": "success",
@@ -192,22 +381,34 @@ def run_ingestion(
         }
 
     # Process each PDF
+    workers = min(workers, len(pdf_paths))
+    if workers > 1:
+        logger.info(f"Ingesting {len(pdf_paths)} files with {workers} workers")
+        file_results = _ingest_parallel(pdf_paths, workers, force=force, namespace=namespace)
+    else:
+        file_results = (ingest_single_pdf(path, force=force, namespace=namespace) for path in pdf_paths)
+
     results = []
     documents_ingested = 0
     total_chunks = 0
     errors = 0
 
-    for pdf_info in pdf_files:
-        result = ingest_single_pdf(pdf_info["path"], force=force)
-
-        if result:
-            results.append(result)
-
-            if result["status"] == "success":
-                documents_ingested += 1
-                total_chunks += result.get("chunks", 0)
-            elif result["status"] == "error":
-                errors += 1
+    try:
+        for path, result in zip(pdf_paths, file_results):
+            if result:
+                results.append(result)
+
+                if result["status"] == "success":
+                    documents_ingested += 1
+                    total_chunks += result.get("chunks", 0)
+                elif result["status"] in ("error", "partial"):
+                    errors += 1
+
+            if on_progress is not None:
+                on_progress(path, result)
+    finally:
+        # Stops pending files when on_progress raises
+        file_results.close()
 
     logger.info("=" * 50)
     logger.info("Ingestion complete")
@@ -224,27 +425,3 @@ def run_ingestion(
         "details": results
     }
 
-
-def ingest_uploaded_file(file_path: str) -> Dict:
-    """
-    Ingest a single uploaded PDF file.
-    Used by the Flask API endpoint.
-
-    Args:
-        file_path: Path to the uploaded PDF file
-
-    Returns:
-        Dict with ingestion result
-    """
-    # Preload model if not already loaded
-    preload_model()
-
-    result = ingest_single_pdf(file_path, force=True)
-
-    if result is None:
-        return {
-            "status": "skipped",
-            "message": "File already processed"
-        }
-
-    return result
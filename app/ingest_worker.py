@@ -0,0 +1,274 @@
+"""
+Background ingestion worker.
+Claims jobs from the ingestion job queue and runs them outside the request
+cycle, so long ingests never hit the gunicorn timeout. By default
+(INGEST_WORKER_IN_PROCESS=1) the worker is a thread in each web process and
+shares its CPU and memory with chat requests; with INGEST_WORKER_IN_PROCESS=0
+it runs as a separate process (ingest_worker.py) instead. Between files, a job yields to queued jobs of higher priority
+(interactive uploads before bulk re-ingests) and resumes later; files it
+already finished are skipped on resume. Uploaded files are copied from
+the job queue to a directory of their own for each job.
+"""
+import logging
+import os
+import shutil
+import socket
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.config import Config
+from app.ingest_runner import run_ingestion
+from app.services.embeddings import preload_model
+from app.services.ingest_jobs import IngestJobQueue, get_ingest_job_queue
+from app.utils.file_scanner import scan_pdf_directory
+
+logger = logging.getLogger(__name__)
+
+_worker_thread: Optional[threading.Thread] = None
+
+
+class JobInterrupted(Exception):
+    """Raised between files to put the running job back in the queue."""
+
+
+class JobLost(Exception):
+    """Raised when another worker has taken over the running job."""
+
+
+def _file_summary(path: str, result: Optional[Dict]) -> Dict:
+    """Compact per-file entry for job progress."""
+    if result is None:
+        return {"path": path, "filename": Path(path).name, "status": "skipped"}
+    summary = {"path": path, "filename": Path(path).name, "status": result["status"]}
+    for key in ("chunks", "vectors_added", "vectors_deleted", "error", "message"):
+        if key in result:
+            summary[key] = result[key]
+    return summary
+
+
+def summarize(results) -> Dict:
+    """
+    Overall outcome of a job from its per-file results.
+
+    Returns:
+        Dict with status, documents_ingested, total_chunks, skipped and errors
+    """
+    ingested = [r for r in results if r["status"] == "success"]
+    errors = sum(1 for r in results if r["status"] in ("error", "partial"))
+    if not errors:
+        status = "success"
+    else:
+        status = "partial" if ingested else "error"
+    return {
+        "status": status,
+        "documents_ingested": len(ingested),
+        "total_chunks": sum(r.get("chunks", 0) for r in ingested),
+        "skipped": sum(1 for r in results if r["status"] == "skipped"),
+        "errors": errors
+    }
+
+
+class IngestWorker:
+    """Runs ingestion jobs from the queue, one at a time."""
+
+    def __init__(
+        self,
+        queue: Optional[IngestJobQueue] = None,
+        worker_id: Optional[str] = None,
+        poll_seconds: Optional[float] = None,
+        heartbeat_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            queue: Job queue (defaults to the configured one)
+            worker_id: Identifier recorded on claimed jobs (defaults to host:pid:random)
+            poll_seconds: Wait between polls of an empty queue (defaults to INGEST_JOB_POLL_SECONDS)
+            heartbeat_seconds: Lease renewal interval (defaults to INGEST_JOB_HEARTBEAT_SECONDS)
+        """
+        self.queue = queue or get_ingest_job_queue()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.poll_seconds = poll_seconds if poll_seconds is not None else Config.INGEST_JOB_POLL_SECONDS
+        self.heartbeat_seconds = heartbeat_seconds if heartbeat_seconds is not None else Config.INGEST_JOB_HEARTBEAT_SECONDS
+        self._stop = threading.Event()
+
+    def _upload_paths(self, job: Dict, done: set) -> List[str]:
+        """
+        Write a job's uploaded files to INGEST_UPLOAD_DIR/<job_id>/.
+        Each file is written to a temporary name and moved into place, so
+        ingestion never reads a partial file.
+
+        Args:
+            job: Claimed "files" job
+            done: Paths already ingested by an earlier attempt (not written again)
+
+        Returns:
+            Paths of all the job's files, in upload order
+        """
+        job_dir = Path(Config.INGEST_UPLOAD_DIR) / job["id"]
+        job_dir.mkdir(parents=True, exist_ok=True)
+        paths = []
+        for upload in job["payload"].get("uploads") or []:
+            path = str(job_dir / upload["filename"])
+            paths.append(path)
+            if path in done or os.path.exists(path):
+                continue
+            fd, tmp_path = tempfile.mkstemp(dir=job_dir, suffix=".part")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(self.queue.upload_data(upload["id"]))
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        return paths
+
+    def _finish(self, job_id: str, status: str, result: Dict, error: Optional[str] = None):
+        """Record a job's outcome and drop its uploaded files."""
+        self.queue.finish(job_id, self.worker_id, status, result=result, error=error)
+        try:
+            self.queue.delete_uploads(job_id)
+        except Exception as e:
+            logger.warning(f"Could not delete uploads of job {job_id}: {str(e)}")
+        shutil.rmtree(Path(Config.INGEST_UPLOAD_DIR) / job_id, ignore_errors=True)
+
+    def stop(self):
+        """Stop after the current file; the running job is requeued."""
+        self._stop.set()
+
+    def _heartbeat(self, job_id: str, finished: threading.Event, lost: threading.Event):
+        # Keeps the lease alive while a single large file is being ingested
+        while not finished.wait(self.heartbeat_seconds):
+            try:
+                if not self.queue.heartbeat(job_id, self.worker_id):
+                    lost.set()
+                    return
+            except Exception as e:
+                logger.warning(f"Heartbeat for job {job_id} failed: {str(e)}")
+
+    def run_job(self, job: Dict) -> str:
+        """
+        Run a claimed job to completion, or until it is interrupted.
+
+        Args:
+            job: Job returned by IngestJobQueue.claim()
+
+        Returns:
+            Final job status, or "queued" if the job was requeued
+        """
+        job_id = job["id"]
+        payload = job["payload"] or {}
+        progress = job["progress"] or {}
+        results = progress.get("results") or []
+
+        # Files finished before the job was interrupted are not ingested again
+        done = {entry["path"] for entry in results}
+        try:
+            if job["kind"] == "all":
+                pdf_paths = [pdf_info["path"] for pdf_info in scan_pdf_directory(Config.PDF_SOURCE_DIR)]
+            else:
+                pdf_paths = self._upload_paths(job, done)
+        except Exception as e:
+            logger.error(f"Ingestion job {job_id} failed: {str(e)}", exc_info=True)
+            self._finish(job_id, "error", summarize(results), error=str(e))
+            return "error"
+        remaining = [path for path in pdf_paths if path not in done]
+        progress.update({"files_total": len(pdf_paths), "files_done": len(results), "current": None, "results": results})
+        logger.info(f"Running ingestion job {job_id}: {len(remaining)} of {len(pdf_paths)} file(s) to go")
+
+        finished = threading.Event()
+        lost = threading.Event()
+        threading.Thread(
+            target=self._heartbeat, args=(job_id, finished, lost),
+            name=f"ingest-job-heartbeat-{job_id[:8]}", daemon=True
+        ).start()
+
+        def on_progress(path: str, result: Optional[Dict]):
+            results.append(_file_summary(path, result))
+            progress["files_done"] = len(results)
+            if lost.is_set() or not self.queue.heartbeat(job_id, self.worker_id, progress):
+                raise JobLost(job_id)
+            if len(results) < len(pdf_paths) and (
+                self._stop.is_set() or self.queue.has_waiting(job["priority"])
+            ):
+                raise JobInterrupted(job_id)
+
+        try:
+            run_ingestion(
+                force=bool(payload.get("force")),
+                namespace=payload.get("namespace"),
+                pdf_paths=remaining,
+                on_progress=on_progress
+            )
+        except JobInterrupted:
+            self.queue.requeue(job_id, self.worker_id, progress)
+            logger.info(f"Requeued ingestion job {job_id} after {len(results)}/{len(pdf_paths)} file(s)")
+            return "queued"
+        except JobLost:
+            logger.warning(f"Ingestion job {job_id} was taken over by another worker")
+            return "lost"
+        except Exception as e:
+            logger.error(f"Ingestion job {job_id} failed: {str(e)}", exc_info=True)
+            self._finish(job_id, "error", summarize(results), error=str(e))
+            return "error"
+        finally:
+            finished.set()
+
+        summary = summarize(results)
+        self.queue.heartbeat(job_id, self.worker_id, progress)
+        self._finish(job_id, summary["status"], summary)
+        logger.info(f"Finished ingestion job {job_id}: {summary['status']}")
+        return summary["status"]
+
+    def run_once(self) -> bool:
+        """
+        Claim and run the next job, if any.
+
+        Returns:
+            True if a job was run
+        """
+        job = self.queue.claim(self.worker_id)
+        if job is None:
+            return False
+        self.run_job(job)
+        return True
+
+    def run_forever(self, drain: bool = False):
+        """
+        Run jobs until stop() is called.
+
+        Args:
+            drain: Return once the queue is empty instead of polling
+        """
+        logger.info(f"Ingestion worker {self.worker_id} started")
+        preload_model()
+        while not self._stop.is_set():
+            try:
+                if self.run_once():
+                    continue
+            except Exception as e:
+                logger.error(f"Ingestion worker error: {str(e)}", exc_info=True)
+            if drain:
+                break
+            self._stop.wait(self.poll_seconds)
+        logger.info(f"Ingestion worker {self.worker_id} stopped")
+
+
+def start_worker_thread() -> threading.Thread:
+    """
+    Run an ingestion worker on a daemon thread of this process.
+    The default setup (INGEST_WORKER_IN_PROCESS=1), started in each web
+    process by start_background_services().
+
+    Returns:
+        The worker thread
+    """
+    global _worker_thread
+
+    if _worker_thread is None or not _worker_thread.is_alive():
+        _worker_thread = threading.Thread(target=IngestWorker().run_forever, name="ingest-worker", daemon=True)
+        _worker_thread.start()
+
+    return _worker_thread
@@ -2,5 +2,9 @@
 from app.models.user import User
 from app.models.chat_session import ChatSession
 from app.models.chat_message import ChatMessage
+from app.models.chunk_text import ChunkText
+from app.models.ingest_record import IngestRecord
+from app.models.ingest_job import IngestJob
+from app.models.ingest_upload import IngestUpload
 
-__all__ = ['User', 'ChatSession', 'ChatMessage']
+__all__ = ['User', 'ChatSession', 'ChatMessage', 'ChunkText', 'IngestRecord', 'IngestJob', 'IngestUpload']
@@ -0,0 +1,20 @@
+"""
+Chunk text model (docstore).
+"""
+from sqlalchemy import Column, String, Text, Index
+from app.db.session import Base
+
+
+class ChunkText(Base):
+    """Text of an indexed chunk, keyed by namespace and vector ID."""
+
+    __tablename__ = "chunk_texts"
+
+    namespace = Column(String, primary_key=True, default="")  # "" for the default namespace
+    id = Column(String, primary_key=True)  # Vector ID: {doc_id}_{page}_{chunk}
+    doc_id = Column(String, nullable=False)
+    text = Column(Text, nullable=False)
+
+    __table_args__ = (
+        Index("idx_chunk_texts_doc_id", "namespace", "doc_id"),
+    )
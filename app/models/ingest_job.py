@@ -0,0 +1,30 @@
+"""
+Background ingestion job model.
+"""
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+from app.db.session import Base
+
+
+class IngestJob(Base):
+    """Queued or running ingestion of uploaded files or the whole source directory."""
+
+    __tablename__ = "ingest_jobs"
+
+    id = Column(String, primary_key=True)
+    kind = Column(String, nullable=False)  # "files" (uploads) or "all" (source directory)
+    priority = Column(Integer, nullable=False, default=0)  # Higher runs first
+    status = Column(String, nullable=False)  # queued, running, success, partial or error
+    payload = Column(Text, nullable=False, default="{}")  # JSON: uploads, namespace, force
+    progress = Column(Text, nullable=False, default="{}")  # JSON: files_total, files_done, results
+    result = Column(Text, nullable=True)  # JSON summary once finished
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    worker_id = Column(String, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("idx_ingest_jobs_queue", "status", "priority", "created_at"),
+    )
@@ -0,0 +1,31 @@
+"""
+Ingestion ledger model.
+"""
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String, Text
+from app.db.session import Base
+
+
+class IngestRecord(Base):
+    """Ingestion state of one source file."""
+
+    __tablename__ = "ingest_ledger"
+
+    filename = Column(String, primary_key=True)
+    file_hash = Column(String, nullable=False)  # SHA-256 of the file contents
+    doc_id = Column(String, nullable=False)
+    namespace = Column(String, nullable=True)  # None for the default namespace
+    status = Column(String, nullable=False)  # processing, success, partial, warning or error
+    claim_id = Column(String, nullable=True)  # Attempt currently allowed to finish the record
+    chunks = Column(Integer, nullable=False, default=0)
+    vector_ids = Column(Text, nullable=False, default="[]")  # JSON list of stored vector IDs
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    duration_seconds = Column(Float, nullable=True)
+    updated_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("idx_ingest_ledger_status", "status"),
+        Index("idx_ingest_ledger_doc_id", "doc_id"),
+    )
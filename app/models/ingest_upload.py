@@ -0,0 +1,22 @@
+"""
+Uploaded file model.
+"""
+from sqlalchemy import Column, DateTime, Index, Integer, LargeBinary, String
+from app.db.session import Base
+
+
+class IngestUpload(Base):
+    """Contents of a PDF uploaded for an ingestion job, kept until the job finishes."""
+
+    __tablename__ = "ingest_uploads"
+
+    id = Column(String, primary_key=True)
+    job_id = Column(String, nullable=False)
+    filename = Column(String, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+    __table_args__ = (
+        Index("idx_ingest_uploads_job_id", "job_id"),
+    )
@@ -4,6 +4,7 @@ Uses Gemini 2.0 Flash for response generation.
 """
 import logging
 import re
+from functools import lru_cache
 from typing import List, Optional
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
@@ -115,9 +116,11 @@ def format_docs(docs: List[Document]) -> str:
     return "\n\n---\n\n".join(formatted)
 
 
+@lru_cache(maxsize=None)
 def get_rag_prompt(response_language: str = 'en'):
     """
     Get the RAG prompt template with language instruction.
+    Templates are built once per language and reused.
     
     Args:
         response_language: Language code for the response
@@ -3,15 +3,20 @@ History-aware retriever for contextual retrieval.
 Rewrites queries based on chat history for better retrieval.
 """
 import logging
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_core.output_parsers import StrOutputParser
-from app.rag.retriever import get_retriever
+from app.rag.retriever import retrieve_documents
 from app.rag.generator import get_llm
+from app.rag.router import route_query
+from app.config import Config
 
 logger = logging.getLogger(__name__)
 
+# Global history-aware retriever (built once per process)
+_history_aware_retriever = None
+
 # Prompt for contextualizing the question based on chat history
 CONTEXTUALIZE_PROMPT = """Given a chat history and the latest user question \
 which might reference context in the chat history, formulate a standalone question \
@@ -36,7 +41,6 @@ def create_history_aware_rag_retriever():
         History-aware retriever function that returns (docs, contextualized_query)
     """
     llm = get_llm()
-    retriever = get_retriever()
     contextualize_prompt = get_contextualize_prompt()
 
     # Create a chain that contextualizes the query, then retrieves documents
@@ -55,13 +59,38 @@ def create_history_aware_rag_retriever():
                 "chat_history": inputs["chat_history"]
             })
         
+        # Without an explicit scope, search the namespaces the query names (or all);
+        # a metadata filter already scopes the search, so it is applied to every namespace
+        namespaces = inputs.get("namespaces")
+        if namespaces is None and not inputs.get("metadata_filter") and Config.ROUTER_ENABLED:
+            namespaces = route_query(contextualized_query)
+
         # Retrieve documents using the contextualized query
-        docs = retriever.invoke(contextualized_query)
+        docs = retrieve_documents(
+            contextualized_query,
+            metadata_filter=inputs.get("metadata_filter"),
+            namespaces=namespaces
+        )
         return docs, contextualized_query
     
     return history_aware_retrieve
 
 
+def get_history_aware_retriever():
+    """
+    Get or create the history-aware retriever.
+
+    Returns:
+        History-aware retriever function that returns (docs, contextualized_query)
+    """
+    global _history_aware_retriever
+
+    if _history_aware_retriever is None:
+        _history_aware_retriever = create_history_aware_rag_retriever()
+
+    return _history_aware_retriever
+
+
 def format_chat_history(messages: List[dict]) -> List:
     """
     Format chat messages into LangChain message format.
@@ -88,7 +117,9 @@ def format_chat_history(messages: List[dict]) -> List:
 
 def retrieve_with_history(
     query: str,
-    chat_history: List[dict]
+    chat_history: List[dict],
+    metadata_filter: Optional[Dict] = None,
+    namespaces: Optional[List[str]] = None
 ) -> Tuple[List, str]:
     """
     Retrieve documents using history-aware retrieval.
@@ -96,6 +127,8 @@ def retrieve_with_history(
     Args:
         query: Current user query
         chat_history: Previous chat messages
+        metadata_filter: Optional Pinecone metadata filter
+        namespaces: Namespaces to search (defaults to the router's choice)
 
     Returns:
         Tuple of (retrieved documents, contextualized query)
@@ -106,12 +139,14 @@ def retrieve_with_history(
     formatted_history = format_chat_history(chat_history)
 
     # Get history-aware retriever
-    history_aware_retriever = create_history_aware_rag_retriever()
+    history_aware_retriever = get_history_aware_retriever()
 
     # Retrieve documents
     docs, contextualized_query = history_aware_retriever({
         "input": query,
-        "chat_history": formatted_history
+        "chat_history": formatted_history,
+        "metadata_filter": metadata_filter,
+        "namespaces": namespaces
     })
 
     logger.info(f"Retrieved {len(docs)} documents with history context")
@@ -1,22 +1,98 @@
 """
 Vector retriever for RAG pipeline.
-Retrieves relevant documents from Pinecone.
+Retrieves relevant documents from Pinecone, optionally scoped to
+namespaces and metadata filters (document, page range).
 """
 import logging
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Tuple
 from langchain_core.documents import Document
+from langchain_core.runnables import RunnableLambda
+from app.services.embeddings import get_embeddings
 from app.services.pinecone_client import get_vector_store
+from app.rag.router import list_namespaces, to_namespace
 from app.config import Config
 
 logger = logging.getLogger(__name__)
 
 
-def get_retriever(top_k: int = None):
+# Fans a query out over several namespaces
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=Config.RETRIEVAL_MAX_PARALLEL_NAMESPACES,
+            thread_name_prefix="retrieve"
+        )
+    return _executor
+
+
+def _as_list(value, name: str) -> List[str]:
+    values = [value] if isinstance(value, str) else value
+    if not isinstance(values, list) or not values or not all(isinstance(v, str) and v for v in values):
+        raise ValueError(f"'{name}' must be a non-empty string or list of strings")
+    return values
+
+
+def parse_filters(filters: Optional[Dict]) -> Tuple[Optional[Dict], Optional[List[str]]]:
+    """
+    Validate retrieval filters from a request.
+
+    Args:
+        filters: Dict with optional keys doc_id, doc_name, namespace
+            (string or list of strings) and page_from, page_to (1-indexed)
+
+    Returns:
+        Tuple of (Pinecone metadata filter or None, namespaces or None)
+
+    Raises:
+        ValueError: If a filter is malformed
+    """
+    if not filters:
+        return None, None
+    if not isinstance(filters, dict):
+        raise ValueError("'filters' must be an object")
+
+    unknown = set(filters) - {"doc_id", "doc_name", "namespace", "page_from", "page_to"}
+    if unknown:
+        raise ValueError(f"Unknown filters: {', '.join(sorted(unknown))}")
+
+    metadata_filter = {}
+    for key in ("doc_id", "doc_name"):
+        if filters.get(key) is not None:
+            metadata_filter[key] = {"$in": _as_list(filters[key], key)}
+
+    page_range = {}
+    for key, operator in (("page_from", "$gte"), ("page_to", "$lte")):
+        if filters.get(key) is not None:
+            if isinstance(filters[key], bool) or not isinstance(filters[key], int) or filters[key] < 1:
+                raise ValueError(f"'{key}' must be a positive integer")
+            page_range[operator] = filters[key]
+    if page_range:
+        metadata_filter["page_number"] = page_range
+
+    namespaces = None
+    if filters.get("namespace") is not None:
+        namespaces = [to_namespace(name) for name in _as_list(filters["namespace"], "namespace")]
+
+    return metadata_filter or None, namespaces
+
+
+def get_retriever(
+    top_k: int = None,
+    metadata_filter: Optional[Dict] = None,
+    namespaces: Optional[List[str]] = None
+):
     """
     Get a retriever from the vector store.
 
     Args:
         top_k: Number of documents to retrieve
+        metadata_filter: Optional Pinecone metadata filter
+        namespaces: Namespaces to search (defaults to all namespaces)
 
     Returns:
         LangChain retriever
@@ -24,33 +100,68 @@ def get_retriever(top_k: int = None):
     if top_k is None:
         top_k = Config.RAG_TOP_K
 
+    if namespaces is None or len(namespaces) > 1:
+        return RunnableLambda(
+            lambda query: retrieve_documents(query, top_k, metadata_filter, namespaces)
+        )
+
+    search_kwargs = {"k": top_k}
+    if metadata_filter:
+        search_kwargs["filter"] = metadata_filter
+    if namespaces[0]:
+        search_kwargs["namespace"] = namespaces[0]
+
     vector_store = get_vector_store()
     retriever = vector_store.as_retriever(
         search_type="similarity",
-        search_kwargs={"k": top_k}
+        search_kwargs=search_kwargs
     )
 
     return retriever
 
 
-def retrieve_documents(query: str, top_k: int = None) -> List[Document]:
+def retrieve_documents(
+    query: str,
+    top_k: int = None,
+    metadata_filter: Optional[Dict] = None,
+    namespaces: Optional[List[Optional[str]]] = None
+) -> List[Document]:
     """
     Retrieve relevant documents for a query.
+    With several namespaces the query is embedded once, every namespace is
+    searched in parallel and the best top_k matches overall are returned.
 
     Args:
         query: Search query
         top_k: Number of documents to retrieve
+        metadata_filter: Optional Pinecone metadata filter
+        namespaces: Namespaces to search (defaults to all namespaces)
 
     Returns:
         List of relevant documents
     """
     if top_k is None:
         top_k = Config.RAG_TOP_K
+    if namespaces is None:
+        namespaces = list_namespaces()
 
-    logger.info(f"Retrieving top {top_k} documents for query")
+    logger.info(f"Retrieving top {top_k} documents for query from {len(namespaces)} namespace(s)")
 
     vector_store = get_vector_store()
-    docs = vector_store.similarity_search(query, k=top_k)
+    if len(namespaces) == 1:
+        docs = vector_store.similarity_search(query, k=top_k, filter=metadata_filter, namespace=namespaces[0])
+    else:
+        embedding = get_embeddings().embed_query(query)
+        searches = [
+            _get_executor().submit(
+                vector_store.similarity_search_by_vector_with_score,
+                embedding, k=top_k, filter=metadata_filter, namespace=namespace
+            )
+            for namespace in namespaces
+        ]
+        scored = [match for search in searches for match in search.result()]
+        scored.sort(key=lambda match: match[1], reverse=True)
+        docs = [doc for doc, _ in scored[:top_k]]
 
     logger.info(f"Retrieved {len(docs)} documents")
     return docs
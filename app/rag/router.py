@@ -0,0 +1,99 @@
+"""
+Lightweight query router for scoped retrieval.
+Picks the Pinecone namespaces a query refers to (e.g. "bh1.pdf" or
+"budget speech") by matching namespace names against the query text,
+so the search covers only those namespaces instead of the whole index.
+"""
+import logging
+import re
+from pathlib import Path
+from typing import List, Optional
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Name Pinecone reports for vectors upserted without a namespace
+DEFAULT_NAMESPACE = "__default__"
+
+
+def to_namespace(name: str) -> str:
+    """
+    Turn a document or collection name into a namespace name.
+
+    Args:
+        name: Filename (extension is dropped) or collection name
+
+    Returns:
+        Lowercase, hyphen-separated namespace, e.g. "Budget Speech.pdf" -> "budget-speech"
+    """
+    stem = Path(name).stem if name.lower().endswith(".pdf") else name
+    return re.sub(r"[^a-z0-9]+", "-", stem.lower()).strip("-")
+
+
+def namespace_for_document(filename: str, namespace: Optional[str] = None) -> Optional[str]:
+    """
+    Get the namespace a document is ingested into.
+
+    Args:
+        filename: PDF filename
+        namespace: Explicit namespace or collection name (takes precedence)
+
+    Returns:
+        Namespace name, or None for the default namespace
+    """
+    if namespace:
+        return to_namespace(namespace)
+    if Config.PINECONE_NAMESPACE_MODE == "document":
+        return to_namespace(filename)
+    return None
+
+
+def list_namespaces(refresh: bool = False) -> List[Optional[str]]:
+    """
+    Get the namespaces of the index from the cached index stats.
+
+    Args:
+        refresh: Read fresh index stats instead of the cached ones
+
+    Returns:
+        Namespace names; None stands for the default namespace
+    """
+    from app.services.pinecone_client import get_index_stats
+    try:
+        names = get_index_stats(refresh=refresh)["namespaces"].keys()
+    except Exception as e:
+        logger.warning(f"Could not list namespaces: {str(e)}")
+        return [None]
+
+    return sorted(
+        (None if name in ("", DEFAULT_NAMESPACE) else name for name in names),
+        key=lambda name: name or ""
+    ) or [None]
+
+
+def route_query(query: str, namespaces: Optional[List[Optional[str]]] = None) -> Optional[List[str]]:
+    """
+    Pick the namespaces a query explicitly refers to.
+    A namespace matches when its name appears in the query as whole words,
+    so "what does bh1.pdf say" matches "bh1" and "the budget speech"
+    matches "budget-speech".
+
+    Args:
+        query: Search query
+        namespaces: Candidate namespaces (defaults to the index's namespaces)
+
+    Returns:
+        Matching namespaces, or None if the query names none (search everything)
+    """
+    if namespaces is None:
+        namespaces = list_namespaces()
+
+    words = re.sub(r"[^a-z0-9]+", "-", query.lower()).strip("-")
+    haystack = f"-{words}-"
+    matches = [name for name in namespaces if name and f"-{name}-" in haystack]
+
+    if matches:
+        logger.info(f"Routed query to namespaces: {', '.join(matches)}")
+        return matches
+    return None
@@ -9,7 +9,7 @@ from app.models.chat_session import ChatSession
 from app.models.chat_message import ChatMessage
 from app.auth.jwt import jwt_required, get_current_user_id
 from app.rag.history_aware import retrieve_with_history, format_chat_history
-from app.rag.retriever import format_sources
+from app.rag.retriever import format_sources, parse_filters
 from app.rag.generator import generate_response, generate_chat_title
 from app.services.language_service import process_user_query
 from app.config import Config
@@ -155,7 +155,13 @@ def send_message(chat_id):
 
     Request body:
         {
-            "message": "User's question"
+            "message": "User's question",
+            "filters": {                       # optional, narrows retrieval
+                "doc_name": "bh1.pdf",         # or doc_id; string or list
+                "namespace": "budget-speech",  # string or list
+                "page_from": 1,
+                "page_to": 20
+            }
         }
 
     Returns:
@@ -172,6 +178,11 @@ def send_message(chat_id):
 
     user_message = data["message"].strip()
 
+    try:
+        metadata_filter, namespaces = parse_filters(data.get("filters"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     db = get_db_session()
     try:
         # Verify chat belongs to user
@@ -213,7 +224,9 @@ def send_message(chat_id):
         db.commit()
 
         # Perform history-aware retrieval using English query
-        documents, _ = retrieve_with_history(english_query, history)
+        documents, _ = retrieve_with_history(
+            english_query, history, metadata_filter=metadata_filter, namespaces=namespaces
+        )
 
         # Format history for LLM
         formatted_history = format_chat_history(history)
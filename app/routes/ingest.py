@@ -1,15 +1,14 @@
 """
 Flask routes for document ingestion API.
 """
-import os
 import logging
-from pathlib import Path
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, url_for
 from werkzeug.utils import secure_filename
 
-from app.config import Config
-from app.ingest_runner import run_ingestion, ingest_uploaded_file
-from app.services.pinecone_client import get_index_stats
+from app.services.ingest_jobs import PRIORITY_BULK, PRIORITY_INTERACTIVE, get_ingest_job_queue
+from app.services.pinecone_client import get_index_stats, get_upsert_retry_queue
+from app.services.embeddings import get_embedding_stats
+from app.warmup import is_ready, get_warmup_status
 
 logger = logging.getLogger(__name__)
 
@@ -24,78 +23,158 @@ def allowed_file(filename: str) -> bool:
 @ingest_bp.route('/ingest', methods=['POST'])
 def ingest_pdf():
     """
-    Upload and ingest a PDF file.
+    Upload PDF files and queue them for ingestion.
+    Ingestion runs in the background worker, ahead of bulk re-ingests;
+    poll the returned status URL for progress.
 
     Accepts:
-        - multipart/form-data with 'file' field containing PDF
+        - multipart/form-data with one or more 'file' (or 'files') fields containing PDFs
+        - optional 'namespace' field to ingest into a collection namespace
 
     Returns:
-        JSON with ingestion result
+        202 with the job ID and status URL
     """
-    # Check if file was uploaded
-    if 'file' not in request.files:
+    # Check if files were uploaded
+    files = request.files.getlist('file') + request.files.getlist('files')
+    if not files:
         return jsonify({
             "status": "error",
             "error": "No file provided"
         }), 400
 
-    file = request.files['file']
+    for file in files:
+        if file.filename == '':
+            return jsonify({
+                "status": "error",
+                "error": "No file selected"
+            }), 400
 
-    if file.filename == '':
-        return jsonify({
-            "status": "error",
-            "error": "No file selected"
-        }), 400
+        if not allowed_file(file.filename):
+            return jsonify({
+                "status": "error",
+                "error": f"Only PDF files are allowed: {file.filename}"
+            }), 400
+
+    try:
+        # Files are stored with the job rather than on this server's disk, so a
+        # worker on another machine can read them; a repeated name keeps the last file
+        uploads = {}
+        for file in files:
+            uploads[secure_filename(file.filename) or "upload.pdf"] = file.read()
+
+        job = get_ingest_job_queue().enqueue(
+            "files",
+            {"namespace": request.form.get('namespace') or None, "force": False},
+            priority=PRIORITY_INTERACTIVE,
+            uploads=list(uploads.items())
+        )
+        logger.info(f"Queued {len(uploads)} uploaded file(s) as job {job['id']}")
+        return _queued(job)
 
-    if not allowed_file(file.filename):
+    except Exception as e:
+        logger.error(f"Error processing upload: {str(e)}", exc_info=True)
         return jsonify({
             "status": "error",
-            "error": "Only PDF files are allowed"
-        }), 400
+            "error": str(e)
+        }), 500
 
-    # Secure the filename and save to PDF source directory
-    filename = secure_filename(file.filename)
-    save_path = Path(Config.PDF_SOURCE_DIR) / filename
 
-    # Ensure directory exists
-    save_path.parent.mkdir(parents=True, exist_ok=True)
+@ingest_bp.route('/ingest/all', methods=['POST'])
+def ingest_all():
+    """
+    Queue ingestion of all PDFs in the source directory.
+    Runs in the background worker behind interactive uploads.
+
+    Query params:
+        - force: If 'true', re-ingest all files even if already processed
+
+    Returns:
+        202 with the job ID and status URL
+    """
+    force = request.args.get('force', 'false').lower() == 'true'
 
     try:
-        file.save(str(save_path))
-        logger.info(f"Saved uploaded file: {save_path}")
+        job = get_ingest_job_queue().enqueue("all", {"force": force}, priority=PRIORITY_BULK)
+        return _queued(job)
 
-        # Trigger ingestion
-        result = ingest_uploaded_file(str(save_path))
+    except Exception as e:
+        logger.error(f"Error queueing ingestion: {str(e)}", exc_info=True)
+        return jsonify({
+            "status": "error",
+            "error": str(e)
+        }), 500
+
+
+def _queued(job: dict):
+    """202 response for a newly queued job."""
+    return jsonify({
+        "status": "queued",
+        "job_id": job["id"],
+        "files": [upload["filename"] for upload in job["payload"].get("uploads", [])],
+        "queue_position": job.get("queue_position"),
+        "status_url": url_for('ingest.ingest_job_status', job_id=job["id"])
+    }), 202
 
-        return jsonify(result), 200 if result["status"] == "success" else 500
 
+@ingest_bp.route('/ingest/jobs/<job_id>', methods=['GET'])
+def ingest_job_status(job_id: str):
+    """
+    Get the status and progress of an ingestion job.
+
+    Returns:
+        JSON with the job: status (queued, running, success, partial, error),
+        progress (files_total, files_done, per-file results) and result
+    """
+    try:
+        job = get_ingest_job_queue().get(job_id)
     except Exception as e:
-        logger.error(f"Error processing upload: {str(e)}", exc_info=True)
+        logger.error(f"Error getting job {job_id}: {str(e)}", exc_info=True)
         return jsonify({
             "status": "error",
             "error": str(e)
         }), 500
 
+    if job is None:
+        return jsonify({
+            "status": "error",
+            "error": "Job not found"
+        }), 404
 
-@ingest_bp.route('/ingest/all', methods=['POST'])
-def ingest_all():
+    return jsonify({
+        "status": "success",
+        "job": job
+    }), 200
+
+
+@ingest_bp.route('/ingest/jobs', methods=['GET'])
+def ingest_jobs():
     """
-    Trigger ingestion of all PDFs in the source directory.
+    List recent ingestion jobs.
 
     Query params:
-        - force: If 'true', re-ingest all files even if already processed
+        - status: Only jobs with this status
+        - limit: Maximum number of jobs (default 20, at most 100)
 
     Returns:
-        JSON with overall ingestion statistics
+        JSON with jobs, newest first
     """
-    force = request.args.get('force', 'false').lower() == 'true'
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+    except ValueError:
+        return jsonify({
+            "status": "error",
+            "error": "'limit' must be an integer"
+        }), 400
 
     try:
-        result = run_ingestion(force=force)
-        return jsonify(result), 200
+        jobs = get_ingest_job_queue().recent(limit=limit, status=request.args.get('status') or None)
+        return jsonify({
+            "status": "success",
+            "jobs": jobs
+        }), 200
 
     except Exception as e:
-        logger.error(f"Error running ingestion: {str(e)}", exc_info=True)
+        logger.error(f"Error listing jobs: {str(e)}", exc_info=True)
         return jsonify({
             "status": "error",
             "error": str(e)
@@ -106,15 +185,22 @@ def ingest_all():
 def index_stats():
     """
     Get Pinecone index statistics.
+    Served from a cache refreshed in the background; the "cache" section
+    reports its age and staleness.
+
+    Query params:
+        - refresh: If 'true', fetch fresh stats from the index first
 
     Returns:
         JSON with index stats
     """
     try:
-        stats = get_index_stats()
+        stats = get_index_stats(refresh=request.args.get('refresh', 'false').lower() == 'true')
+        retry_queue = get_upsert_retry_queue()
         return jsonify({
             "status": "success",
-            **stats
+            **stats,
+            "upsert_retry_queue": retry_queue.stats() if retry_queue is not None else None
         }), 200
 
     except Exception as e:
@@ -125,10 +211,28 @@ def index_stats():
         }), 500
 
 
+@ingest_bp.route('/stats/embeddings', methods=['GET'])
+def embedding_stats():
+    """
+    Get embedding cache hit ratios and HTTP client counters
+    for this worker process.
+
+    Returns:
+        JSON with embedding stats
+    """
+    return jsonify({
+        "status": "success",
+        **get_embedding_stats()
+    }), 200
+
+
 @ingest_bp.route('/health', methods=['GET'])
 def health_check():
-    """Health check endpoint."""
+    """Health check endpoint (503 until the worker has warmed up)."""
+    ready = is_ready()
     return jsonify({
-        "status": "healthy",
-        "service": "Union Budget RAG"
-    }), 200
+        "status": "healthy" if ready else "starting",
+        "ready": ready,
+        "service": "Union Budget RAG",
+        "warmup": get_warmup_status()
+    }), 200 if ready else 503
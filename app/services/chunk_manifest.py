@@ -0,0 +1,131 @@
+"""
+Per-document chunk manifests for incremental re-ingestion.
+A manifest maps each vector ID of a document to the content hash of its
+chunk, so a re-ingest can upsert only new or changed chunks and delete
+only the ones that disappeared.
+"""
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_hash(text: str) -> str:
+    """
+    Hash the content of a chunk.
+
+    Args:
+        text: Chunk text
+
+    Returns:
+        SHA-256 hex digest of the text
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def embedding_signature() -> str:
+    """
+    Identify the embedding setup that produced a manifest's vectors.
+    Chunks embedded under a different signature must all be re-embedded.
+
+    Returns:
+        "backend:model:quantization" string
+    """
+    return f"{Config.EMBEDDING_BACKEND}:{Config.EMBEDDING_MODEL_NAME}:{Config.EMBEDDING_QUANTIZATION}"
+
+
+def _manifest_path(doc_id: str, directory: Optional[str] = None) -> Path:
+    return Path(directory or Config.INGEST_MANIFEST_DIR) / f"{doc_id}.json"
+
+
+def load_manifest(doc_id: str, directory: Optional[str] = None) -> Optional[Dict]:
+    """
+    Load the manifest of a document.
+
+    Args:
+        doc_id: Document ID
+        directory: Manifest directory (defaults to config)
+
+    Returns:
+        Manifest dict, or None if the document has no (readable) manifest
+    """
+    path = _manifest_path(doc_id, directory)
+    if not path.exists():
+        return None
+
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except Exception as e:
+        logger.warning(f"Could not load chunk manifest {path}: {e}")
+        return None
+
+
+def save_manifest(
+    doc_id: str,
+    filename: str,
+    file_hash: str,
+    chunks: Dict[str, str],
+    namespace: Optional[str] = None,
+    directory: Optional[str] = None
+):
+    """
+    Write the manifest of a document atomically.
+
+    Args:
+        doc_id: Document ID
+        filename: Source filename
+        file_hash: SHA-256 hash of the ingested file
+        chunks: Vector ID -> chunk hash of every chunk stored in the index
+        namespace: Pinecone namespace holding the vectors
+        directory: Manifest directory (defaults to config)
+    """
+    path = _manifest_path(doc_id, directory)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    manifest = {
+        "doc_id": doc_id,
+        "filename": filename,
+        "file_hash": file_hash,
+        "namespace": namespace,
+        "embedding": embedding_signature(),
+        "updated_at": datetime.utcnow().isoformat(),
+        "chunks": chunks
+    }
+    tmp_path = path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, path)
+    logger.debug(f"Saved chunk manifest for {filename} ({len(chunks)} chunks)")
+
+
+def delete_manifest(doc_id: str, directory: Optional[str] = None):
+    """Remove the manifest of a document, if any."""
+    _manifest_path(doc_id, directory).unlink(missing_ok=True)
+
+
+def diff_chunks(
+    previous: Dict[str, Optional[str]],
+    current: Dict[str, str]
+) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Compare the stored chunks of a document with a fresh chunking.
+
+    Args:
+        previous: Vector ID -> chunk hash from the manifest (None if unknown)
+        current: Vector ID -> chunk hash of the new chunks
+
+    Returns:
+        (changed, unchanged, vanished) vector IDs; changed includes new chunks
+    """
+    changed = [vector_id for vector_id, digest in current.items() if previous.get(vector_id) != digest]
+    unchanged = [vector_id for vector_id, digest in current.items() if previous.get(vector_id) == digest]
+    vanished = [vector_id for vector_id in previous if vector_id not in current]
+    return changed, unchanged, vanished
@@ -3,7 +3,7 @@ Text chunking service using LangChain text splitters.
 Splits documents into overlapping chunks for embedding generation.
 """
 import logging
-from typing import List
+from typing import Iterable, Iterator, List
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 from app.config import Config
@@ -55,27 +55,43 @@ def chunk_documents(
     if not documents:
         return []
 
-    text_splitter = get_text_splitter(chunk_size, chunk_overlap)
-
     logger.info(f"Chunking {len(documents)} documents with size={chunk_size or Config.CHUNK_SIZE}, overlap={chunk_overlap or Config.CHUNK_OVERLAP}")
 
-    chunked_docs = text_splitter.split_documents(documents)
+    chunked_docs = list(iter_chunks(documents, chunk_size, chunk_overlap))
 
-    # Add chunk index to metadata
-    chunk_counts = {}
-    for doc in chunked_docs:
-        source = doc.metadata.get("source", "unknown")
-        page = doc.metadata.get("page", 0)
-        key = f"{source}_{page}"
+    logger.info(f"Created {len(chunked_docs)} chunks from {len(documents)} documents")
+    return chunked_docs
 
-        if key not in chunk_counts:
-            chunk_counts[key] = 0
 
-        doc.metadata["chunk_index"] = chunk_counts[key]
-        chunk_counts[key] += 1
+def iter_chunks(
+    documents: Iterable[Document],
+    chunk_size: int = None,
+    chunk_overlap: int = None
+) -> Iterator[Document]:
+    """
+    Split a stream of documents into chunks, one document at a time.
 
-    logger.info(f"Created {len(chunked_docs)} chunks from {len(documents)} documents")
-    return chunked_docs
+    Args:
+        documents: LangChain Documents, e.g. pages; consumed lazily
+        chunk_size: Maximum size of each chunk
+        chunk_overlap: Number of overlapping characters
+
+    Yields:
+        Chunked Documents with a "chunk_index" within their source page
+    """
+    text_splitter = get_text_splitter(chunk_size, chunk_overlap)
+
+    # Chunk index counts per source page
+    chunk_counts = {}
+    for document in documents:
+        for doc in text_splitter.split_documents([document]):
+            source = doc.metadata.get("source", "unknown")
+            page = doc.metadata.get("page", 0)
+            key = f"{source}_{page}"
+
+            doc.metadata["chunk_index"] = chunk_counts.get(key, 0)
+            chunk_counts[key] = doc.metadata["chunk_index"] + 1
+            yield doc
 
 
 def chunk_text(text: str, chunk_size: int = None, chunk_overlap: int = None) -> List[str]:
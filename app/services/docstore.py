@@ -0,0 +1,143 @@
+"""
+Docstore for chunk text.
+Keeps the text of each chunk out of the vector metadata: vectors carry
+only slim metadata, and the retriever fetches the text of its top-k
+matches in one bulk read. Backed by a local SQLite file or by the
+application's Postgres database.
+"""
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Engine
+
+from app.config import Config
+from app.db.session import create_sqlite_engine
+from app.models.chunk_text import ChunkText
+
+logger = logging.getLogger(__name__)
+
+# Rows written per INSERT statement
+WRITE_BATCH_SIZE = 500
+
+_docstore: Optional["Docstore"] = None
+
+
+class Docstore:
+    """Chunk text keyed by (namespace, vector ID) in a SQL table."""
+
+    def __init__(self, engine: Engine):
+        """
+        Args:
+            engine: SQLAlchemy engine (SQLite or PostgreSQL)
+        """
+        self.engine = engine
+        self.table = ChunkText.__table__
+        self.table.create(engine, checkfirst=True)
+
+        if engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        self._insert = insert
+
+    def put(self, rows: Iterable[Tuple[str, str, str]], namespace: Optional[str] = None) -> int:
+        """
+        Insert or replace chunk texts.
+
+        Args:
+            rows: (vector ID, doc ID, text) tuples
+            namespace: Vector namespace (None for the default namespace)
+
+        Returns:
+            Number of rows written
+        """
+        values = [
+            {"namespace": namespace or "", "id": vector_id, "doc_id": doc_id, "text": text}
+            for vector_id, doc_id, text in rows
+        ]
+        if not values:
+            return 0
+
+        with self.engine.begin() as connection:
+            for start in range(0, len(values), WRITE_BATCH_SIZE):
+                statement = self._insert(self.table).values(values[start:start + WRITE_BATCH_SIZE])
+                connection.execute(statement.on_conflict_do_update(
+                    index_elements=["namespace", "id"],
+                    set_={"doc_id": statement.excluded.doc_id, "text": statement.excluded.text}
+                ))
+        return len(values)
+
+    def get_many(self, ids: List[str], namespace: Optional[str] = None) -> Dict[str, str]:
+        """
+        Fetch the texts of several chunks in one query.
+
+        Args:
+            ids: Vector IDs
+            namespace: Vector namespace (None for the default namespace)
+
+        Returns:
+            Vector ID -> text for the IDs that were found
+        """
+        if not ids:
+            return {}
+
+        query = select(self.table.c.id, self.table.c.text).where(
+            self.table.c.namespace == (namespace or ""),
+            self.table.c.id.in_(ids)
+        )
+        with self.engine.connect() as connection:
+            return dict(connection.execute(query).all())
+
+    def delete(self, ids: List[str], namespace: Optional[str] = None) -> int:
+        """
+        Delete chunk texts by vector ID.
+
+        Returns:
+            Number of rows deleted
+        """
+        deleted = 0
+        with self.engine.begin() as connection:
+            for start in range(0, len(ids), WRITE_BATCH_SIZE):
+                deleted += connection.execute(delete(self.table).where(
+                    self.table.c.namespace == (namespace or ""),
+                    self.table.c.id.in_(ids[start:start + WRITE_BATCH_SIZE])
+                )).rowcount
+        return deleted
+
+    def delete_document(self, doc_id: str, namespace: Optional[str] = None) -> int:
+        """
+        Delete all chunk texts of a document.
+
+        Returns:
+            Number of rows deleted
+        """
+        with self.engine.begin() as connection:
+            return connection.execute(delete(self.table).where(
+                self.table.c.namespace == (namespace or ""),
+                self.table.c.doc_id == doc_id
+            )).rowcount
+
+
+def get_docstore() -> Optional[Docstore]:
+    """
+    Get or open the configured docstore.
+    DOCSTORE_BACKEND is "none" (text stays in vector metadata), "sqlite"
+    (local file at DOCSTORE_PATH) or "postgres" (DATABASE_URL).
+
+    Returns:
+        Docstore instance, or None if disabled
+    """
+    global _docstore
+
+    if _docstore is None and Config.DOCSTORE_BACKEND != "none":
+        if Config.DOCSTORE_BACKEND == "postgres":
+            from app.db.session import get_engine
+            _docstore = Docstore(get_engine())
+        elif Config.DOCSTORE_BACKEND == "sqlite":
+            _docstore = Docstore(create_sqlite_engine(Config.DOCSTORE_PATH))
+        else:
+            raise ValueError(f"Unknown DOCSTORE_BACKEND: {Config.DOCSTORE_BACKEND}")
+        logger.info(f"Using {Config.DOCSTORE_BACKEND} docstore for chunk text")
+
+    return _docstore
@@ -0,0 +1,197 @@
+"""
+Adaptive batching for embedding API requests.
+Packs texts by estimated token and byte budgets and tunes the batch size
+from observed latency and throttling (additive increase, multiplicative decrease).
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the token count of a text (~4 characters per token).
+
+    Args:
+        text: Input text
+
+    Returns:
+        Estimated number of tokens
+    """
+    return len(text) // 4 + 1
+
+
+class AdaptiveBatcher:
+    """
+    Forms request batches and adapts their size to how the API behaves.
+
+    The batch limit grows by a fixed step while batches finish within
+    target_latency, and is halved when a batch is throttled or times out,
+    or after consecutive failed batches; a single error (possibly retried
+    successfully) is not taken as a sign of oversized batches.
+    Batches are formed lazily, so batches started later use the
+    latest limit.
+    """
+
+    def __init__(
+        self,
+        max_texts: int = 96,
+        min_texts: int = 8,
+        initial_texts: int = 48,
+        max_tokens: int = 24000,
+        max_bytes: int = 262144,
+        target_latency: float = 3.0,
+        increase_step: int = 8,
+        failure_threshold: int = 2,
+        history_size: int = 200
+    ):
+        """
+        Args:
+            max_texts: Hard upper bound on texts per request
+            min_texts: Lower bound the limit never shrinks below
+            initial_texts: Starting batch limit
+            max_tokens: Estimated token budget per request
+            max_bytes: UTF-8 payload budget per request
+            target_latency: Latency (seconds) considered healthy
+            increase_step: Texts added to the limit after a healthy batch
+            failure_threshold: Consecutive failed batches before the limit is halved
+            history_size: Number of recent batches kept for stats
+        """
+        self.max_texts = max_texts
+        self.min_texts = min(min_texts, max_texts)
+        self.max_tokens = max_tokens
+        self.max_bytes = max_bytes
+        self.target_latency = target_latency
+        self.increase_step = increase_step
+        self.failure_threshold = max(1, failure_threshold)
+        self.batch_limit = max(self.min_texts, min(initial_texts, max_texts))
+
+        self.total_batches = 0
+        self.total_texts = 0
+        self.throttled_batches = 0
+        self.failed_batches = 0
+        self._consecutive_failures = 0
+        self._history = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+    def batches(self, texts: List[str]) -> Iterator[List[str]]:
+        """
+        Split texts into batches within the current text, token and byte budgets.
+        A single text that exceeds a budget on its own still gets a batch.
+
+        Args:
+            texts: Texts to split
+
+        Yields:
+            Lists of texts
+        """
+        batch: List[str] = []
+        tokens = 0
+        size = 0
+
+        for text in texts:
+            text_tokens = estimate_tokens(text)
+            text_bytes = len(text.encode("utf-8"))
+
+            if batch and (
+                len(batch) >= self.batch_limit
+                or tokens + text_tokens > self.max_tokens
+                or size + text_bytes > self.max_bytes
+            ):
+                yield batch
+                batch, tokens, size = [], 0, 0
+
+            batch.append(text)
+            tokens += text_tokens
+            size += text_bytes
+
+        if batch:
+            yield batch
+
+    def record(
+        self,
+        texts: List[str],
+        latency: float,
+        throttled: bool = False,
+        failed: bool = False,
+        timed_out: bool = False
+    ):
+        """
+        Record a finished batch and adjust the batch limit.
+
+        Args:
+            texts: Texts in the batch
+            latency: Wall-clock seconds the request took (including retries)
+            throttled: True if the API returned 429 for this batch
+            failed: True if the batch errored after its retries
+            timed_out: True if a request of the batch timed out (even if a retry succeeded)
+        """
+        with self._lock:
+            before = self.batch_limit
+            self._consecutive_failures = self._consecutive_failures + 1 if failed else 0
+
+            if throttled or timed_out or self._consecutive_failures >= self.failure_threshold:
+                self.batch_limit = max(self.min_texts, self.batch_limit // 2)
+            elif failed:
+                # A lone failure may be transient; only repeated failures shrink the batches
+                pass
+            elif latency <= self.target_latency:
+                self.batch_limit = min(self.max_texts, self.batch_limit + self.increase_step)
+            elif latency > 2 * self.target_latency:
+                self.batch_limit = max(self.min_texts, int(self.batch_limit * 0.75))
+
+            self.total_batches += 1
+            self.total_texts += len(texts)
+            self.throttled_batches += int(throttled)
+            self.failed_batches += int(failed)
+            self._history.append({
+                "at": time.time(),
+                "texts": len(texts),
+                "tokens": sum(estimate_tokens(t) for t in texts),
+                "latency_ms": round(latency * 1000, 1),
+                "throttled": throttled,
+                "failed": failed,
+                "timed_out": timed_out,
+                "batch_limit": self.batch_limit
+            })
+
+        if self.batch_limit != before:
+            logger.debug(f"Embedding batch limit {before} -> {self.batch_limit} (latency {latency:.2f}s)")
+
+    def stats(self) -> Dict:
+        """
+        Get batching statistics.
+
+        Returns:
+            Dict with the current limit, totals, latency percentiles,
+            throughput and the most recent batches
+        """
+        with self._lock:
+            history = list(self._history)
+            totals = {
+                "batch_limit": self.batch_limit,
+                "total_batches": self.total_batches,
+                "total_texts": self.total_texts,
+                "throttled_batches": self.throttled_batches,
+                "failed_batches": self.failed_batches
+            }
+
+        latencies = sorted(h["latency_ms"] for h in history)
+        busy_seconds = sum(latencies) / 1000
+
+        def percentile(p: float):
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return {
+            **totals,
+            "latency_ms_p50": percentile(0.50),
+            "latency_ms_p95": percentile(0.95),
+            "texts_per_request_second": round(sum(h["texts"] for h in history) / busy_seconds, 1) if busy_seconds else None,
+            "recent_batches": history[-20:]
+        }
@@ -0,0 +1,400 @@
+"""
+Caches for embedding vectors.
+The persistent content-addressed cache is backed by a local SQLite file so
+re-ingesting unchanged text costs no API calls; the query cache keeps hot
+query embeddings with a TTL, optionally shared between worker processes.
+"""
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def hash_text(text: str) -> str:
+    """
+    Hash a text for use as a cache key.
+
+    Args:
+        text: Input text
+
+    Returns:
+        SHA-256 hex digest of the UTF-8 encoded text
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Disk-backed LRU cache of embeddings keyed by
+    (model_name, input_type, sha256(text)).
+
+    Vectors are stored as raw blobs of the cache dtype (float32, or int8 /
+    packed uint8 in quantized mode). When the number of entries exceeds
+    max_entries, the least recently used ones are evicted.
+    """
+
+    def __init__(self, path: str, model_name: str, max_entries: int = 100000, dtype=np.float32):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path: Path to the SQLite cache file
+            model_name: Embedding model (and embedding type) the cached vectors belong to
+            max_entries: Maximum number of vectors to keep
+            dtype: Storage dtype of the cached vectors
+        """
+        self.path = path
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.dtype = np.dtype(dtype)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model_name TEXT NOT NULL,"
+            " input_type TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_access REAL NOT NULL,"
+            " PRIMARY KEY (model_name, input_type, text_hash))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+        self._invalidate_if_model_changed()
+        logger.info(f"Embedding cache opened: {path} (max {max_entries} entries)")
+
+    def _invalidate_if_model_changed(self):
+        """Drop all cached vectors if they were produced by a different model."""
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'model_name'"
+        ).fetchone()
+
+        if row and row[0] != self.model_name:
+            logger.info(
+                f"Embedding model changed ({row[0]} -> {self.model_name}), clearing embedding cache"
+            )
+            self.clear()
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('model_name', ?)",
+            (self.model_name,)
+        )
+        self._conn.commit()
+
+    def get_many(self, texts: Sequence[str], input_type: str) -> List[Optional[np.ndarray]]:
+        """
+        Look up cached vectors for a list of texts.
+
+        Args:
+            texts: Texts to look up
+            input_type: Cohere input type ("search_document" or "search_query")
+
+        Returns:
+            List aligned with texts, holding a vector of the cache dtype or None for misses
+        """
+        if not texts:
+            return []
+
+        hashes = [hash_text(text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            unique = list(dict.fromkeys(hashes))
+            # Stay below SQLite's bound-parameter limit
+            for i in range(0, len(unique), 500):
+                chunk = unique[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings"
+                    f" WHERE model_name = ? AND input_type = ? AND text_hash IN ({placeholders})",
+                    (self.model_name, input_type, *chunk)
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = np.frombuffer(blob, dtype=self.dtype)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_access = ?"
+                    " WHERE model_name = ? AND input_type = ? AND text_hash = ?",
+                    [(now, self.model_name, input_type, h) for h in found]
+                )
+                self._conn.commit()
+
+            results = [found.get(h) for h in hashes]
+            hit_count = sum(1 for r in results if r is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+
+        return results
+
+    def put_many(self, texts: Sequence[str], vectors: np.ndarray, input_type: str):
+        """
+        Store vectors for a list of texts and evict old entries if needed.
+
+        Args:
+            texts: Texts that were embedded
+            vectors: Embedding vectors aligned with texts (one row per text)
+            input_type: Cohere input type used for the embeddings
+        """
+        if not texts:
+            return
+
+        now = time.time()
+        rows = [
+            (self.model_name, input_type, hash_text(text), np.asarray(vector, dtype=self.dtype).tobytes(), now)
+            for text, vector in zip(texts, vectors)
+        ]
+
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings"
+                " (model_name, input_type, text_hash, vector, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Remove least recently used entries beyond max_entries."""
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = count - self.max_entries
+
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid IN ("
+                " SELECT rowid FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                (excess,)
+            )
+            self.evictions += excess
+            logger.debug(f"Evicted {excess} entries from embedding cache")
+
+    def clear(self):
+        """Remove every cached vector."""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+        logger.info("Embedding cache cleared")
+
+    def _vector_size(self) -> int:
+        """Size in bytes of one stored vector (0 if the cache is empty)."""
+        with self._lock:
+            row = self._conn.execute("SELECT LENGTH(vector) FROM embeddings LIMIT 1").fetchone()
+        return row[0] if row else 0
+
+    def stats(self) -> Dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with entry count, vector bytes, hits, misses, hit ratio and evictions
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "model_name": self.model_name,
+            "dtype": self.dtype.name,
+            "entries": entries,
+            "approx_vector_bytes": entries * self._vector_size(),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions
+        }
+
+
+class QueryEmbeddingCache:
+    """
+    TTL + LRU cache for query embeddings.
+
+    Always keeps a process-local tier. With shared_path set, a SQLite tier
+    is added so all gunicorn workers on the host see each other's entries.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_entries: int = 2048,
+        ttl_seconds: float = 3600,
+        shared_path: Optional[str] = None,
+        dtype=np.float32
+    ):
+        """
+        Args:
+            model_name: Embedding model (and embedding type) the cached vectors belong to
+            max_entries: Maximum entries per tier
+            ttl_seconds: How long an entry stays valid
+            shared_path: Optional SQLite file shared between processes
+            dtype: Storage dtype of the cached vectors
+        """
+        self.model_name = model_name
+        self.dtype = np.dtype(dtype)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.shared_path = shared_path
+        self.local_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        if shared_path:
+            Path(shared_path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(shared_path, timeout=5, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS query_embeddings ("
+                " key TEXT PRIMARY KEY,"
+                " vector BLOB NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_query_embeddings_last_access"
+                " ON query_embeddings(last_access)"
+            )
+            self._conn.commit()
+
+        logger.info(
+            f"Query embedding cache: {'shared (' + shared_path + ')' if shared_path else 'local'}, "
+            f"max {max_entries} entries, ttl {ttl_seconds}s"
+        )
+
+    def _key(self, text: str) -> str:
+        # Collapse whitespace so trivially different spellings share an entry
+        return hash_text(f"{self.model_name}\0{' '.join(text.split())}")
+
+    def _remember_locally(self, key: str, vector: np.ndarray, expires_at: float):
+        self._local[key] = (expires_at, vector)
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """
+        Look up a query embedding.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Read-only vector of the cache dtype, or None on a miss
+        """
+        key = self._key(text)
+        now = time.time()
+
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._local.move_to_end(key)
+                    self.local_hits += 1
+                    return entry[1]
+                del self._local[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT vector, expires_at FROM query_embeddings WHERE key = ? AND expires_at > ?",
+                    (key, now)
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE query_embeddings SET last_access = ? WHERE key = ?",
+                        (now, key)
+                    )
+                    self._conn.commit()
+                    vector = np.frombuffer(row[0], dtype=self.dtype)
+                    self._remember_locally(key, vector, row[1])
+                    self.shared_hits += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, vector: np.ndarray):
+        """
+        Store a query embedding.
+
+        Args:
+            text: Query text
+            vector: Embedding vector
+        """
+        key = self._key(text)
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        vector = np.array(vector, dtype=self.dtype)
+        vector.setflags(write=False)
+
+        with self._lock:
+            self._remember_locally(key, vector, expires_at)
+
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO query_embeddings (key, vector, expires_at, last_access)"
+                    " VALUES (?, ?, ?, ?)",
+                    (key, vector.tobytes(), expires_at, now)
+                )
+                self._conn.execute("DELETE FROM query_embeddings WHERE expires_at <= ?", (now,))
+                self._conn.execute(
+                    "DELETE FROM query_embeddings WHERE key IN ("
+                    " SELECT key FROM query_embeddings ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+                self._conn.commit()
+
+    def stats(self) -> Dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with backend, entry counts, hits, misses and hit ratio
+        """
+        with self._lock:
+            local_entries = len(self._local)
+            shared_entries = None
+            if self._conn is not None:
+                shared_entries = self._conn.execute(
+                    "SELECT COUNT(*) FROM query_embeddings"
+                ).fetchone()[0]
+
+        hits = self.local_hits + self.shared_hits
+        lookups = hits + self.misses
+        return {
+            "backend": "shared" if self._conn is not None else "local",
+            "dtype": self.dtype.name,
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
+            "local_entries": local_entries,
+            "shared_entries": shared_entries,
+            "local_hits": self.local_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0
+        }
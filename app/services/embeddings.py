@@ -3,28 +3,778 @@ Embedding generation service using Cohere API (free tier).
 Lightweight implementation that doesn't load models into memory.
 Perfect for Render's 512MB free tier.
 """
+import asyncio
 import logging
 import os
+import random
+import threading
+import time
+import weakref
+import httpx
 import requests
-import math
-from typing import List, Optional
+import numpy as np
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import AsyncGenerator, Callable, Dict, Iterator, List, Optional, Tuple
 from langchain_core.embeddings import Embeddings
 from app.config import Config
+from app.services.embedding_batcher import AdaptiveBatcher
+from app.services.embedding_cache import EmbeddingCache, QueryEmbeddingCache
+from app.services.quantization import CODE_DTYPES, code_dimension, dequantize, embedding_type_for, to_codes
+from app.utils.rate_limiter import RateLimiter
 
 logger = logging.getLogger(__name__)
 
+# Cohere API endpoint - use v1 for embed endpoint
+COHERE_EMBED_URL = "https://api.cohere.ai/v1/embed"
 
-class CohereEmbeddings(Embeddings):
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize each row in place for cosine similarity.
+    Zero rows are left unchanged.
+
+    Args:
+        vectors: 2-D float32 array
+
+    Returns:
+        The same array, normalized
+    """
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def _retry_after_seconds(response: requests.Response, default: float) -> float:
+    """
+    Read the Retry-After header of a throttled response.
+
+    Args:
+        response: HTTP response
+        default: Delay to use if the header is missing or not numeric
+
+    Returns:
+        Delay in seconds
+    """
+    value = response.headers.get("Retry-After")
+    try:
+        return max(float(value), 0.0)
+    except (TypeError, ValueError):
+        return default
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when the circuit breaker is open and calls fail fast."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    Opens after failure_threshold consecutive failures, rejects calls for
+    reset_timeout seconds, then lets a single trial call through (half-open).
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.open_events = 0
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state: "closed", "open" or "half_open"."""
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        """Return True if a call may proceed."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            # Half-open: allow one trial call at a time
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        """Close the circuit after a successful call."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        """Count a failed call, opening the circuit past the threshold."""
+        with self._lock:
+            self._failures += 1
+            reopen = self._trial_in_flight
+            self._trial_in_flight = False
+
+            if reopen or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                self.open_events += 1
+                logger.warning(f"Cohere circuit breaker opened after {self._failures} consecutive failures")
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that counts the requests it sends and the connections its
+    pools open, so connection reuse can be reported without reading
+    urllib3's pool internals.
+    """
+
+    def __init__(self, **kwargs):
+        self.requests_sent = 0
+        self.connections_opened = 0
+        self._counter_lock = threading.Lock()
+        super().__init__(**kwargs)
+
+    def _connection_opened(self):
+        with self._counter_lock:
+            self.connections_opened += 1
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        opened = self._connection_opened
+
+        class CountingHTTPConnection(HTTPConnection):
+            def connect(self):
+                super().connect()
+                opened()
+
+        class CountingHTTPSConnection(HTTPSConnection):
+            def connect(self):
+                super().connect()
+                opened()
+
+        class CountingHTTPConnectionPool(HTTPConnectionPool):
+            ConnectionCls = CountingHTTPConnection
+
+        class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+            ConnectionCls = CountingHTTPSConnection
+
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": CountingHTTPConnectionPool,
+            "https": CountingHTTPSConnectionPool
+        }
+
+    def send(self, request, *args, **kwargs):
+        with self._counter_lock:
+            self.requests_sent += 1
+        return super().send(request, *args, **kwargs)
+
+
+class CohereHTTPClient:
+    """
+    Pooled keep-alive HTTP client for the Cohere API.
+
+    Retries 429 and 5xx responses (and connection errors) with jittered
+    exponential backoff inside a per-call deadline, and fails fast through
+    a circuit breaker while Cohere is unavailable.
+    """
+
+    RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        api_url: str,
+        headers: Dict[str, str],
+        pool_size: int = 10,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+        request_timeout: float = 30.0,
+        deadline: float = 90.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None
+    ):
+        """
+        Args:
+            api_url: Endpoint to POST to
+            headers: Headers sent with every request
+            pool_size: Maximum number of pooled keep-alive connections
+            max_retries: Retries per call after the first attempt
+            backoff_base: Base delay for exponential backoff (seconds)
+            backoff_max: Upper bound for a single backoff delay (seconds)
+            request_timeout: Timeout of a single HTTP attempt (seconds)
+            deadline: Total time budget of a call including retries (seconds)
+            rate_limiter: Optional limiter gating every attempt
+            circuit_breaker: Optional breaker shared by all calls
+        """
+        self.api_url = api_url
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.request_timeout = request_timeout
+        self.deadline = deadline
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+
+        self.requests_sent = 0
+        self.retries = 0
+        self.fast_failures = 0
+        self._counter_lock = threading.Lock()
+
+        self.headers = dict(headers)
+        self.pool_size = pool_size
+        # Keyed by event loop; entries are removed when their loop shuts down
+        self._async_clients: Dict[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, AsyncGenerator]] = {}
+
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        self._adapter = _CountingHTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+
+    def _count(self, name: str):
+        with self._counter_lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for the given attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _check_attempt(self, deadline: float) -> float:
+        """
+        Fail fast if the circuit is open or the call deadline has passed.
+
+        Returns:
+            Seconds left until the deadline
+        """
+        if not self.circuit_breaker.allow():
+            self._count("fast_failures")
+            raise CircuitOpenError("Cohere API circuit breaker is open; failing fast")
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self.circuit_breaker.record_failure()
+            raise TimeoutError(f"Cohere API call exceeded its {self.deadline:.0f}s deadline")
+
+        self._count("requests_sent")
+        return remaining
+
+    def _retry_delay(
+        self,
+        attempt: int,
+        deadline: float,
+        response,
+        error: Optional[Exception],
+        outcome: Optional[Dict] = None
+    ) -> Optional[float]:
+        """
+        Record the outcome of an attempt and decide whether to retry it.
+
+        Args:
+            attempt: Zero-based attempt number
+            deadline: Monotonic deadline of the whole call
+            response: HTTP response (requests or httpx), or None on error
+            error: Connection/timeout error, or None
+            outcome: Optional dict updated with "attempts", "throttled", "errors"
+                and "timeouts"
+
+        Returns:
+            Seconds to wait before retrying (0 when the rate limiter already
+            holds the retry back), or None if the outcome is final
+        """
+        status = response.status_code if response is not None else None
+
+        if outcome is not None:
+            outcome["attempts"] = attempt + 1
+            if status == 429:
+                outcome["throttled"] = True
+            elif error is not None or status in self.RETRYABLE_STATUS:
+                outcome["errors"] = outcome.get("errors", 0) + 1
+                if isinstance(error, (requests.exceptions.Timeout, httpx.TimeoutException)) or status == 504:
+                    outcome["timeouts"] = outcome.get("timeouts", 0) + 1
+
+        if error is None and status not in self.RETRYABLE_STATUS:
+            self.circuit_breaker.record_success()
+            return None
+
+        # Throttling is not an outage; only errors count towards opening the circuit
+        if error is not None or status != 429:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+        if attempt >= self.max_retries:
+            return None
+
+        paused = False
+        if status == 429:
+            delay = _retry_after_seconds(response, default=self._backoff_delay(attempt))
+            if self.rate_limiter is not None:
+                # Pause every sender, not just this one; the retry then waits in the
+                # rate limiter like the others rather than sleeping on top of it
+                paused = self.rate_limiter.backoff(delay)
+        else:
+            delay = self._backoff_delay(attempt)
+
+        reason = str(error) if error is not None else f"HTTP {status}"
+        if time.monotonic() + delay >= deadline:
+            logger.warning(f"Cohere API call failed ({reason}); no time left to retry")
+            return None
+
+        logger.warning(f"Cohere API call failed ({reason}), retrying in {delay:.1f}s (attempt {attempt + 1})")
+        self._count("retries")
+        return 0.0 if paused else delay
+
+    def post(self, payload: Dict, items: int = 1, outcome: Optional[Dict] = None) -> requests.Response:
+        """
+        POST a JSON payload with retries.
+
+        Args:
+            payload: JSON body
+            items: Number of items in the request (for the rate limiter)
+            outcome: Optional dict filled with retry details of this call
+
+        Returns:
+            The final response (may still be an error response once
+            retries are exhausted)
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open
+            TimeoutError: If the call deadline expires
+            requests.exceptions.RequestException: If the last attempt
+                failed to connect
+        """
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(items)
+
+            remaining = self._check_attempt(deadline)
+            error: Optional[Exception] = None
+            response: Optional[requests.Response] = None
+
+            try:
+                response = self.session.post(
+                    self.api_url,
+                    json=payload,
+                    timeout=min(self.request_timeout, remaining)
+                )
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            except Exception:
+                self.circuit_breaker.record_failure()
+                raise
+
+            delay = self._retry_delay(attempt, deadline, response, error, outcome)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+
+            if delay > 0:
+                time.sleep(delay)
+            attempt += 1
+
+    async def _get_async_client(self) -> httpx.AsyncClient:
+        """
+        Get the pooled async client bound to the running event loop.
+
+        The client lives as long as its loop: it is closed by aclose(), or
+        when the loop finalizes its async generators on shutdown (as
+        asyncio.run() does) through a generator parked on the loop.
+        """
+        loop = asyncio.get_running_loop()
+        entry = self._async_clients.get(loop)
+
+        if entry is None:
+            # Loops closed without finalizing their async generators leave
+            # clients that can no longer be closed; drop them
+            for stale in [other for other in list(self._async_clients) if other.is_closed()]:
+                self._async_clients.pop(stale, None)
+
+            client = httpx.AsyncClient(
+                headers=self.headers,
+                limits=httpx.Limits(
+                    max_connections=self.pool_size,
+                    max_keepalive_connections=self.pool_size
+                )
+            )
+            lifetime = self._client_lifetime(loop, client)
+            await lifetime.asend(None)
+            entry = (client, lifetime)
+            self._async_clients[loop] = entry
+
+        return entry[0]
+
+    async def _client_lifetime(self, loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient):
+        """Async generator that closes the client when its loop finalizes it."""
+        try:
+            yield
+        finally:
+            self._async_clients.pop(loop, None)
+            await client.aclose()
+
+    async def apost(self, payload: Dict, items: int = 1, outcome: Optional[Dict] = None) -> httpx.Response:
+        """
+        Async counterpart of post() built on a pooled httpx.AsyncClient.
+        Shares the rate limiter, circuit breaker and counters with post().
+
+        Args:
+            payload: JSON body
+            items: Number of items in the request (for the rate limiter)
+            outcome: Optional dict filled with retry details of this call
+
+        Returns:
+            The final response (may still be an error response once
+            retries are exhausted)
+        """
+        client = await self._get_async_client()
+        deadline = time.monotonic() + self.deadline
+        attempt = 0
+
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(items)
+
+            remaining = self._check_attempt(deadline)
+            error: Optional[Exception] = None
+            response: Optional[httpx.Response] = None
+
+            try:
+                response = await client.post(
+                    self.api_url,
+                    json=payload,
+                    timeout=min(self.request_timeout, remaining)
+                )
+            except httpx.TransportError as e:
+                error = e
+            except Exception:
+                self.circuit_breaker.record_failure()
+                raise
+
+            delay = self._retry_delay(attempt, deadline, response, error, outcome)
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+
+            if delay > 0:
+                await asyncio.sleep(delay)
+            attempt += 1
+
+    async def aclose(self):
+        """Close the async client bound to the running event loop."""
+        entry = self._async_clients.pop(asyncio.get_running_loop(), None)
+        if entry is not None:
+            await entry[1].aclose()
+
+    def stats(self) -> Dict:
+        """
+        Get client counters.
+
+        Returns:
+            Dict with request, retry, circuit breaker and connection reuse counters
+        """
+        connections_opened = self._adapter.connections_opened
+        pooled_requests = self._adapter.requests_sent
+
+        return {
+            "requests_sent": self.requests_sent,
+            "retries": self.retries,
+            "fast_failures": self.fast_failures,
+            "circuit_state": self.circuit_breaker.state,
+            "circuit_open_events": self.circuit_breaker.open_events,
+            "connections_opened": connections_opened,
+            "connections_reused": max(pooled_requests - connections_opened, 0)
+        }
+
+
+def _embedding_http_error(e: Exception) -> RuntimeError:
+    """
+    Log an HTTP error from Cohere and convert it to the error we raise.
+
+    Args:
+        e: requests.HTTPError or httpx.HTTPStatusError
+
+    Returns:
+        RuntimeError describing the failure
+    """
+    error_msg = f"HTTP {e.response.status_code}: {str(e)}"
+    if e.response.status_code == 401:
+        error_msg += " - Invalid or missing Cohere API key."
+    elif e.response.status_code == 429:
+        error_msg += " - Rate limit exceeded. Cohere free tier has limits."
+    logger.error(f"Failed to get embeddings from Cohere API: {error_msg}")
+    if e.response.text:
+        logger.error(f"Response: {e.response.text[:500]}")
+    return RuntimeError(f"Embedding API error: {error_msg}")
+
+
+class EmbeddingBackend(Embeddings):
+    """
+    Base class for embedding backends.
+
+    Subclasses implement the float32 array methods; the LangChain list
+    methods and async fallbacks are derived from them here, so every
+    backend shares the same interface and dimension check.
+    """
+
+    name = "base"
+
+    # Cohere embedding type requested (quantized types are cached as compact codes)
+    embedding_type = "float"
+
+    def embed_documents_array(self, texts: List[str]) -> np.ndarray:
+        """Embed documents as a float32 array of shape (len(texts), dimension)."""
+        raise NotImplementedError
+
+    def embed_query_array(self, text: str) -> np.ndarray:
+        """Embed a query as a float32 array of shape (dimension,)."""
+        raise NotImplementedError
+
+    async def aembed_documents_array(self, texts: List[str]) -> np.ndarray:
+        """Async embed_documents_array(); runs the sync method in a thread unless overridden."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.embed_documents_array, texts)
+
+    async def aembed_query_array(self, text: str) -> np.ndarray:
+        """Async embed_query_array(); runs the sync method in a thread unless overridden."""
+        return await asyncio.get_running_loop().run_in_executor(None, self.embed_query_array, text)
+
+    def _check_dimension(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Make sure vectors match the configured index dimension.
+
+        Args:
+            vectors: Array whose last axis is the embedding dimension
+
+        Returns:
+            The same array
+
+        Raises:
+            ValueError: If the dimension differs from Config.EMBEDDING_DIMENSION
+        """
+        if vectors.shape[-1] != Config.EMBEDDING_DIMENSION:
+            raise ValueError(
+                f"{self.name} embeddings have dimension {vectors.shape[-1]}, "
+                f"but EMBEDDING_DIMENSION is {Config.EMBEDDING_DIMENSION}"
+            )
+        return vectors
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a list of documents.
+        
+        Args:
+            texts: List of texts to embed
+            
+        Returns:
+            List of embedding vectors
+        """
+        if not texts:
+            return []
+
+        return self.embed_documents_array(texts).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a single query text.
+        
+        Args:
+            text: Text to embed
+            
+        Returns:
+            Embedding vector
+        """
+        return self.embed_query_array(text).tolist()
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed a list of documents without blocking the event loop.
+
+        Args:
+            texts: List of texts to embed
+
+        Returns:
+            List of embedding vectors
+        """
+        if not texts:
+            return []
+
+        return (await self.aembed_documents_array(texts)).tolist()
+
+    async def aembed_query(self, text: str) -> List[float]:
+        """
+        Embed a single query text without blocking the event loop.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Embedding vector
+        """
+        return (await self.aembed_query_array(text)).tolist()
+
+
+class QueryCoalescer:
+    """
+    Micro-batches concurrent single-query embedding calls.
+
+    Callers block on submit(); a background flusher collects the texts that
+    arrive within a short window (or until max_batch are waiting) and embeds
+    them with a single API call, routing each row back to its caller.
+    Identical texts in the same window share one slot.
+    """
+
+    def __init__(
+        self,
+        embed_batch: Callable[[List[str]], np.ndarray],
+        window_seconds: float = 0.005,
+        max_batch: int = 32,
+        max_in_flight: int = 4
+    ):
+        """
+        Args:
+            embed_batch: Function embedding a list of texts into a 2-D array
+            window_seconds: How long to wait for more texts after the first one
+            max_batch: Flush as soon as this many distinct texts are waiting
+            max_in_flight: Maximum coalesced requests running at once
+        """
+        self.embed_batch = embed_batch
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+        self.max_in_flight = max_in_flight
+
+        self.submitted = 0
+        self.deduplicated = 0
+        self.batches = 0
+        self._pending: "OrderedDict[str, Future]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._flusher: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _ensure_flusher(self):
+        # Started lazily so each forked gunicorn worker gets its own thread
+        if self._flusher is None or not self._flusher.is_alive():
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_in_flight,
+                thread_name_prefix="query-coalescer"
+            )
+            self._flusher = threading.Thread(target=self._run, name="query-coalescer-flusher", daemon=True)
+            self._flusher.start()
+
+    def submit(self, text: str) -> np.ndarray:
+        """
+        Embed a query text as part of the next coalesced batch.
+
+        Args:
+            text: Query text
+
+        Returns:
+            float32 embedding vector
+        """
+        with self._cond:
+            self.submitted += 1
+            future = self._pending.get(text)
+
+            if future is None:
+                future = Future()
+                self._pending[text] = future
+                self._ensure_flusher()
+                self._cond.notify()
+            else:
+                self.deduplicated += 1
+
+        return future.result()
+
+    def _run(self):
+        """Flusher loop: wait for a window to fill, then hand the batch to a worker."""
+        while True:
+            with self._cond:
+                while not self._pending:
+                    self._cond.wait()
+
+                deadline = time.monotonic() + self.window_seconds
+                while len(self._pending) < self.max_batch:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = []
+                while self._pending and len(batch) < self.max_batch:
+                    batch.append(self._pending.popitem(last=False))
+                self.batches += 1
+
+            self._executor.submit(self._flush, batch)
+
+    def _flush(self, batch: List):
+        """Embed one coalesced batch and resolve its futures."""
+        texts = [text for text, _ in batch]
+
+        try:
+            vectors = self.embed_batch(texts)
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        for (_, future), vector in zip(batch, vectors):
+            future.set_result(vector)
+
+    def stats(self) -> Dict:
+        """
+        Get coalescing statistics.
+
+        Returns:
+            Dict with submitted queries, API batches and average batch size
+        """
+        requests_saved = self.submitted - self.batches
+        return {
+            "window_ms": round(self.window_seconds * 1000, 2),
+            "max_batch": self.max_batch,
+            "submitted": self.submitted,
+            "deduplicated": self.deduplicated,
+            "batches": self.batches,
+            "avg_batch_size": round((self.submitted - self.deduplicated) / self.batches, 2) if self.batches else 0.0,
+            "requests_saved": max(requests_saved, 0)
+        }
+
+
+class CohereEmbeddings(EmbeddingBackend):
     """
     Lightweight embedding class using Cohere Embed API.
     No models loaded in memory - all embeddings via API calls.
     Free tier available: https://cohere.com/
     """
+
+    name = "cohere"
+
+    # Cohere supports up to 96 texts per request
+    BATCH_SIZE = 96
     
     def __init__(
         self,
         model_name: str = "embed-english-light-v3.0",
-        api_key: Optional[str] = None
+        api_key: Optional[str] = None,
+        cache: Optional[EmbeddingCache] = None,
+        max_concurrency: int = 1,
+        rate_limiter: Optional[RateLimiter] = None,
+        http_client: Optional[CohereHTTPClient] = None,
+        query_cache: Optional[QueryEmbeddingCache] = None,
+        batcher: Optional[AdaptiveBatcher] = None,
+        coalesce_window: float = 0.0,
+        coalesce_max_batch: int = 32,
+        quantization: str = "none"
     ):
         """
         Initialize Cohere embeddings.
@@ -32,6 +782,18 @@ class CohereEmbeddings(Embeddings):
         Args:
             model_name: Cohere embedding model name (default: embed-english-v3.0)
             api_key: Cohere API key (required - get free key at https://cohere.com/)
+            cache: Optional persistent embedding cache
+            max_concurrency: Maximum number of batch requests in flight
+            rate_limiter: Optional limiter shared by all outgoing requests
+                (ignored when http_client is given)
+            http_client: Optional pre-configured HTTP client
+            query_cache: Optional TTL cache consulted before embedding queries
+            batcher: Optional adaptive batcher (fixed 96-text batches if None)
+            coalesce_window: Seconds to gather concurrent embed_query calls
+                into one request (0 disables coalescing)
+            coalesce_max_batch: Flush a coalesced batch at this many texts
+            quantization: "none" (float), "int8" or "binary" - compact
+                embedding type requested from Cohere and kept in the caches
         """
         # Validate model name is a Cohere model, not HuggingFace
         if "sentence-transformers" in model_name.lower() or "huggingface" in model_name.lower():
@@ -40,6 +802,14 @@ class CohereEmbeddings(Embeddings):
             model_name = "embed-english-light-v3.0"
         
         self.model_name = model_name
+        self.embedding_type = embedding_type_for(quantization)
+        self.cache = cache
+        self.query_cache = query_cache
+        self.batcher = batcher
+        self.coalescer: Optional[QueryCoalescer] = None
+        self.max_concurrency = max(1, max_concurrency)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._async_semaphores: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
         self.api_key = api_key or os.getenv("COHERE_API_KEY")
         
         if not self.api_key:
@@ -47,175 +817,610 @@ class CohereEmbeddings(Embeddings):
                 "COHERE_API_KEY is required. Get a free API key at https://cohere.com/"
             )
         
-        # Cohere API endpoint - use v1 for embed endpoint
-        self.api_url = "https://api.cohere.ai/v1/embed"
+        # Cohere API endpoint - use v1 for embed endpoint (a shared client may point elsewhere)
+        self.api_url = http_client.api_url if http_client is not None else COHERE_EMBED_URL
         self.headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
             "Accept": "application/json"
         }
+        self.http = http_client or CohereHTTPClient(
+            api_url=self.api_url,
+            headers=self.headers,
+            pool_size=self.max_concurrency,
+            rate_limiter=rate_limiter
+        )
+        if coalesce_window > 0:
+            self.coalescer = QueryCoalescer(
+                embed_batch=lambda batch: self._embed_with_cache(batch, "search_query"),
+                window_seconds=coalesce_window,
+                max_batch=min(coalesce_max_batch, self.BATCH_SIZE),
+                max_in_flight=self.max_concurrency
+            )
+
         logger.info(f"Initialized Cohere embeddings: {model_name}")
         logger.info(f"Cohere API URL: {self.api_url}")
         logger.info(f"Cohere Model: {self.model_name}")
     
-    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+    def _build_payload(self, texts: List[str], input_type: str) -> Dict:
+        """Build the Cohere embed request body for a batch."""
+        logger.debug(f"Calling Cohere API: {self.api_url} with model: {self.model_name}")
+        payload = {
+            "texts": texts,
+            "model": self.model_name,
+            "input_type": input_type
+        }
+        if self.embedding_type != "float":
+            payload["embedding_types"] = [self.embedding_type]
+        return payload
+
+    def _parse_response(self, response, payload: Dict) -> np.ndarray:
         """
-        Embed a list of documents.
-        
+        Check a Cohere embed response and extract its embeddings.
+
+        Args:
+            response: requests or httpx response
+            payload: Request body (for error logging)
+
+        Returns:
+            float32 array of shape (len(texts), dimension), L2-normalized,
+            or compact codes when a quantized embedding type was requested
+        """
+        if response.status_code != 200:
+            logger.error(f"Cohere API error: Status {response.status_code}")
+            logger.error(f"Request URL: {self.api_url}")
+            logger.error(f"Request payload: {payload}")
+            logger.error(f"Response: {response.text[:1000]}")
+
+        response.raise_for_status()
+        result = response.json()
+
+        # Extract embeddings from response
+        if "embeddings" not in result or not result["embeddings"]:
+            logger.error(f"Unexpected Cohere API response: {result}")
+            raise ValueError(f"Cohere API returned no embeddings: {result}")
+
+        embeddings = result["embeddings"]
+        if self.embedding_type != "float":
+            # Typed responses are keyed by embedding type: {"int8": [[...]]}
+            if not isinstance(embeddings, dict) or not embeddings.get(self.embedding_type):
+                raise ValueError(f"Cohere API returned no {self.embedding_type} embeddings")
+
+            codes = to_codes(embeddings[self.embedding_type], self.embedding_type)
+            dimension = code_dimension(codes, self.embedding_type)
+            if dimension != Config.EMBEDDING_DIMENSION:
+                raise ValueError(
+                    f"Embedding dimension mismatch: backend returned {dimension} "
+                    f"but EMBEDDING_DIMENSION is {Config.EMBEDDING_DIMENSION}"
+                )
+            return codes
+
+        # One vectorized normalization for the whole batch
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        return normalize_rows(self._check_dimension(vectors))
+
+    def _request_embeddings(self, texts: List[str], input_type: str) -> np.ndarray:
+        """
+        Call the Cohere embed endpoint for a single batch of texts.
+
+        Args:
+            texts: Texts to embed (at most 96)
+            input_type: "search_document" or "search_query"
+
+        Returns:
+            float32 array of shape (len(texts), dimension), L2-normalized
+        """
+        payload = self._build_payload(texts, input_type)
+        outcome = {}
+        started = time.monotonic()
+
+        try:
+            response = self.http.post(payload, items=len(texts), outcome=outcome)
+            vectors = self._parse_response(response, payload)
+        except Exception as e:
+            self._record_batch(texts, started, outcome, error=e)
+            raise
+
+        self._record_batch(texts, started, outcome)
+        return vectors
+
+    async def _arequest_embeddings(self, texts: List[str], input_type: str) -> np.ndarray:
+        """
+        Async counterpart of _request_embeddings().
+        Waits for a concurrency slot so at most max_concurrency batches are in flight.
+        """
+        payload = self._build_payload(texts, input_type)
+        outcome = {}
+
+        async with self._get_async_semaphore():
+            started = time.monotonic()
+            try:
+                response = await self.http.apost(payload, items=len(texts), outcome=outcome)
+                vectors = self._parse_response(response, payload)
+            except Exception as e:
+                self._record_batch(texts, started, outcome, error=e)
+                raise
+
+        self._record_batch(texts, started, outcome)
+        return vectors
+
+    def _record_batch(self, texts: List[str], started: float, outcome: Dict, error: Optional[Exception] = None):
+        """
+        Feed a finished batch's latency and retry outcome to the adaptive batcher.
+        Errors that a retry recovered from do not count as a failed batch.
+        """
+        if self.batcher is not None:
+            self.batcher.record(
+                texts,
+                latency=time.monotonic() - started,
+                throttled=outcome.get("throttled", False),
+                failed=error is not None,
+                # Exceeding the call deadline is a timeout of the batch as a whole
+                timed_out=bool(outcome.get("timeouts")) or isinstance(error, TimeoutError)
+            )
+
+    def _get_async_semaphore(self) -> asyncio.Semaphore:
+        """Get the concurrency limiter bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        semaphore = self._async_semaphores.get(loop)
+
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._async_semaphores[loop] = semaphore
+
+        return semaphore
+
+    def _iter_batches(self, texts: List[str]) -> Iterator[List[str]]:
+        """Split texts into request-sized batches (adaptively sized if a batcher is set)."""
+        if self.batcher is not None:
+            yield from self.batcher.batches(texts)
+            return
+
+        for i in range(0, len(texts), self.BATCH_SIZE):
+            yield texts[i:i + self.BATCH_SIZE]
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Get the shared worker pool used for concurrent batch requests."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency,
+                thread_name_prefix="cohere-embed"
+            )
+        return self._executor
+
+    def _dispatch_batches(self, texts: List[str], input_type: str):
+        """
+        Embed texts in batches, keeping up to max_concurrency requests in flight.
+
+        Args:
+            texts: Texts to embed
+            input_type: "search_document" or "search_query"
+
+        Yields:
+            (batch, embeddings) tuples in the original batch order
+        """
+        batches = self._iter_batches(texts)
+
+        if self.max_concurrency == 1 or len(texts) == 1:
+            for batch in batches:
+                yield batch, self._request_embeddings(batch, input_type)
+            return
+
+        executor = self._get_executor()
+        pending = {}
+        completed = {}
+        next_index = 0
+        next_to_yield = 0
+
+        try:
+            while True:
+                # Top up the in-flight window
+                while len(pending) < self.max_concurrency:
+                    batch = next(batches, None)
+                    if batch is None:
+                        break
+                    future = executor.submit(self._request_embeddings, batch, input_type)
+                    pending[future] = (next_index, batch)
+                    next_index += 1
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, batch = pending.pop(future)
+                    completed[index] = (batch, future.result())
+
+                # Release results in order so output stays deterministic
+                while next_to_yield in completed:
+                    yield completed.pop(next_to_yield)
+                    next_to_yield += 1
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _lookup_cache(self, texts: List[str], input_type: str):
+        """
+        Look texts up in the persistent cache.
+
+        Returns:
+            (cached, missing): vectors-or-None aligned with texts, and the
+            distinct texts that still need embedding
+        """
+        if self.cache is None:
+            cached = [None] * len(texts)
+        else:
+            cached = self.cache.get_many(texts, input_type)
+
+        # Embed each distinct missing text once
+        missing = list(dict.fromkeys(
+            text for text, vector in zip(texts, cached) if vector is None
+        ))
+
+        if missing and self.cache is not None:
+            logger.debug(f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} to embed")
+
+        return cached, missing
+
+    def _store_batch(self, fresh: Dict, batch: List[str], batch_embeddings: np.ndarray, input_type: str):
+        """Record a freshly embedded batch and write it to the cache."""
+        fresh.update(zip(batch, batch_embeddings))
+
+        if self.cache is not None:
+            self.cache.put_many(batch, batch_embeddings, input_type)
+
+    def _embed_with_cache(self, texts: List[str], input_type: str) -> np.ndarray:
+        """
+        Embed texts, serving what we can from the cache and
+        sending only the misses to Cohere.
+
+        Args:
+            texts: Texts to embed
+            input_type: "search_document" or "search_query"
+
+        Returns:
+            Contiguous float32 array with one row per text
+        """
+        cached, missing = self._lookup_cache(texts, input_type)
+        fresh = {}
+
+        for batch, batch_embeddings in self._dispatch_batches(missing, input_type):
+            self._store_batch(fresh, batch, batch_embeddings, input_type)
+
+        return np.vstack([
+            vector if vector is not None else fresh[text]
+            for text, vector in zip(texts, cached)
+        ])
+
+    async def _aembed_with_cache(self, texts: List[str], input_type: str) -> np.ndarray:
+        """
+        Async counterpart of _embed_with_cache().
+        All missing batches are started together; the per-loop semaphore
+        bounds how many are actually in flight.
+        """
+        cached, missing = self._lookup_cache(texts, input_type)
+        fresh = {}
+
+        if missing:
+            batches = list(self._iter_batches(missing))
+            results = await asyncio.gather(*[
+                self._arequest_embeddings(batch, input_type) for batch in batches
+            ])
+            for batch, batch_embeddings in zip(batches, results):
+                self._store_batch(fresh, batch, batch_embeddings, input_type)
+
+        return np.vstack([
+            vector if vector is not None else fresh[text]
+            for text, vector in zip(texts, cached)
+        ])
+
+    def embed_documents_array(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed a list of documents as a float32 array.
+        Quantized codes are cached as returned and only expanded here.
+
         Args:
             texts: List of texts to embed
-            
+
         Returns:
-            List of embedding vectors
+            float32 array of shape (len(texts), dimension)
         """
         if not texts:
-            return []
-        
+            return np.empty((0, Config.EMBEDDING_DIMENSION), dtype=np.float32)
+
         try:
-            # Cohere supports up to 96 texts per request
-            batch_size = 96
-            all_embeddings = []
-            
-            for i in range(0, len(texts), batch_size):
-                batch = texts[i:i + batch_size]
-                
-                payload = {
-                    "texts": batch,
-                    "model": self.model_name,
-                    "input_type": "search_document"  # Use "search_query" for queries
-                }
-                
-                logger.debug(f"Calling Cohere API: {self.api_url} with model: {self.model_name}")
-                
-                response = requests.post(
-                    self.api_url,
-                    headers=self.headers,
-                    json=payload,
-                    timeout=30
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"Cohere API error: Status {response.status_code}")
-                    logger.error(f"Request URL: {self.api_url}")
-                    logger.error(f"Request payload: {payload}")
-                    logger.error(f"Response: {response.text[:1000]}")
-                
-                response.raise_for_status()
-                result = response.json()
-                
-                # Extract embeddings from response
-                batch_embeddings = result.get("embeddings", [])
-                all_embeddings.extend(batch_embeddings)
-            
-            # Normalize embeddings for cosine similarity (L2 normalization)
-            normalized = []
-            for emb in all_embeddings:
-                # Calculate L2 norm
-                norm = math.sqrt(sum(x * x for x in emb))
-                if norm > 0:
-                    # Normalize
-                    normalized.append([x / norm for x in emb])
-                else:
-                    normalized.append(emb)
-            
-            return normalized
-            
-        except requests.exceptions.HTTPError as e:
-            error_msg = f"HTTP {e.response.status_code}: {str(e)}"
-            if e.response.status_code == 401:
-                error_msg += " - Invalid or missing Cohere API key."
-            elif e.response.status_code == 429:
-                error_msg += " - Rate limit exceeded. Cohere free tier has limits."
-            logger.error(f"Failed to get embeddings from Cohere API: {error_msg}")
-            if hasattr(e, 'response') and e.response.text:
-                logger.error(f"Response: {e.response.text[:500]}")
-            raise RuntimeError(f"Embedding API error: {error_msg}")
+            codes = self._embed_with_cache(texts, "search_document")
+            return dequantize(codes, self.embedding_type)
+
+        except (requests.exceptions.HTTPError, httpx.HTTPStatusError) as e:
+            raise _embedding_http_error(e)
         except Exception as e:
             logger.error(f"Failed to get embeddings from Cohere API: {str(e)}")
             raise RuntimeError(f"Embedding API error: {str(e)}")
-    
-    def embed_query(self, text: str) -> List[float]:
+
+    async def aembed_documents_array(self, texts: List[str]) -> np.ndarray:
         """
-        Embed a single query text.
-        
+        Async counterpart of embed_documents_array().
+
+        Args:
+            texts: List of texts to embed
+
+        Returns:
+            float32 array of shape (len(texts), dimension)
+        """
+        if not texts:
+            return np.empty((0, Config.EMBEDDING_DIMENSION), dtype=np.float32)
+
+        try:
+            codes = await self._aembed_with_cache(texts, "search_document")
+            return dequantize(codes, self.embedding_type)
+
+        except (requests.exceptions.HTTPError, httpx.HTTPStatusError) as e:
+            raise _embedding_http_error(e)
+        except Exception as e:
+            logger.error(f"Failed to get embeddings from Cohere API: {str(e)}")
+            raise RuntimeError(f"Embedding API error: {str(e)}")
+
+    def embed_query_array(self, text: str) -> np.ndarray:
+        """
+        Embed a single query text as a float32 array.
+
         Args:
             text: Text to embed
-            
+
         Returns:
-            Embedding vector
+            float32 array of shape (dimension,)
         """
+        if self.query_cache is not None:
+            cached = self.query_cache.get(text)
+            if cached is not None:
+                return dequantize(cached, self.embedding_type)
+
         try:
-            payload = {
-                "texts": [text],
-                "model": self.model_name,
-                "input_type": "search_query"  # Use search_query for queries
-            }
-            
-            logger.debug(f"Calling Cohere API: {self.api_url} with model: {self.model_name}")
-            logger.debug(f"Payload keys: {list(payload.keys())}")
-            
-            response = requests.post(
-                self.api_url,
-                headers=self.headers,
-                json=payload,
-                timeout=30
-            )
-            
-            # Log response for debugging
-            if response.status_code != 200:
-                logger.error(f"Cohere API error: Status {response.status_code}")
-                logger.error(f"Request URL: {self.api_url}")
-                logger.error(f"Request payload: {payload}")
-                logger.error(f"Response: {response.text[:1000]}")
-            
-            response.raise_for_status()
-            result = response.json()
-            
-            # Extract embedding
-            if "embeddings" not in result or not result["embeddings"]:
-                logger.error(f"Unexpected Cohere API response: {result}")
-                raise ValueError(f"Cohere API returned no embeddings: {result}")
-            
-            embedding = result.get("embeddings", [])[0]
-            
-            # Normalize for cosine similarity
-            norm = math.sqrt(sum(x * x for x in embedding))
-            if norm > 0:
-                embedding = [x / norm for x in embedding]
-            
-            return embedding
+            if self.coalescer is not None:
+                vector = self.coalescer.submit(text)
+            else:
+                vector = self._embed_with_cache([text], "search_query")[0]
             
         except Exception as e:
             logger.error(f"Failed to get query embedding from Cohere API: {str(e)}")
             raise RuntimeError(f"Embedding API error: {str(e)}")
 
+        if self.query_cache is not None:
+            self.query_cache.put(text, vector)
+
+        return dequantize(vector, self.embedding_type)
+
+    async def aembed_query_array(self, text: str) -> np.ndarray:
+        """
+        Async counterpart of embed_query_array().
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            float32 array of shape (dimension,)
+        """
+        if self.query_cache is not None:
+            cached = self.query_cache.get(text)
+            if cached is not None:
+                return dequantize(cached, self.embedding_type)
+
+        try:
+            vector = (await self._aembed_with_cache([text], "search_query"))[0]
+
+        except Exception as e:
+            logger.error(f"Failed to get query embedding from Cohere API: {str(e)}")
+            raise RuntimeError(f"Embedding API error: {str(e)}")
+
+        if self.query_cache is not None:
+            self.query_cache.put(text, vector)
+
+        return dequantize(vector, self.embedding_type)
+
+# Registered embedding backends (name -> factory)
+_BACKENDS: Dict[str, Callable[[], EmbeddingBackend]] = {}
 
 # Global embeddings instance (lightweight, no model loading)
-_embeddings: Optional[CohereEmbeddings] = None
+_embeddings: Optional[EmbeddingBackend] = None
+_http_client: Optional[CohereHTTPClient] = None
+_embedding_cache: Optional[EmbeddingCache] = None
+_query_cache: Optional[QueryEmbeddingCache] = None
+_preloaded = False
+
+
+def _cache_model_key(model_name: Optional[str], embedding_type: str) -> str:
+    """Cache namespace for a model; quantized types get their own so vectors never mix."""
+    model_name = model_name or Config.EMBEDDING_MODEL_NAME
+    return model_name if embedding_type == "float" else f"{model_name}:{embedding_type}"
+
+
+def get_embedding_cache(model_name: Optional[str] = None, embedding_type: str = "float") -> Optional[EmbeddingCache]:
+    """
+    Get or open the persistent embedding cache.
+    Entries written by a different model or embedding type are discarded on open.
+
+    Args:
+        model_name: Effective embedding model name (defaults to config)
+        embedding_type: Cohere embedding type stored in the cache
+
+    Returns:
+        EmbeddingCache instance, or None if caching is disabled
+    """
+    global _embedding_cache
+
+    if _embedding_cache is None and Config.EMBEDDING_CACHE_ENABLED:
+        _embedding_cache = EmbeddingCache(
+            path=Config.EMBEDDING_CACHE_PATH,
+            model_name=_cache_model_key(model_name, embedding_type),
+            max_entries=Config.EMBEDDING_CACHE_MAX_ENTRIES,
+            dtype=CODE_DTYPES[embedding_type]
+        )
+
+    return _embedding_cache
+
+
+def get_query_cache(model_name: Optional[str] = None, embedding_type: str = "float") -> Optional[QueryEmbeddingCache]:
+    """
+    Get or create the query embedding cache.
+    Backend is "local" (per process), "shared" (SQLite, across workers) or "none".
+
+    Args:
+        model_name: Effective embedding model name (defaults to config)
+        embedding_type: Cohere embedding type stored in the cache
+
+    Returns:
+        QueryEmbeddingCache instance, or None if disabled
+    """
+    global _query_cache
+
+    backend = Config.QUERY_EMBEDDING_CACHE_BACKEND
+    if _query_cache is None and backend != "none":
+        if backend not in ("local", "shared"):
+            logger.warning(f"Unknown query cache backend '{backend}', using 'local'")
+
+        _query_cache = QueryEmbeddingCache(
+            model_name=_cache_model_key(model_name, embedding_type),
+            max_entries=Config.QUERY_EMBEDDING_CACHE_MAX_ENTRIES,
+            ttl_seconds=Config.QUERY_EMBEDDING_CACHE_TTL_SECONDS,
+            shared_path=Config.QUERY_EMBEDDING_CACHE_PATH if backend == "shared" else None,
+            dtype=CODE_DTYPES[embedding_type]
+        )
+
+    return _query_cache
+
+
+def get_http_client() -> CohereHTTPClient:
+    """
+    Get or create the shared, pooled Cohere HTTP client.
+
+    Returns:
+        CohereHTTPClient instance
+    """
+    global _http_client
+
+    if _http_client is None:
+        _http_client = CohereHTTPClient(
+            api_url=Config.COHERE_API_URL,
+            headers={
+                "Authorization": f"Bearer {Config.COHERE_API_KEY}",
+                "Content-Type": "application/json",
+                "Accept": "application/json"
+            },
+            pool_size=max(Config.COHERE_MAX_CONCURRENCY, 1) * 2,
+            max_retries=Config.COHERE_MAX_RETRIES,
+            request_timeout=Config.COHERE_REQUEST_TIMEOUT,
+            deadline=Config.COHERE_CALL_DEADLINE,
+            rate_limiter=RateLimiter(
+                requests_per_minute=Config.COHERE_REQUESTS_PER_MINUTE,
+                items_per_minute=Config.COHERE_TEXTS_PER_MINUTE
+            ),
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=Config.COHERE_CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout=Config.COHERE_CIRCUIT_RESET_SECONDS
+            )
+        )
+
+    return _http_client
+
+
+def register_embedding_backend(name: str):
+    """
+    Register a factory for an embedding backend, selectable via EMBEDDING_BACKEND.
+
+    Args:
+        name: Backend name
+
+    Returns:
+        Decorator that registers a zero-argument factory function
+    """
+    def decorator(factory: Callable[[], EmbeddingBackend]):
+        _BACKENDS[name] = factory
+        return factory
+
+    return decorator
+
+
+@register_embedding_backend("cohere")
+def _create_cohere_backend() -> CohereEmbeddings:
+    """Create the Cohere API backend with its shared HTTP client and caches."""
+    logger.info(f"Initializing Cohere embeddings: {Config.EMBEDDING_MODEL_NAME}")
+    embeddings = CohereEmbeddings(
+        model_name=Config.EMBEDDING_MODEL_NAME,
+        api_key=Config.COHERE_API_KEY,
+        max_concurrency=Config.COHERE_MAX_CONCURRENCY,
+        http_client=get_http_client(),
+        batcher=AdaptiveBatcher(
+            max_texts=CohereEmbeddings.BATCH_SIZE,
+            min_texts=Config.EMBEDDING_BATCH_MIN_TEXTS,
+            initial_texts=Config.EMBEDDING_BATCH_INITIAL_TEXTS,
+            max_tokens=Config.EMBEDDING_BATCH_MAX_TOKENS,
+            max_bytes=Config.EMBEDDING_BATCH_MAX_BYTES,
+            target_latency=Config.EMBEDDING_BATCH_TARGET_LATENCY
+        ) if Config.EMBEDDING_BATCH_ADAPTIVE else None,
+        coalesce_window=Config.EMBEDDING_COALESCE_WINDOW_MS / 1000,
+        coalesce_max_batch=Config.EMBEDDING_COALESCE_MAX_BATCH,
+        quantization=Config.EMBEDDING_QUANTIZATION
+    )
+    # Key the cache by the model actually in use (the name may have been corrected)
+    embeddings.cache = get_embedding_cache(embeddings.model_name, embeddings.embedding_type)
+    embeddings.query_cache = get_query_cache(embeddings.model_name, embeddings.embedding_type)
+    logger.info("Cohere embeddings initialized (no models in memory)")
+    return embeddings
+
+
+@register_embedding_backend("hashing")
+def _create_hashing_backend() -> EmbeddingBackend:
+    """Create the local in-process hashing backend."""
+    from app.services.local_embeddings import HashingEmbeddings
+    return HashingEmbeddings(dimension=Config.EMBEDDING_DIMENSION)
 
 
-def get_embeddings() -> CohereEmbeddings:
+def get_embeddings() -> EmbeddingBackend:
     """
     Get or initialize the embedding service.
-    Uses Cohere API - no models loaded in memory.
+    The backend is selected by Config.EMBEDDING_BACKEND
+    (Cohere API by default - no models loaded in memory).
     
     Returns:
-        CohereEmbeddings instance
+        EmbeddingBackend instance
     """
     global _embeddings
     
     if _embeddings is None:
-        logger.info(f"Initializing Cohere embeddings: {Config.EMBEDDING_MODEL_NAME}")
-        _embeddings = CohereEmbeddings(
-            model_name=Config.EMBEDDING_MODEL_NAME,
-            api_key=Config.COHERE_API_KEY
-        )
-        logger.info("Cohere embeddings initialized (no models in memory)")
+        backend = Config.EMBEDDING_BACKEND
+        factory = _BACKENDS.get(backend)
+
+        if factory is None:
+            raise ValueError(
+                f"Unknown EMBEDDING_BACKEND '{backend}'. Available: {', '.join(sorted(_BACKENDS))}"
+            )
+
+        _embeddings = factory()
+        logger.info(f"Embedding backend: {backend}")
     
     return _embeddings
 
 
-def generate_embedding(text: str) -> List[float]:
+def get_embedding_stats() -> dict:
+    """
+    Get embedding cache, HTTP client, batching and coalescing statistics for monitoring.
+
+    Returns:
+        Dict with cache, query cache, HTTP client, batcher and coalescer statistics
+    """
+    batcher = getattr(_embeddings, "batcher", None)
+    coalescer = getattr(_embeddings, "coalescer", None)
+    return {
+        "cache": _embedding_cache.stats() if _embedding_cache else {"enabled": False},
+        "query_cache": _query_cache.stats() if _query_cache else {"enabled": False},
+        "http": _http_client.stats() if _http_client else {},
+        "batcher": batcher.stats() if batcher is not None else {"enabled": False},
+        "coalescer": coalescer.stats() if coalescer is not None else {"enabled": False}
+    }
+
+
+def generate_embedding(text: str) -> np.ndarray:
     """
     Generate embedding for a single text string.
     
@@ -223,13 +1428,13 @@ def generate_embedding(text: str) -> List[float]:
         text: The text to embed
         
     Returns:
-        List of floats representing the embedding vector
+        float32 array representing the embedding vector
     """
     embeddings = get_embeddings()
-    return embeddings.embed_query(text)
+    return embeddings.embed_query_array(text)
 
 
-def generate_embeddings_batch(texts: List[str]) -> List[List[float]]:
+def generate_embeddings_batch(texts: List[str]) -> np.ndarray:
     """
     Generate embeddings for multiple texts in batch.
     More efficient than generating one at a time.
@@ -238,25 +1443,29 @@ def generate_embeddings_batch(texts: List[str]) -> List[List[float]]:
         texts: List of texts to embed
         
     Returns:
-        List of embedding vectors
+        float32 array of shape (len(texts), dimension)
     """
-    if not texts:
-        return []
-    
     embeddings = get_embeddings()
     logger.debug(f"Generating embeddings for {len(texts)} texts via Cohere API")
     
-    return embeddings.embed_documents(texts)
+    return embeddings.embed_documents_array(texts)
 
 
 def preload_model():
     """
     Preload/validate the embedding API connection.
     No actual model loading - just test the API connection.
+    Only the first successful validation in a process calls the API.
     """
+    global _preloaded
+
+    if _preloaded:
+        return
+
     try:
         # Test the API with a simple query
         test_embedding = generate_embedding("test")
+        _preloaded = True
         logger.info(f"Embedding API validated (test embedding dimension: {len(test_embedding)})")
     except Exception as e:
         logger.warning(f"Embedding API validation failed: {str(e)}")
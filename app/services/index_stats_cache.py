@@ -0,0 +1,237 @@
+"""
+Cached vector index statistics.
+describe_index_stats() results are reused for a TTL and refreshed in a
+background thread once they expire, so polling /api/stats (or routing
+queries by namespace) does not put a Pinecone call on every request.
+Ingestion in this process adjusts the cached vector counts itself after
+upserts and deletes; ingestion elsewhere is noticed through a change-time
+hook and triggers a refresh.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Name Pinecone reports for the default namespace
+DEFAULT_NAMESPACE = "__default__"
+
+
+def _vector_count(summary) -> int:
+    """Vector count of a namespace summary (SDK object or dict)."""
+    if isinstance(summary, dict):
+        return int(summary.get("vector_count", 0))
+    return int(getattr(summary, "vector_count", 0))
+
+
+class IndexStatsCache:
+    """
+    Stale-while-revalidate cache of index statistics.
+
+    Fresh stats (younger than ttl) are served as is. Expired stats are still
+    served, marked stale, while one background refresh runs. Stats older than
+    max_stale, or a first request, are fetched synchronously.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], object],
+        ttl: float = 30.0,
+        max_stale: float = 600.0,
+        changed_at: Optional[Callable[[], Optional[float]]] = None,
+        check_interval: float = 5.0
+    ):
+        """
+        Args:
+            fetch: Function returning describe_index_stats() output
+            ttl: Seconds stats are served without a refresh
+            max_stale: Seconds after which callers wait for fresh stats
+            changed_at: Function returning the time.time() of the last index change
+                made by another process (None if unknown)
+            check_interval: Minimum seconds between calls to changed_at
+        """
+        self.fetch = fetch
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.changed_at = changed_at
+        self.check_interval = check_interval
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._stats: Optional[Dict] = None
+        self._fetched_at = 0.0
+        self._fetch_started_wall = 0.0
+        self._checked_at = 0.0
+        self._expired = False
+        self._refreshing = False
+        self._last_error: Optional[str] = None
+        # Net adjustment per namespace, in epochs that each begin when a refresh starts;
+        # only epochs since the oldest refresh in flight are kept
+        self._deltas: List[Tuple[float, Dict[Optional[str], int]]] = [(0.0, {})]
+        self.refreshes = 0
+
+    def _refresh(self):
+        """Fetch stats and replace the cached copy, keeping newer local adjustments."""
+        with self._lock:
+            started = time.monotonic()
+            started_wall = time.time()
+            epoch = (started, {})
+            self._deltas.append(epoch)
+        try:
+            raw = self.fetch()
+        except Exception as e:
+            with self._lock:
+                self._last_error = str(e)
+                # Fold the epoch into the previous one, so failed refreshes do not add up
+                position = next((i for i, entry in enumerate(self._deltas) if entry is epoch), 0)
+                if position > 0:
+                    for namespace, delta in epoch[1].items():
+                        self._add_delta(self._deltas[position - 1][1], namespace, delta)
+                    del self._deltas[position]
+            raise
+
+        stats = {
+            "total_vector_count": int(raw.total_vector_count),
+            "dimension": raw.dimension,
+            "namespaces": {
+                name: {"vector_count": _vector_count(summary)}
+                for name, summary in (dict(raw.namespaces) if raw.namespaces else {}).items()
+            }
+        }
+
+        with self._lock:
+            # Adjustments made while the request was in flight may be missing from it
+            self._deltas = [entry for entry in self._deltas if entry[0] >= started]
+            for _, deltas in self._deltas:
+                for namespace, delta in deltas.items():
+                    self._apply(stats, namespace, delta)
+            self._stats = stats
+            self._fetched_at = time.monotonic()
+            self._fetch_started_wall = started_wall
+            self._expired = False
+            self._last_error = None
+            self.refreshes += 1
+
+    def _refresh_in_background(self):
+        def run():
+            try:
+                self._refresh()
+            except Exception as e:
+                logger.warning(f"Background index stats refresh failed: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=run, name="index-stats-refresh", daemon=True).start()
+
+    def get(self, refresh: bool = False) -> Dict:
+        """
+        Get index statistics.
+
+        Args:
+            refresh: Fetch fresh stats before returning
+
+        Returns:
+            Dict with total_vector_count, dimension, namespaces and a cache
+            section (age_seconds, stale, refreshing, adjusted, last_error)
+        """
+        self._check_changed()
+        with self._lock:
+            age = time.monotonic() - self._fetched_at if self._stats is not None else None
+            seen = self._fetched_at
+
+        if refresh or age is None or age > self.max_stale:
+            # One caller fetches; callers that waited behind it reuse its result
+            with self._refresh_lock:
+                if self._fetched_at == seen:
+                    try:
+                        self._refresh()
+                    except Exception as e:
+                        if self._stats is None:
+                            raise
+                        logger.warning(f"Index stats refresh failed, serving stale stats: {str(e)}")
+        elif age > self.ttl or self._expired:
+            self._refresh_in_background()
+
+        return self.snapshot()
+
+    def snapshot(self) -> Dict:
+        """Cached stats with staleness information, without refreshing."""
+        with self._lock:
+            if self._stats is None:
+                return {"total_vector_count": None, "dimension": None, "namespaces": {}, "cache": {"stale": True}}
+            age = time.monotonic() - self._fetched_at
+            return {
+                "total_vector_count": self._stats["total_vector_count"],
+                "dimension": self._stats["dimension"],
+                "namespaces": {name: dict(summary) for name, summary in self._stats["namespaces"].items()},
+                "cache": {
+                    "age_seconds": round(age, 1),
+                    "ttl_seconds": self.ttl,
+                    "stale": self._expired or age > self.ttl,
+                    "refreshing": self._refreshing,
+                    "adjusted": any(any(deltas.values()) for _, deltas in self._deltas),
+                    "last_error": self._last_error
+                }
+            }
+
+    def _check_changed(self):
+        """Expire the stats if another process changed the index since they were fetched."""
+        if self.changed_at is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if self._stats is None or now - self._checked_at < self.check_interval:
+                return
+            self._checked_at = now
+        try:
+            changed = self.changed_at()
+        except Exception as e:
+            logger.debug(f"Could not check for index changes: {str(e)}")
+            return
+        with self._lock:
+            if changed is not None and changed > self._fetch_started_wall:
+                self._expired = True
+
+    @staticmethod
+    def _add_delta(deltas: Dict[Optional[str], int], namespace: Optional[str], delta: int):
+        deltas[namespace] = deltas.get(namespace, 0) + delta
+        if not deltas[namespace]:
+            del deltas[namespace]
+
+    @staticmethod
+    def _apply(stats: Dict, namespace: Optional[str], delta: int):
+        if not namespace:
+            # The default namespace is reported as "" by older indexes
+            namespace = "" if "" in stats["namespaces"] else DEFAULT_NAMESPACE
+        summary = stats["namespaces"].setdefault(namespace, {"vector_count": 0})
+        applied = max(summary["vector_count"] + delta, 0) - summary["vector_count"]
+        summary["vector_count"] += applied
+        stats["total_vector_count"] = max(stats["total_vector_count"] + applied, 0)
+        if summary["vector_count"] == 0:
+            del stats["namespaces"][namespace]
+
+    def adjust(self, namespace: Optional[str], delta: int):
+        """
+        Apply a known change in vector count without asking the index.
+
+        Args:
+            namespace: Namespace name (None for the default namespace)
+            delta: Vectors added (positive) or deleted (negative)
+        """
+        if not delta:
+            return
+        with self._lock:
+            self._add_delta(self._deltas[-1][1], namespace, delta)
+            if self._stats is not None:
+                self._apply(self._stats, namespace, delta)
+
+    def invalidate(self):
+        """Mark the stats stale after a change of unknown size; the next read refreshes them."""
+        with self._lock:
+            self._expired = True
@@ -0,0 +1,370 @@
+"""
+Durable queue of background ingestion jobs.
+The API enqueues jobs and returns at once; a worker claims them by priority
+and records progress. The worker is a thread in each web process by default
+(INGEST_WORKER_IN_PROCESS=1), or a separate process (ingest_worker.py) when
+that is set to 0. Jobs are rows in a SQL table (local SQLite file, or the
+database at INGEST_JOBS_URL when the worker runs elsewhere), so they survive
+restarts, and a
+job whose worker stops sending heartbeats is picked up again by another
+worker. Uploaded PDFs are stored in the same database until their job
+finishes, so the worker never depends on the web server's disk.
+"""
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, create_engine, delete, func, or_, select, update
+from sqlalchemy.engine import Engine
+
+from app.config import Config
+from app.db.session import create_sqlite_engine
+from app.models.ingest_job import IngestJob
+from app.models.ingest_upload import IngestUpload
+
+logger = logging.getLogger(__name__)
+
+# Interactive uploads run before bulk re-ingests
+PRIORITY_INTERACTIVE = 10
+PRIORITY_BULK = 0
+
+# Claim attempts lost to other workers before giving up for this poll
+MAX_CLAIM_RACES = 5
+
+_job_queue: Optional["IngestJobQueue"] = None
+
+
+class IngestJobQueue:
+    """Ingestion jobs with priorities, progress and worker leases."""
+
+    def __init__(self, engine: Engine, lease_seconds: float = 120.0, max_attempts: int = 3):
+        """
+        Args:
+            engine: SQLAlchemy engine (SQLite or PostgreSQL)
+            lease_seconds: Heartbeat silence after which a running job is claimed again
+            max_attempts: Claims after which a job whose worker keeps dying is failed
+        """
+        self.engine = engine
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.table = IngestJob.__table__
+        self.uploads = IngestUpload.__table__
+        self.table.create(engine, checkfirst=True)
+        self.uploads.create(engine, checkfirst=True)
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: Dict,
+        priority: int = PRIORITY_BULK,
+        uploads: Optional[List[Tuple[str, bytes]]] = None
+    ) -> Dict:
+        """
+        Add a job to the queue.
+
+        Args:
+            kind: "files" (uploaded PDFs) or "all" (the source directory)
+            payload: Job arguments: namespace, force
+            priority: Higher priorities are claimed first
+            uploads: Filename and contents of each uploaded PDF ("files" jobs);
+                listed in payload["uploads"] and stored with the job
+
+        Returns:
+            The queued job
+        """
+        job_id = uuid.uuid4().hex
+        now = datetime.utcnow()
+        rows = [
+            {
+                "id": uuid.uuid4().hex, "job_id": job_id, "filename": filename,
+                "size_bytes": len(data), "data": data, "created_at": now
+            }
+            for filename, data in uploads or []
+        ]
+        payload = {**payload, "uploads": [{"id": row["id"], "filename": row["filename"]} for row in rows]}
+
+        # Uploads and job are committed together, so a claimed job always has its files
+        with self.engine.begin() as connection:
+            if rows:
+                connection.execute(self.uploads.insert(), rows)
+            connection.execute(self.table.insert().values(
+                id=job_id,
+                kind=kind,
+                priority=priority,
+                status="queued",
+                payload=json.dumps(payload),
+                progress=json.dumps({"files_total": len(rows) or None, "files_done": 0, "results": []}),
+                attempts=0,
+                created_at=now
+            ))
+        logger.info(f"Queued ingestion job {job_id} ({kind}, priority {priority})")
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """
+        Get a job.
+
+        Returns:
+            Job as a dict (JSON fields decoded, queue_position for queued jobs),
+            or None if unknown
+        """
+        with self.engine.connect() as connection:
+            row = connection.execute(select(self.table).where(self.table.c.id == job_id)).mappings().first()
+            if row is None:
+                return None
+            job = self._to_dict(row)
+            if row["status"] == "queued":
+                job["queue_position"] = connection.execute(
+                    select(func.count()).select_from(self.table).where(
+                        self.table.c.status == "queued",
+                        or_(
+                            self.table.c.priority > row["priority"],
+                            and_(self.table.c.priority == row["priority"], self.table.c.created_at < row["created_at"])
+                        )
+                    )
+                ).scalar() + 1
+        return job
+
+    def recent(self, limit: int = 20, status: Optional[str] = None) -> List[Dict]:
+        """
+        List the most recently created jobs.
+
+        Args:
+            limit: Maximum number of jobs
+            status: Only jobs with this status
+
+        Returns:
+            Jobs, newest first
+        """
+        query = select(self.table).order_by(self.table.c.created_at.desc()).limit(limit)
+        if status is not None:
+            query = query.where(self.table.c.status == status)
+        with self.engine.connect() as connection:
+            return [self._to_dict(row) for row in connection.execute(query).mappings()]
+
+    def _claimable(self, now: datetime):
+        stale = now - timedelta(seconds=self.lease_seconds)
+        return or_(
+            self.table.c.status == "queued",
+            and_(self.table.c.status == "running", self.table.c.heartbeat_at < stale)
+        )
+
+    def claim(self, worker_id: str) -> Optional[Dict]:
+        """
+        Take the next job: highest priority first, then oldest. Running jobs
+        whose worker stopped sending heartbeats are taken over.
+
+        Args:
+            worker_id: Identifier of the claiming worker
+
+        Returns:
+            The claimed job, or None if the queue is empty
+        """
+        now = datetime.utcnow()
+        abandoned = (
+            self.table.c.status == "running",
+            self.table.c.heartbeat_at < now - timedelta(seconds=self.lease_seconds),
+            self.table.c.attempts >= self.max_attempts
+        )
+        with self.engine.begin() as connection:
+            # Jobs that keep killing their worker are failed rather than retried forever
+            failed = connection.execute(select(self.table.c.id).where(*abandoned)).scalars().all()
+            if failed:
+                connection.execute(
+                    update(self.table)
+                    .where(self.table.c.id.in_(failed), *abandoned)
+                    .values(status="error", error="Worker stopped responding", worker_id=None, finished_at=now)
+                )
+                connection.execute(delete(self.uploads).where(
+                    self.uploads.c.job_id.in_(
+                        select(self.table.c.id).where(self.table.c.id.in_(failed), self.table.c.status == "error")
+                    )
+                ))
+        if failed:
+            logger.warning(f"Failed {len(failed)} ingestion job(s) after {self.max_attempts} lost workers")
+
+        for _ in range(MAX_CLAIM_RACES):
+            with self.engine.begin() as connection:
+                job_id = connection.execute(
+                    select(self.table.c.id)
+                    .where(self._claimable(now))
+                    .order_by(self.table.c.priority.desc(), self.table.c.created_at)
+                    .limit(1)
+                ).scalar()
+                if job_id is None:
+                    return None
+
+                # Conditional update: of several workers racing for the job, one wins
+                claimed = connection.execute(
+                    update(self.table)
+                    .where(self.table.c.id == job_id, self._claimable(now))
+                    .values(
+                        status="running",
+                        worker_id=worker_id,
+                        attempts=self.table.c.attempts + 1,
+                        started_at=func.coalesce(self.table.c.started_at, now),
+                        heartbeat_at=now
+                    )
+                ).rowcount
+            if claimed:
+                return self.get(job_id)
+            now = datetime.utcnow()
+
+        return None
+
+    def heartbeat(self, job_id: str, worker_id: str, progress: Optional[Dict] = None) -> bool:
+        """
+        Extend a worker's lease on a job, optionally recording progress.
+
+        Returns:
+            False if the job is no longer held by this worker
+        """
+        values = {"heartbeat_at": datetime.utcnow()}
+        if progress is not None:
+            values["progress"] = json.dumps(progress)
+        return self._update_own(job_id, worker_id, values)
+
+    def finish(
+        self,
+        job_id: str,
+        worker_id: str,
+        status: str,
+        result: Optional[Dict] = None,
+        error: Optional[str] = None
+    ) -> bool:
+        """
+        Record the outcome of a job.
+
+        Args:
+            job_id: Job ID
+            worker_id: Worker holding the job
+            status: "success", "partial" or "error"
+            result: JSON-serializable summary
+            error: Error message
+
+        Returns:
+            False if the job is no longer held by this worker
+        """
+        now = datetime.utcnow()
+        return self._update_own(job_id, worker_id, {
+            "status": status,
+            "result": json.dumps(result) if result is not None else None,
+            "error": error,
+            "finished_at": now,
+            "heartbeat_at": now
+        })
+
+    def requeue(self, job_id: str, worker_id: str, progress: Optional[Dict] = None) -> bool:
+        """
+        Put a running job back in the queue, e.g. to let higher-priority jobs run first.
+        The requeue does not count as a failed attempt.
+
+        Returns:
+            False if the job is no longer held by this worker
+        """
+        values = {"status": "queued", "worker_id": None, "attempts": self.table.c.attempts - 1}
+        if progress is not None:
+            values["progress"] = json.dumps(progress)
+        return self._update_own(job_id, worker_id, values)
+
+    def upload_data(self, upload_id: str) -> bytes:
+        """
+        Get the contents of an uploaded file.
+
+        Raises:
+            KeyError: If the upload does not exist (its job already finished)
+        """
+        with self.engine.connect() as connection:
+            data = connection.execute(select(self.uploads.c.data).where(self.uploads.c.id == upload_id)).scalar()
+        if data is None:
+            raise KeyError(f"Upload {upload_id} not found")
+        return bytes(data)
+
+    def delete_uploads(self, job_id: str) -> int:
+        """
+        Delete the uploaded files of a finished job.
+
+        Returns:
+            Number of files deleted
+        """
+        with self.engine.begin() as connection:
+            return connection.execute(delete(self.uploads).where(self.uploads.c.job_id == job_id)).rowcount
+
+    def last_finished_at(self) -> Optional[float]:
+        """
+        Time the most recent job finished.
+
+        Returns:
+            time.time() timestamp, or None if no job has finished
+        """
+        with self.engine.connect() as connection:
+            finished_at = connection.execute(select(func.max(self.table.c.finished_at))).scalar()
+        if finished_at is None:
+            return None
+        return finished_at.replace(tzinfo=timezone.utc).timestamp()
+
+    def has_waiting(self, above_priority: int) -> bool:
+        """Check whether a queued job outranks the given priority."""
+        query = select(self.table.c.id).where(
+            self.table.c.status == "queued",
+            self.table.c.priority > above_priority
+        ).limit(1)
+        with self.engine.connect() as connection:
+            return connection.execute(query).first() is not None
+
+    def _update_own(self, job_id: str, worker_id: str, values: Dict) -> bool:
+        with self.engine.begin() as connection:
+            return connection.execute(
+                update(self.table)
+                .where(
+                    self.table.c.id == job_id,
+                    self.table.c.worker_id == worker_id,
+                    self.table.c.status == "running"
+                )
+                .values(**values)
+            ).rowcount == 1
+
+    @staticmethod
+    def _to_dict(row) -> Dict:
+        job = dict(row)
+        for key in ("payload", "progress", "result"):
+            job[key] = json.loads(job[key]) if job[key] else None
+        for key in ("created_at", "started_at", "heartbeat_at", "finished_at"):
+            if job[key] is not None:
+                job[key] = job[key].isoformat()
+        return job
+
+
+def get_ingest_job_queue() -> IngestJobQueue:
+    """
+    Get or open the configured ingestion job queue.
+    Jobs are kept in the database at INGEST_JOBS_URL, which every web and
+    worker process must share, or by default in a local SQLite file at
+    INGEST_JOBS_PATH (only reachable from this machine).
+
+    Returns:
+        IngestJobQueue instance
+    """
+    global _job_queue
+
+    if _job_queue is None:
+        url = Config.INGEST_JOBS_URL
+        if not url:
+            engine = create_sqlite_engine(Config.INGEST_JOBS_PATH)
+        elif url == Config.DATABASE_URL:
+            from app.db.session import get_engine
+            engine = get_engine()
+        elif url.startswith("sqlite:///"):
+            engine = create_sqlite_engine(url[len("sqlite:///"):])
+        else:
+            engine = create_engine(url, pool_pre_ping=True, pool_recycle=300)
+        _job_queue = IngestJobQueue(
+            engine,
+            lease_seconds=Config.INGEST_JOB_LEASE_SECONDS,
+            max_attempts=Config.INGEST_JOB_MAX_ATTEMPTS
+        )
+        logger.info(f"Using {engine.dialect.name} ingestion job queue")
+
+    return _job_queue
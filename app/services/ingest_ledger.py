@@ -0,0 +1,275 @@
+"""
+Ingestion ledger.
+Records, per source file, the content hash, doc_id, chunk count, stored
+vector IDs, status and timings of its last ingest in a SQL table (local
+SQLite file or the application's Postgres database). State changes are
+single conditional statements, so concurrent ingests - threads, processes
+or nodes sharing the database - never both claim the same file.
+"""
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.engine import Engine
+
+from app.config import Config
+from app.db.session import create_sqlite_engine
+from app.models.ingest_record import IngestRecord
+from app.utils.id_generator import generate_doc_id
+
+logger = logging.getLogger(__name__)
+
+# JSON cache of processed files that the ledger replaces; imported once
+LEGACY_CACHE_PATH = ".processed_files.json"
+
+_ledger: Optional["IngestLedger"] = None
+
+
+class IngestLedger:
+    """Per-file ingestion state keyed by filename."""
+
+    def __init__(self, engine: Engine, lease_seconds: float = 3600.0):
+        """
+        Args:
+            engine: SQLAlchemy engine (SQLite or PostgreSQL)
+            lease_seconds: Age after which a "processing" claim counts as abandoned
+        """
+        self.engine = engine
+        self.lease_seconds = lease_seconds
+        self.table = IngestRecord.__table__
+        self.table.create(engine, checkfirst=True)
+
+        if engine.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        self._insert = insert
+
+    def is_processed(self, filename: str, file_hash: str) -> bool:
+        """
+        Check if a file was ingested successfully with this content.
+
+        Args:
+            filename: Name of the PDF file
+            file_hash: SHA-256 hash of file contents
+
+        Returns:
+            True if the file's last ingest succeeded with the same hash
+        """
+        query = select(self.table.c.status).where(
+            self.table.c.filename == filename,
+            self.table.c.file_hash == file_hash
+        )
+        with self.engine.connect() as connection:
+            return connection.execute(query).scalar() == "success"
+
+    def get(self, filename: str) -> Optional[Dict]:
+        """
+        Get the ledger record of a file.
+
+        Returns:
+            Record as a dict (vector_ids decoded), or None if the file is unknown
+        """
+        with self.engine.connect() as connection:
+            row = connection.execute(select(self.table).where(self.table.c.filename == filename)).mappings().first()
+        return self._to_dict(row) if row else None
+
+    def records(self, status: Optional[str] = None) -> List[Dict]:
+        """
+        List ledger records, optionally only those with a given status.
+
+        Returns:
+            Records ordered by filename
+        """
+        query = select(self.table).order_by(self.table.c.filename)
+        if status is not None:
+            query = query.where(self.table.c.status == status)
+        with self.engine.connect() as connection:
+            return [self._to_dict(row) for row in connection.execute(query).mappings()]
+
+    def begin(
+        self,
+        filename: str,
+        file_hash: str,
+        doc_id: str,
+        namespace: Optional[str] = None,
+        force: bool = False
+    ) -> Optional[str]:
+        """
+        Claim a file for ingestion.
+        Fails if the file is being ingested elsewhere (and its claim has not
+        expired) or, unless force is set, if it was already ingested
+        successfully with the same content.
+
+        Args:
+            filename: Name of the PDF file
+            file_hash: SHA-256 hash of file contents
+            doc_id: Document ID (recorded for new files; finish() updates it)
+            namespace: Namespace the file is ingested into
+            force: Claim even if the same content was already ingested
+
+        Returns:
+            Claim ID to pass to finish(), or None if the file was not claimed
+        """
+        now = datetime.utcnow()
+        claim_id = uuid.uuid4().hex
+        claim = {
+            "file_hash": file_hash,
+            "namespace": namespace,
+            "status": "processing",
+            "claim_id": claim_id,
+            "error": None,
+            "started_at": now,
+            "finished_at": None,
+            "duration_seconds": None,
+            "updated_at": now
+        }
+
+        with self.engine.begin() as connection:
+            inserted = connection.execute(
+                self._insert(self.table)
+                .values(filename=filename, doc_id=doc_id, attempts=1, **claim)
+                .on_conflict_do_nothing(index_elements=["filename"])
+            ).rowcount
+            if inserted:
+                return claim_id
+
+            conditions = [
+                self.table.c.filename == filename,
+                or_(
+                    self.table.c.status != "processing",
+                    self.table.c.started_at < now - timedelta(seconds=self.lease_seconds)
+                )
+            ]
+            if not force:
+                conditions.append(or_(self.table.c.status != "success", self.table.c.file_hash != file_hash))
+
+            updated = connection.execute(
+                update(self.table).where(*conditions).values(attempts=self.table.c.attempts + 1, **claim)
+            ).rowcount
+
+        return claim_id if updated else None
+
+    def finish(
+        self,
+        filename: str,
+        claim_id: str,
+        status: str,
+        doc_id: Optional[str] = None,
+        chunks: Optional[int] = None,
+        vector_ids: Optional[List[str]] = None,
+        error: Optional[str] = None
+    ) -> bool:
+        """
+        Record the outcome of a claimed ingest.
+
+        Args:
+            filename: Name of the PDF file
+            claim_id: Claim returned by begin()
+            status: "success", "partial", "warning" or "error"
+            doc_id: Document ID the vectors are stored under (unchanged if None)
+            chunks: Number of chunks in the file (unchanged if None)
+            vector_ids: IDs of the vectors now stored for the file (unchanged if None)
+            error: Error or warning message
+
+        Returns:
+            False if the claim was lost (expired and taken over by another ingest)
+        """
+        now = datetime.utcnow()
+        values = {"status": status, "error": error, "claim_id": None, "finished_at": now, "updated_at": now}
+        if doc_id is not None:
+            values["doc_id"] = doc_id
+        if chunks is not None:
+            values["chunks"] = chunks
+        if vector_ids is not None:
+            values["vector_ids"] = json.dumps(vector_ids)
+
+        claimed = (self.table.c.filename == filename, self.table.c.claim_id == claim_id)
+        with self.engine.begin() as connection:
+            started_at = connection.execute(select(self.table.c.started_at).where(*claimed)).scalar()
+            if started_at is None:
+                logger.warning(f"Ledger claim on {filename} was lost; not recording status {status}")
+                return False
+            values["duration_seconds"] = round((now - started_at).total_seconds(), 3)
+            return connection.execute(update(self.table).where(*claimed).values(**values)).rowcount == 1
+
+    def import_json(self, path: str) -> int:
+        """
+        Import a legacy .processed_files.json (filename -> hash) as successful ingests.
+        Files already in the ledger are left untouched.
+
+        Args:
+            path: Path of the JSON cache
+
+        Returns:
+            Number of files imported
+        """
+        with open(path, "r") as f:
+            processed = json.load(f)
+
+        now = datetime.utcnow()
+        rows = [
+            {
+                # Files in the JSON cache were ingested under the content-hash doc_id
+                "filename": filename, "file_hash": file_hash, "doc_id": generate_doc_id(filename, file_hash),
+                "namespace": None, "status": "success", "chunks": 0, "vector_ids": "[]", "attempts": 1,
+                "updated_at": now
+            }
+            for filename, file_hash in processed.items()
+        ]
+        if not rows:
+            return 0
+
+        with self.engine.begin() as connection:
+            return connection.execute(
+                self._insert(self.table).values(rows).on_conflict_do_nothing(index_elements=["filename"])
+            ).rowcount
+
+    @staticmethod
+    def _to_dict(row) -> Dict:
+        record = dict(row)
+        record["vector_ids"] = json.loads(record["vector_ids"] or "[]")
+        return record
+
+
+def get_ingest_ledger() -> IngestLedger:
+    """
+    Get or open the configured ingestion ledger.
+    INGEST_LEDGER_BACKEND is "sqlite" (local file at INGEST_LEDGER_PATH) or
+    "postgres" (DATABASE_URL, shared by every node). A legacy
+    .processed_files.json is imported on first use and renamed.
+
+    Returns:
+        IngestLedger instance
+    """
+    global _ledger
+
+    if _ledger is None:
+        if Config.INGEST_LEDGER_BACKEND == "postgres":
+            from app.db.session import get_engine
+            engine = get_engine()
+        elif Config.INGEST_LEDGER_BACKEND == "sqlite":
+            engine = create_sqlite_engine(Config.INGEST_LEDGER_PATH)
+        else:
+            raise ValueError(f"Unknown INGEST_LEDGER_BACKEND: {Config.INGEST_LEDGER_BACKEND}")
+        ledger = IngestLedger(engine, lease_seconds=Config.INGEST_LEDGER_LEASE_SECONDS)
+
+        legacy_cache = Path(LEGACY_CACHE_PATH)
+        if legacy_cache.exists():
+            try:
+                imported = ledger.import_json(str(legacy_cache))
+                legacy_cache.rename(legacy_cache.with_name(legacy_cache.name + ".migrated"))
+                logger.info(f"Imported {imported} processed files from {legacy_cache} into the ingestion ledger")
+            except FileNotFoundError:
+                pass  # Imported by another process
+            except Exception as e:
+                logger.warning(f"Could not import {legacy_cache}: {str(e)}")
+
+        _ledger = ledger
+        logger.info(f"Using {Config.INGEST_LEDGER_BACKEND} ingestion ledger")
+
+    return _ledger
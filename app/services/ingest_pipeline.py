@@ -0,0 +1,212 @@
+"""
+Pipelined embed-and-upsert stage for ingestion.
+One thread embeds chunk batches while upsert workers write finished
+vectors to the index; bounded queues between the stages apply
+backpressure, so total time approaches the slower stage instead of
+the sum of both.
+"""
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of a queue
+_DONE = object()
+
+
+class StageStats:
+    """Thread-safe counters for one pipeline stage."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.batches = 0
+        self.items = 0
+        self.failed_batches = 0
+        self.busy_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, items: int, busy: float, failed: bool = False):
+        with self._lock:
+            self.batches += 1
+            self.busy_seconds += busy
+            if failed:
+                self.failed_batches += 1
+            else:
+                self.items += items
+
+    def record_blocked(self, seconds: float):
+        with self._lock:
+            self.blocked_seconds += seconds
+
+    def to_dict(self, wall_seconds: float) -> Dict:
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "failed_batches": self.failed_batches,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "items_per_busy_second": round(self.items / self.busy_seconds, 1) if self.busy_seconds else None,
+            "items_per_second": round(self.items / wall_seconds, 1) if wall_seconds else None
+        }
+
+
+class EmbedUpsertPipeline:
+    """
+    Two-stage producer/consumer pipeline: embed -> upsert.
+
+    Batches flow through two bounded queues: pending batches to the embed
+    thread, and embedded batches to the upsert workers. A failed batch is
+    logged and skipped; batches whose upsert failed are handed, with their
+    vectors, to on_upsert_failure so they can be retried later.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[List[str]], np.ndarray],
+        upsert: Callable[[List[Dict]], None],
+        queue_size: int = 4,
+        upsert_workers: int = 2,
+        text_key: Optional[str] = "text",
+        on_upsert_failure: Optional[Callable[[List[Dict], Exception], None]] = None
+    ):
+        """
+        Args:
+            embed: Function embedding a list of texts into a 2-D array
+            upsert: Function writing a list of vector records to the index
+            queue_size: Maximum batches waiting between stages
+            upsert_workers: Number of concurrent upsert threads
+            text_key: Metadata key that stores the chunk text (None keeps text out of the metadata)
+            on_upsert_failure: Called with the records and error of a failed upsert
+        """
+        self.embed = embed
+        self.upsert = upsert
+        self.queue_size = max(1, queue_size)
+        self.upsert_workers = max(1, upsert_workers)
+        self.text_key = text_key
+        self.on_upsert_failure = on_upsert_failure
+
+    def _embed_stage(self, inbox: queue.Queue, outbox: queue.Queue, stats: StageStats):
+        """Embed batches from inbox and pass them on to outbox."""
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+
+            batch_number, batch_ids, batch_docs = item
+            started = time.monotonic()
+            try:
+                vectors = self.embed([doc.page_content for doc in batch_docs])
+            except Exception as e:
+                stats.record(len(batch_docs), time.monotonic() - started, failed=True)
+                logger.error(f"Failed to embed batch {batch_number}: {str(e)}")
+                continue
+            stats.record(len(batch_docs), time.monotonic() - started)
+
+            blocked = time.monotonic()
+            outbox.put((batch_number, batch_ids, batch_docs, vectors))
+            stats.record_blocked(time.monotonic() - blocked)
+
+        for _ in range(self.upsert_workers):
+            outbox.put(_DONE)
+
+    def _upsert_stage(self, inbox: queue.Queue, stats: StageStats, done_ids: Dict[int, List[str]]):
+        """Upsert embedded batches from inbox until the end marker arrives."""
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+
+            batch_number, batch_ids, batch_docs, vectors = item
+            records = [
+                {
+                    "id": vector_id,
+                    "values": values,
+                    "metadata": {**doc.metadata, self.text_key: doc.page_content} if self.text_key else dict(doc.metadata)
+                }
+                for vector_id, values, doc in zip(batch_ids, vectors, batch_docs)
+            ]
+            started = time.monotonic()
+            try:
+                self.upsert(records)
+            except Exception as e:
+                stats.record(len(batch_docs), time.monotonic() - started, failed=True)
+                logger.error(f"Failed to upsert batch {batch_number}: {str(e)}")
+                if self.on_upsert_failure is not None:
+                    try:
+                        self.on_upsert_failure(records, e)
+                    except Exception as handler_error:
+                        logger.error(f"Could not hand off failed batch {batch_number}: {str(handler_error)}")
+                continue
+
+            stats.record(len(batch_docs), time.monotonic() - started)
+            done_ids[batch_number] = batch_ids
+            logger.debug(f"Added batch {batch_number}: {len(batch_docs)} documents")
+
+    def run(
+        self,
+        batches: Iterable[Tuple[List[str], List[Document]]],
+        stats: Optional[Dict] = None
+    ) -> List[str]:
+        """
+        Embed and upsert batches of documents.
+
+        Args:
+            batches: (vector ids, documents) pairs; consumed lazily
+            stats: Optional dict filled with per-stage throughput
+
+        Returns:
+            IDs of the vectors that were upserted, in input order
+        """
+        embed_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        upsert_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        embed_stats = StageStats("embed")
+        upsert_stats = StageStats("upsert")
+        done_ids: Dict[int, List[str]] = {}
+
+        started = time.monotonic()
+        threads = [threading.Thread(
+            target=self._embed_stage,
+            args=(embed_queue, upsert_queue, embed_stats),
+            name="ingest-embed",
+            daemon=True
+        )]
+        threads.extend(
+            threading.Thread(
+                target=self._upsert_stage,
+                args=(upsert_queue, upsert_stats, done_ids),
+                name=f"ingest-upsert-{i}",
+                daemon=True
+            )
+            for i in range(self.upsert_workers)
+        )
+        for thread in threads:
+            thread.start()
+
+        try:
+            for batch_number, (batch_ids, batch_docs) in enumerate(batches, 1):
+                embed_queue.put((batch_number, batch_ids, batch_docs))
+        finally:
+            embed_queue.put(_DONE)
+            for thread in threads:
+                thread.join()
+
+        wall_seconds = time.monotonic() - started
+        if stats is not None:
+            stats.update({
+                "wall_seconds": round(wall_seconds, 3),
+                "embed": embed_stats.to_dict(wall_seconds),
+                "upsert": upsert_stats.to_dict(wall_seconds)
+            })
+
+        logger.info(
+            f"Pipeline finished in {wall_seconds:.2f}s "
+            f"(embed busy {embed_stats.busy_seconds:.2f}s, upsert busy {upsert_stats.busy_seconds:.2f}s)"
+        )
+        return [vector_id for number in sorted(done_ids) for vector_id in done_ids[number]]
@@ -0,0 +1,104 @@
+"""
+Local in-process embedding backend.
+Deterministic feature-hashing encoder built on NumPy - no network, no model files.
+Useful for offline ingestion, CI and load tests, and latency-sensitive query embedding.
+"""
+import hashlib
+import logging
+import re
+from typing import List
+import numpy as np
+from app.services.embeddings import EmbeddingBackend, normalize_rows
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+class HashingEmbeddings(EmbeddingBackend):
+    """
+    Signed feature-hashing text encoder.
+
+    Each text is mapped to word unigrams, word bigrams and character
+    trigrams; every feature is hashed to a bucket and a sign, weighted
+    with sublinear term frequency, and the result is L2-normalized.
+    Identical texts always produce identical vectors.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dimension: int):
+        """
+        Args:
+            dimension: Output vector dimension
+        """
+        self.dimension = dimension
+        logger.info(f"Initialized local hashing embeddings (dimension {dimension})")
+
+    def _features(self, text: str) -> List[str]:
+        """Extract hashed features from a text."""
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        features = [f"w:{token}" for token in tokens]
+        features.extend(f"b:{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+        for token in tokens:
+            padded = f"#{token}#"
+            features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+
+        return features
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Encode texts into a normalized float32 array."""
+        vectors = np.zeros((len(texts), self.dimension), dtype=np.float32)
+
+        for row, text in enumerate(texts):
+            counts = {}
+            for feature in self._features(text):
+                counts[feature] = counts.get(feature, 0) + 1
+
+            if not counts:
+                continue
+
+            digests = [
+                int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                for feature in counts
+            ]
+            hashes = np.array(digests, dtype=np.uint64)
+            buckets = (hashes % np.uint64(self.dimension)).astype(np.intp)
+            signs = np.where((hashes >> np.uint64(63)) & np.uint64(1), -1.0, 1.0).astype(np.float32)
+            weights = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float32, count=len(counts)))
+            np.add.at(vectors[row], buckets, signs * weights)
+
+        return normalize_rows(self._check_dimension(vectors))
+
+    def embed_documents_array(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed a list of documents as a float32 array.
+
+        Args:
+            texts: List of texts to embed
+
+        Returns:
+            float32 array of shape (len(texts), dimension)
+        """
+        return self._encode(texts)
+
+    def embed_query_array(self, text: str) -> np.ndarray:
+        """
+        Embed a single query text as a float32 array.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            float32 array of shape (dimension,)
+        """
+        return self._encode([text])[0]
+
+    async def aembed_documents_array(self, texts: List[str]) -> np.ndarray:
+        """CPU-only and fast, so computed inline rather than in a thread."""
+        return self._encode(texts)
+
+    async def aembed_query_array(self, text: str) -> np.ndarray:
+        """CPU-only and fast, so computed inline rather than in a thread."""
+        return self._encode([text])[0]
@@ -0,0 +1,587 @@
+"""
+In-process vector store engine built on NumPy.
+LocalIndex implements the part of the Pinecone Index API this app uses
+(upsert, query, fetch, list, delete, describe_index_stats), so it plugs
+into PineconeVectorStore and the direct upsert/delete helpers unchanged.
+Vectors are stored as L2-normalized float32 rows (EMBEDDING_QUANTIZATION
+only compacts the embedding caches) and searched exactly (flat) or through
+an inverted-file index of k-means clusters (IVF).
+Each namespace is persisted to its own .npz file.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+from urllib.parse import quote, unquote
+
+import numpy as np
+
+from app.services.embeddings import normalize_rows
+
+logger = logging.getLogger(__name__)
+
+# Name Pinecone reports for the default namespace
+DEFAULT_NAMESPACE = "__default__"
+
+# Vectors scored per matrix multiplication when assigning rows to clusters
+_ASSIGN_BLOCK = 65536
+
+
+def matches_filter(metadata: Dict, metadata_filter: Optional[Dict]) -> bool:
+    """
+    Evaluate a Pinecone metadata filter against one record's metadata.
+    Supports $eq, $ne, $gt, $gte, $lt, $lte, $in, $nin, $exists, $and and $or;
+    a bare value means $eq.
+
+    Args:
+        metadata: Record metadata
+        metadata_filter: Pinecone filter dict (None matches everything)
+
+    Returns:
+        True if the record matches
+    """
+    if not metadata_filter:
+        return True
+
+    for key, condition in metadata_filter.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, part) for part in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(matches_filter(metadata, part) for part in condition):
+                return False
+            continue
+
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        value = metadata.get(key)
+
+        for operator, operand in condition.items():
+            if operator == "$exists":
+                ok = (key in metadata) == bool(operand)
+            elif operator == "$eq":
+                ok = value == operand
+            elif operator == "$ne":
+                ok = value != operand
+            elif operator == "$in":
+                ok = value in operand
+            elif operator == "$nin":
+                ok = value not in operand
+            elif value is None:
+                ok = False
+            elif operator == "$gt":
+                ok = value > operand
+            elif operator == "$gte":
+                ok = value >= operand
+            elif operator == "$lt":
+                ok = value < operand
+            elif operator == "$lte":
+                ok = value <= operand
+            else:
+                raise ValueError(f"Unsupported filter operator: {operator}")
+            if not ok:
+                return False
+
+    return True
+
+
+def _done(value: Any) -> Future:
+    """Wrap a result in a completed future (stands in for async_req responses)."""
+    future: Future = Future()
+    future.set_result(value)
+    return future
+
+
+def _record_fields(record) -> tuple:
+    """Normalize a dict or (id, values[, metadata]) tuple record."""
+    if isinstance(record, dict):
+        return record["id"], record["values"], record.get("metadata") or {}
+    if len(record) == 3:
+        return record[0], record[1], record[2] or {}
+    return record[0], record[1], {}
+
+
+class _Namespace:
+    """Vectors, IDs and metadata of one namespace, plus its IVF clustering."""
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+        self.size = 0
+        self.vectors = np.empty((0, dimension), dtype=np.float32)
+        self.assign = np.empty(0, dtype=np.int32)
+        self.ids: List[str] = []
+        self.metadata: List[Dict] = []
+        self.rows: Dict[str, int] = {}
+        self.centroids: Optional[np.ndarray] = None
+        self.trained_size = 0
+
+    def _reserve(self, count: int):
+        """Grow the row buffers geometrically to fit count more rows."""
+        needed = self.size + count
+        if needed <= len(self.vectors):
+            return
+        capacity = max(needed, 2 * len(self.vectors), 1024)
+        vectors = np.empty((capacity, self.dimension), dtype=np.float32)
+        vectors[:self.size] = self.vectors[:self.size]
+        assign = np.full(capacity, -1, dtype=np.int32)
+        assign[:self.size] = self.assign[:self.size]
+        self.vectors, self.assign = vectors, assign
+
+    def _nearest_centroid(self, vectors: np.ndarray) -> np.ndarray:
+        return np.argmax(vectors @ self.centroids.T, axis=1).astype(np.int32)
+
+    def upsert(self, ids: List[str], vectors: np.ndarray, metadata: List[Dict]) -> int:
+        """Insert or overwrite rows; vectors must be normalized."""
+        self._reserve(len(ids))
+        assign = self._nearest_centroid(vectors) if self.centroids is not None else None
+
+        for i, (vector_id, meta) in enumerate(zip(ids, metadata)):
+            row = self.rows.get(vector_id)
+            if row is None:
+                row = self.size
+                self.size += 1
+                self.rows[vector_id] = row
+                self.ids.append(vector_id)
+                self.metadata.append(meta)
+            else:
+                self.metadata[row] = meta
+            self.vectors[row] = vectors[i]
+            self.assign[row] = assign[i] if assign is not None else -1
+
+        return len(ids)
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """Remove rows by moving the last row into each freed slot."""
+        deleted = 0
+        for vector_id in ids:
+            row = self.rows.pop(vector_id, None)
+            if row is None:
+                continue
+            last = self.size - 1
+            if row != last:
+                moved_id = self.ids[last]
+                self.vectors[row] = self.vectors[last]
+                self.assign[row] = self.assign[last]
+                self.ids[row] = moved_id
+                self.metadata[row] = self.metadata[last]
+                self.rows[moved_id] = row
+            self.ids.pop()
+            self.metadata.pop()
+            self.size -= 1
+            deleted += 1
+        return deleted
+
+    def train(self, n_lists: int, iterations: int = 10, seed: int = 0):
+        """Cluster the rows with spherical k-means and assign every row to a list."""
+        matrix = self.vectors[:self.size]
+        rng = np.random.default_rng(seed)
+        sample = matrix[rng.choice(self.size, size=min(self.size, 64 * n_lists), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = ~sums.any(axis=1)
+            # Re-seed empty clusters with random sample points
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = normalize_rows(sums)
+
+        self.centroids = centroids.astype(np.float32)
+        for start in range(0, self.size, _ASSIGN_BLOCK):
+            block = matrix[start:start + _ASSIGN_BLOCK]
+            self.assign[start:start + len(block)] = self._nearest_centroid(block)
+        self.trained_size = self.size
+
+    def search(
+        self,
+        query: np.ndarray,
+        top_k: int,
+        metadata_filter: Optional[Dict],
+        n_probe: Optional[int]
+    ) -> List[tuple]:
+        """
+        Score rows against a normalized query.
+
+        Args:
+            query: Normalized query vector
+            top_k: Number of matches
+            metadata_filter: Optional Pinecone filter
+            n_probe: Clusters to scan (None for exact search)
+
+        Returns:
+            (row, score) pairs, best first
+        """
+        matrix = self.vectors[:self.size]
+        if n_probe and self.centroids is not None:
+            # Lookup table over cluster ids; the extra last slot keeps unassigned rows (-1) searchable
+            probed = np.zeros(len(self.centroids) + 1, dtype=bool)
+            probed[np.argsort(-(self.centroids @ query))[:n_probe]] = True
+            probed[-1] = True
+            candidates = np.flatnonzero(probed[self.assign[:self.size]])
+            scores = matrix[candidates] @ query
+        else:
+            candidates = None
+            scores = matrix @ query
+
+        if metadata_filter is None and top_k < len(scores):
+            order = np.argpartition(-scores, top_k)[:top_k]
+            order = order[np.argsort(-scores[order])]
+        else:
+            order = np.argsort(-scores)
+
+        matches = []
+        for position in order:
+            row = int(candidates[position]) if candidates is not None else int(position)
+            if matches_filter(self.metadata[row], metadata_filter):
+                matches.append((row, float(scores[position])))
+                if len(matches) == top_k:
+                    break
+        return matches
+
+    def save(self, path: Path):
+        """Write the namespace atomically to an .npz file."""
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                vectors=self.vectors[:self.size],
+                assign=self.assign[:self.size],
+                centroids=self.centroids if self.centroids is not None else np.empty((0, self.dimension), np.float32),
+                trained_size=np.int64(self.trained_size),
+                ids=np.array(json.dumps(self.ids)),
+                metadata=np.array(json.dumps(self.metadata, default=str))
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "_Namespace":
+        """Read a namespace written by save()."""
+        with np.load(path) as data:
+            namespace = cls(data["vectors"].shape[1])
+            namespace.size = len(data["vectors"])
+            namespace.vectors = data["vectors"].astype(np.float32)
+            namespace.assign = data["assign"].astype(np.int32)
+            namespace.centroids = data["centroids"] if len(data["centroids"]) else None
+            namespace.trained_size = int(data["trained_size"])
+            namespace.ids = json.loads(str(data["ids"]))
+            namespace.metadata = json.loads(str(data["metadata"]))
+        namespace.rows = {vector_id: row for row, vector_id in enumerate(namespace.ids)}
+        return namespace
+
+
+class LocalIndex:
+    """
+    Pinecone-compatible index held in process memory.
+
+    Writes are persisted per namespace after a short delay (and at exit), so a
+    burst of upserts during ingestion costs one write. Other processes sharing
+    the directory pick up changes when they next read a namespace; concurrent
+    writers to the same namespace are not supported.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        dimension: int,
+        mode: str = "flat",
+        ivf_lists: int = 0,
+        ivf_probe: int = 8,
+        ivf_min_vectors: int = 5000,
+        flush_seconds: float = 1.0
+    ):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: Directory holding one .npz file per namespace
+            dimension: Vector dimension
+            mode: "flat" (exact) or "ivf" (approximate, clustered)
+            ivf_lists: Number of IVF clusters (0 picks sqrt of the vector count)
+            ivf_probe: Clusters scanned per query in IVF mode
+            ivf_min_vectors: Namespaces smaller than this are always searched exactly
+            flush_seconds: Delay before pending writes are persisted
+        """
+        if mode not in ("flat", "ivf"):
+            raise ValueError(f"Unknown local vector index mode: {mode}")
+
+        self.path = Path(path)
+        self.dimension = dimension
+        self.mode = mode
+        self.ivf_lists = ivf_lists
+        self.ivf_probe = ivf_probe
+        self.ivf_min_vectors = ivf_min_vectors
+        self.flush_seconds = flush_seconds
+        # PineconeVectorStore reads the host and API key from the index config
+        self.config = SimpleNamespace(host=f"local://{self.path}", api_key="")
+
+        self._lock = threading.RLock()
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._dirty: set = set()
+        self._flush_timer: Optional[threading.Timer] = None
+        self._checked_at = 0.0
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._reload()
+        atexit.register(self.flush)
+
+    # -- persistence -------------------------------------------------------
+
+    def _file(self, namespace: str) -> Path:
+        return self.path / f"{quote(namespace or DEFAULT_NAMESPACE, safe='')}.npz"
+
+    def _reload(self):
+        """Load namespaces changed on disk by another process."""
+        self._checked_at = time.monotonic()
+        on_disk = set()
+        for file in self.path.glob("*.npz"):
+            name = unquote(file.stem)
+            name = "" if name == DEFAULT_NAMESPACE else name
+            on_disk.add(name)
+            mtime = file.stat().st_mtime
+            if name in self._dirty or self._mtimes.get(name) == mtime:
+                continue
+            try:
+                self._namespaces[name] = _Namespace.load(file)
+                self._mtimes[name] = mtime
+                logger.debug(f"Loaded local namespace '{name or DEFAULT_NAMESPACE}' ({self._namespaces[name].size} vectors)")
+            except Exception as e:
+                logger.warning(f"Could not load local vector store file {file}: {str(e)}")
+
+        # Namespaces emptied (and removed) by another process
+        for name in set(self._mtimes) - on_disk - self._dirty:
+            self._namespaces.pop(name, None)
+            self._mtimes.pop(name)
+
+    def _maybe_reload(self):
+        if time.monotonic() - self._checked_at > 1.0:
+            self._reload()
+
+    def _mark_dirty(self, namespace: str):
+        self._dirty.add(namespace)
+        if self._flush_timer is None:
+            self._flush_timer = threading.Timer(self.flush_seconds, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
+
+    def flush(self):
+        """Persist namespaces with pending writes."""
+        with self._lock:
+            self._flush_timer = None
+            for name in list(self._dirty):
+                file = self._file(name)
+                namespace = self._namespaces.get(name)
+                if namespace is None or namespace.size == 0:
+                    file.unlink(missing_ok=True)
+                    self._namespaces.pop(name, None)
+                    self._mtimes.pop(name, None)
+                else:
+                    namespace.save(file)
+                    self._mtimes[name] = file.stat().st_mtime
+                self._dirty.discard(name)
+
+    # -- Pinecone Index API ------------------------------------------------
+
+    def _namespace(self, namespace: Optional[str], create: bool = False) -> Optional[_Namespace]:
+        name = "" if namespace in (None, DEFAULT_NAMESPACE) else namespace
+        if name not in self._namespaces and create:
+            self._namespaces[name] = _Namespace(self.dimension)
+        return self._namespaces.get(name)
+
+    def upsert(self, vectors: List, namespace: Optional[str] = None, async_req: bool = False, **kwargs):
+        """
+        Insert or overwrite vectors.
+
+        Args:
+            vectors: Dicts with id, values, metadata or (id, values, metadata) tuples
+            namespace: Optional namespace
+            async_req: Return a completed future instead of the response
+
+        Returns:
+            Response with upserted_count (or a future of it)
+        """
+        fields = [_record_fields(record) for record in vectors]
+        matrix = np.array([values for _, values, _ in fields], dtype=np.float32).reshape(len(fields), -1)
+        if len(fields) and matrix.shape[1] != self.dimension:
+            raise ValueError(f"Vector dimension {matrix.shape[1]} does not match index dimension {self.dimension}")
+
+        with self._lock:
+            self._maybe_reload()
+            count = self._namespace(namespace, create=True).upsert(
+                [vector_id for vector_id, _, _ in fields],
+                normalize_rows(matrix),
+                [dict(metadata) for _, _, metadata in fields]
+            )
+            self._mark_dirty("" if namespace in (None, DEFAULT_NAMESPACE) else namespace)
+
+        response = SimpleNamespace(upserted_count=count)
+        return _done(response) if async_req else response
+
+    def _n_probe(self, store: _Namespace) -> Optional[int]:
+        """Train or retrain the clustering when needed and pick the clusters to scan."""
+        if self.mode != "ivf" or store.size < self.ivf_min_vectors:
+            return None
+        if store.centroids is None or store.size > 2 * store.trained_size:
+            n_lists = self.ivf_lists or max(1, int(np.sqrt(store.size)))
+            started = time.monotonic()
+            store.train(min(n_lists, store.size))
+            logger.info(f"Trained {len(store.centroids)} IVF lists over {store.size} vectors in {time.monotonic() - started:.2f}s")
+        return self.ivf_probe
+
+    def query(
+        self,
+        vector: Optional[List[float]] = None,
+        id: Optional[str] = None,
+        top_k: int = 10,
+        namespace: Optional[str] = None,
+        filter: Optional[Dict] = None,
+        include_values: bool = False,
+        include_metadata: bool = False,
+        **kwargs
+    ) -> Dict:
+        """
+        Find the most similar vectors by cosine similarity.
+
+        Args:
+            vector: Query vector
+            id: ID of a stored vector to use as the query instead
+            top_k: Number of matches
+            namespace: Optional namespace
+            filter: Optional Pinecone metadata filter
+            include_values: Include vector values in matches
+            include_metadata: Include metadata in matches
+
+        Returns:
+            Dict with "matches" (id, score, metadata, values) and "namespace"
+        """
+        with self._lock:
+            self._maybe_reload()
+            store = self._namespace(namespace)
+            result = {"matches": [], "namespace": namespace or ""}
+            if store is None or store.size == 0:
+                return result
+
+            if vector is None:
+                # Like Pinecone, an unknown ID matches nothing
+                row = store.rows.get(id)
+                if row is None:
+                    return result
+                vector = store.vectors[row]
+            query = normalize_rows(np.array(vector, dtype=np.float32).reshape(1, -1))[0]
+
+            n_probe = self._n_probe(store)
+            hits = store.search(query, top_k, filter, n_probe)
+            if n_probe and filter and len(hits) < top_k:
+                # A selective filter can empty the probed clusters; fall back to exact search
+                hits = store.search(query, top_k, filter, None)
+
+            for row, score in hits:
+                match = {"id": store.ids[row], "score": score}
+                if include_metadata:
+                    match["metadata"] = dict(store.metadata[row])
+                if include_values:
+                    match["values"] = store.vectors[row].tolist()
+                result["matches"].append(match)
+
+        return result
+
+    def fetch(self, ids: List[str], namespace: Optional[str] = None, **kwargs):
+        """
+        Get stored vectors by ID.
+
+        Returns:
+            Response whose vectors dict maps ID to an object with id, values and metadata
+        """
+        with self._lock:
+            self._maybe_reload()
+            store = self._namespace(namespace)
+            vectors = {}
+            for vector_id in ids:
+                row = store.rows.get(vector_id) if store is not None else None
+                if row is not None:
+                    vectors[vector_id] = SimpleNamespace(
+                        id=vector_id,
+                        values=store.vectors[row].tolist(),
+                        metadata=dict(store.metadata[row])
+                    )
+        return SimpleNamespace(vectors=vectors, namespace=namespace or "")
+
+    def list(self, prefix: Optional[str] = None, namespace: Optional[str] = None, limit: int = 100, **kwargs) -> Iterator[List[str]]:
+        """
+        List vector IDs, optionally by prefix, in pages.
+
+        Yields:
+            Pages of at most limit IDs
+        """
+        with self._lock:
+            self._maybe_reload()
+            store = self._namespace(namespace)
+            ids = sorted(
+                vector_id for vector_id in (store.ids if store is not None else [])
+                if not prefix or vector_id.startswith(prefix)
+            )
+
+        for start in range(0, len(ids), limit):
+            yield ids[start:start + limit]
+
+    def delete(
+        self,
+        ids: Optional[List[str]] = None,
+        delete_all: bool = False,
+        namespace: Optional[str] = None,
+        filter: Optional[Dict] = None,
+        async_req: bool = False,
+        **kwargs
+    ):
+        """
+        Delete vectors by ID, by metadata filter or all of a namespace.
+
+        Returns:
+            Empty dict (or a future of it)
+        """
+        with self._lock:
+            self._maybe_reload()
+            store = self._namespace(namespace)
+            if store is not None:
+                if delete_all:
+                    store.delete(list(store.ids))
+                elif ids is not None:
+                    store.delete(ids)
+                elif filter is not None:
+                    store.delete([
+                        vector_id for vector_id, metadata in zip(store.ids, store.metadata)
+                        if matches_filter(metadata, filter)
+                    ])
+                else:
+                    raise ValueError("Either ids, delete_all, or filter must be provided.")
+                self._mark_dirty("" if namespace in (None, DEFAULT_NAMESPACE) else namespace)
+
+        return _done({}) if async_req else {}
+
+    def describe_index_stats(self, **kwargs):
+        """
+        Get vector counts per namespace.
+
+        Returns:
+            Response with dimension, total_vector_count and namespaces
+        """
+        with self._lock:
+            self._maybe_reload()
+            namespaces = {
+                (name or DEFAULT_NAMESPACE): {"vector_count": store.size}
+                for name, store in self._namespaces.items() if store.size
+            }
+        return SimpleNamespace(
+            dimension=self.dimension,
+            total_vector_count=sum(ns["vector_count"] for ns in namespaces.values()),
+            namespaces=namespaces,
+            index_fullness=0.0
+        )
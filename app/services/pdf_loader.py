@@ -1,15 +1,64 @@
 """
-PDF text extraction service using LangChain document loaders.
-Extracts text page-by-page from PDF documents.
+PDF text extraction service.
+Extracts text page-by-page from PDF documents with PyMuPDF, either as a
+list or as a stream that holds one page at a time.
 """
 import logging
-from typing import List
-from langchain_community.document_loaders import PyMuPDFLoader
+from typing import Iterator, List
+
+import pymupdf
 from langchain_core.documents import Document
+from app.services.chunker import iter_chunks
 
 logger = logging.getLogger(__name__)
 
 
+def iter_pdf_pages(pdf_path: str) -> Iterator[Document]:
+    """
+    Stream the non-empty pages of a PDF as LangChain Documents.
+    Only the current page's text is held in memory; metadata matches
+    PyMuPDFLoader (source, file_path, page, total_pages and the PDF's
+    document info).
+
+    Args:
+        pdf_path: Path to the PDF file
+
+    Yields:
+        One Document per non-empty page, with a 0-indexed "page"
+
+    Raises:
+        Exception: If PDF cannot be opened or processed
+    """
+    logger.info(f"Loading PDF: {pdf_path}")
+    try:
+        pdf = pymupdf.open(pdf_path)
+    except Exception as e:
+        logger.error(f"Error loading PDF {pdf_path}: {str(e)}")
+        raise
+
+    with pdf:
+        metadata = {
+            "source": pdf_path,
+            "file_path": pdf_path,
+            "total_pages": len(pdf),
+            **{
+                key: value for key, value in (pdf.metadata or {}).items()
+                if isinstance(value, (str, int))
+            }
+        }
+
+        loaded = 0
+        for page in pdf:
+            # Stripped like PyMuPDFLoader (langchain-community >= 0.3.15), so chunks and
+            # their hashes match documents ingested before the loader streamed pages
+            text = page.get_text().strip()
+            if text:
+                loaded += 1
+                yield Document(page_content=text, metadata={**metadata, "page": page.number})
+
+    logger.info(f"Loaded {loaded} non-empty pages from PDF")
+
+
 def load_pdf(pdf_path: str) -> List[Document]:
     """
     Load a PDF file and extract text as LangChain Documents.
@@ -24,23 +73,23 @@ def load_pdf(pdf_path: str) -> List[Document]:
     Raises:
         Exception: If PDF cannot be opened or processed
     """
-    try:
-        logger.info(f"Loading PDF: {pdf_path}")
-        loader = PyMuPDFLoader(pdf_path)
-        documents = loader.load()
+    return list(iter_pdf_pages(pdf_path))
 
-        # Filter out empty documents
-        non_empty_docs = [
-            doc for doc in documents
-            if doc.page_content and doc.page_content.strip()
-        ]
 
-        logger.info(f"Loaded {len(non_empty_docs)} non-empty pages from PDF")
-        return non_empty_docs
+def chunk_pdf(pdf_path: str) -> List[Document]:
+    """
+    Load a PDF and split its pages into chunks.
+    Kept free of network clients so it can run in a worker process during
+    parallel ingestion; pages are streamed, so only the chunks are held and
+    sent back from the worker.
 
-    except Exception as e:
-        logger.error(f"Error loading PDF {pdf_path}: {str(e)}")
-        raise
+    Args:
+        pdf_path: Path to the PDF file
+
+    Returns:
+        Chunks of the non-empty pages
+    """
+    return list(iter_chunks(iter_pdf_pages(pdf_path)))
 
 
 def load_multiple_pdfs(pdf_paths: List[str]) -> List[Document]:
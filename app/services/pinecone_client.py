@@ -3,20 +3,45 @@ Pinecone vector database client using LangChain.
 Handles connection, index management, and vector operations.
 Uses latest Pinecone SDK (v3+) - no environment parameter needed.
 """
+import asyncio
+import json
 import logging
 import time
-from typing import List, Dict, Optional
+from collections import deque
+from itertools import chain
+from typing import Any, Iterable, Iterator, List, Dict, Optional, Tuple
+import numpy as np
 from langchain_pinecone import PineconeVectorStore
 from langchain_core.documents import Document
+from langchain_core.vectorstores.utils import maximal_marginal_relevance
 from pinecone import Pinecone, ServerlessSpec
 from app.config import Config
 from app.services.embeddings import get_embeddings
+from app.services.docstore import Docstore, get_docstore
+from app.services.index_stats_cache import IndexStatsCache
+from app.services.ingest_pipeline import EmbedUpsertPipeline
+from app.services.upsert_retry_queue import RetryWorker, UpsertRetryQueue
+from app.utils.id_generator import generate_vector_id
 
 logger = logging.getLogger(__name__)
 
+# Metadata key holding the chunk text (LangChain's PineconeVectorStore default)
+TEXT_KEY = "text"
+
+# Pinecone rejects upsert requests above 2 MB or 1000 records
+MAX_UPSERT_REQUEST_BYTES = 2 * 1024 * 1024
+MAX_UPSERT_RECORDS = 1000
+
+# Maximum IDs per delete request
+MAX_DELETE_IDS = 1000
+
 # Global instances
 _client: Optional[Pinecone] = None
+_index = None
 _vector_store: Optional[PineconeVectorStore] = None
+_retry_queue: Optional[UpsertRetryQueue] = None
+_retry_worker: Optional[RetryWorker] = None
+_stats_cache: Optional[IndexStatsCache] = None
 
 
 def get_pinecone_client() -> Pinecone:
@@ -37,9 +62,215 @@ def get_pinecone_client() -> Pinecone:
     return _client
 
 
+def _grpc_available() -> bool:
+    """Check whether the gRPC transport (pinecone[grpc]) is installed."""
+    try:
+        from pinecone.grpc import PineconeGRPC  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def use_grpc() -> bool:
+    """
+    Decide whether direct index operations use gRPC.
+    PINECONE_USE_GRPC is "auto" (gRPC if installed), "1" or "0".
+
+    Returns:
+        True if the gRPC index client should be used
+    """
+    if Config.PINECONE_USE_GRPC == "auto":
+        return _grpc_available()
+    return Config.PINECONE_USE_GRPC == "1"
+
+
+def get_index():
+    """
+    Get the Pinecone index handle used for direct vector operations.
+    Uses the gRPC client where available, otherwise REST with a
+    thread pool sized for parallel upserts.
+
+    Returns:
+        Pinecone Index or GRPCIndex instance
+    """
+    global _index
+
+    if _index is None:
+        if Config.VECTOR_STORE_BACKEND == "local":
+            from app.services.local_vector_store import LocalIndex
+            _index = LocalIndex(
+                Config.LOCAL_VECTOR_STORE_PATH,
+                dimension=Config.EMBEDDING_DIMENSION,
+                mode=Config.LOCAL_VECTOR_INDEX,
+                ivf_lists=Config.LOCAL_VECTOR_IVF_LISTS,
+                ivf_probe=Config.LOCAL_VECTOR_IVF_PROBE,
+                ivf_min_vectors=Config.LOCAL_VECTOR_IVF_MIN_VECTORS
+            )
+            logger.info(f"Using local vector store at {Config.LOCAL_VECTOR_STORE_PATH} ({Config.LOCAL_VECTOR_INDEX})")
+            return _index
+
+        ensure_index_exists()
+
+        if use_grpc():
+            from pinecone.grpc import PineconeGRPC
+            _index = PineconeGRPC(api_key=Config.PINECONE_API_KEY).Index(Config.PINECONE_INDEX_NAME)
+            logger.info("Using Pinecone gRPC index client")
+        else:
+            _index = get_pinecone_client().Index(
+                Config.PINECONE_INDEX_NAME,
+                pool_threads=Config.PINECONE_UPSERT_CONCURRENCY
+            )
+            logger.info("Using Pinecone REST index client")
+
+    return _index
+
+
+class DocstoreVectorStore(PineconeVectorStore):
+    """
+    PineconeVectorStore that reads chunk text from a docstore.
+    Matches carry only slim metadata; the texts of all matches of a query
+    are fetched in one bulk read. Vectors that still hold their text in
+    metadata (ingested before the docstore was enabled) are used as is.
+    Similarity and MMR searches, sync and async, all hydrate through
+    _documents().
+    """
+
+    def __init__(self, *args, docstore: Docstore, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.docstore = docstore
+
+    def _documents(self, matches: List[Dict], namespace: Optional[str]) -> List[Tuple[Document, Dict]]:
+        """
+        Build documents for query matches, reading missing texts from the docstore.
+
+        Returns:
+            (document, match) pairs in match order; matches without text are skipped
+        """
+        texts = self.docstore.get_many(
+            [match["id"] for match in matches if self._text_key not in (match["metadata"] or {})],
+            namespace=namespace
+        )
+
+        docs = []
+        for match in matches:
+            metadata = dict(match["metadata"] or {})
+            text = metadata.pop(self._text_key, None) or texts.get(match["id"])
+            if text is None:
+                logger.warning(f"No text found for vector {match['id']}, skipping")
+                continue
+            docs.append((Document(id=match["id"], page_content=text, metadata=metadata), match))
+        return docs
+
+    @staticmethod
+    def _mmr_matches(results, embedding: List[float], k: int, lambda_mult: float) -> List[Dict]:
+        """Matches selected by maximal marginal relevance, in selection order."""
+        matches = results["matches"]
+        selected = maximal_marginal_relevance(
+            np.array([embedding], dtype=np.float32),
+            [match["values"] for match in matches],
+            k=k,
+            lambda_mult=lambda_mult
+        )
+        return [matches[i] for i in selected]
+
+    def similarity_search_by_vector_with_score(
+        self,
+        embedding: List[float],
+        *,
+        k: int = 4,
+        **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        namespace = kwargs.get("namespace")
+        if namespace is None:
+            namespace = self._namespace
+
+        results = self.index.query(
+            vector=embedding,
+            top_k=k,
+            include_metadata=True,
+            namespace=namespace,
+            filter=kwargs.get("filter")
+        )
+        return [(doc, match["score"]) for doc, match in self._documents(results["matches"], namespace)]
+
+    async def asimilarity_search_by_vector_with_score(
+        self,
+        embedding: List[float],
+        *,
+        k: int = 4,
+        **kwargs: Any
+    ) -> List[Tuple[Document, float]]:
+        namespace = kwargs.get("namespace")
+        if namespace is None:
+            namespace = self._namespace
+
+        async with self._async_index_context() as idx:
+            results = await idx.query(
+                vector=embedding,
+                top_k=k,
+                include_metadata=True,
+                namespace=namespace,
+                filter=kwargs.get("filter")
+            )
+        # The docstore read blocks, so it runs off the event loop
+        docs = await asyncio.to_thread(self._documents, results["matches"], namespace)
+        return [(doc, match["score"]) for doc, match in docs]
+
+    def max_marginal_relevance_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        filter: Optional[dict] = None,
+        namespace: Optional[str] = None,
+        **kwargs: Any
+    ) -> List[Document]:
+        if namespace is None:
+            namespace = self._namespace
+
+        results = self.index.query(
+            vector=embedding,
+            top_k=fetch_k,
+            include_values=True,
+            include_metadata=True,
+            namespace=namespace,
+            filter=filter
+        )
+        selected = self._mmr_matches(results, embedding, k, lambda_mult)
+        return [doc for doc, _ in self._documents(selected, namespace)]
+
+    async def amax_marginal_relevance_search_by_vector(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        fetch_k: int = 20,
+        lambda_mult: float = 0.5,
+        filter: Optional[dict] = None,
+        namespace: Optional[str] = None,
+        **kwargs: Any
+    ) -> List[Document]:
+        if namespace is None:
+            namespace = self._namespace
+
+        async with self._async_index_context() as idx:
+            results = await idx.query(
+                vector=embedding,
+                top_k=fetch_k,
+                include_values=True,
+                include_metadata=True,
+                namespace=namespace,
+                filter=filter
+            )
+        selected = self._mmr_matches(results, embedding, k, lambda_mult)
+        docs = await asyncio.to_thread(self._documents, selected, namespace)
+        return [doc for doc, _ in docs]
+
+
 def get_vector_store() -> PineconeVectorStore:
     """
     Get or create the LangChain Pinecone vector store.
+    With a docstore configured, chunk text is read from the docstore.
 
     Returns:
         PineconeVectorStore instance
@@ -47,13 +278,22 @@ def get_vector_store() -> PineconeVectorStore:
     global _vector_store
 
     if _vector_store is None:
+        docstore = get_docstore()
+        store_class, extra = (DocstoreVectorStore, {"docstore": docstore}) if docstore else (PineconeVectorStore, {})
+
+        if Config.VECTOR_STORE_BACKEND == "local":
+            # The local engine implements the Index API, so LangChain's store runs on it as is
+            _vector_store = store_class(index=get_index(), embedding=get_embeddings(), text_key=TEXT_KEY, **extra)
+            return _vector_store
+
         logger.info(f"Connecting to Pinecone index: {Config.PINECONE_INDEX_NAME}")
 
         # Ensure index exists
         ensure_index_exists()
 
         embeddings = get_embeddings()
-        _vector_store = PineconeVectorStore(
+        _vector_store = store_class(
+            **extra,
             index_name=Config.PINECONE_INDEX_NAME,
             embedding=embeddings,
             pinecone_api_key=Config.PINECONE_API_KEY
@@ -102,99 +342,461 @@ def ensure_index_exists() -> bool:
     return True
 
 
-def add_documents(documents: List[Document], doc_id: str, doc_name: str) -> List[str]:
+def add_documents(
+    documents: Iterable[Document],
+    doc_id: str,
+    doc_name: str,
+    stats: Optional[Dict] = None,
+    namespace: Optional[str] = None,
+    queued_ids: Optional[List[str]] = None
+) -> List[str]:
     """
     Add documents to the vector store.
+    Embedding and upserting run as overlapping pipeline stages. Documents
+    are consumed lazily, one batch at a time, so a generator of chunks is
+    never held in memory as a whole.
 
     Args:
-        documents: List of LangChain Document objects
+        documents: LangChain Document objects (a list or a generator)
         doc_id: Unique document identifier
         doc_name: Document filename
+        stats: Optional dict filled with per-stage pipeline throughput
+        namespace: Optional Pinecone namespace
+        queued_ids: Optional list extended with the IDs of vectors whose upsert
+            failed and was queued for retry
 
     Returns:
-        List of vector IDs
+        List of vector IDs upserted
     """
-    if not documents:
+    documents = iter(documents)
+    first = next(documents, None)
+    if first is None:
         return []
 
-    vector_store = get_vector_store()
+    index = get_index()
+    embeddings = get_embeddings()
+    docstore = get_docstore()
 
-    # Prepare documents with required metadata
     from datetime import datetime
 
-    for i, doc in enumerate(documents):
-        doc.metadata.update({
-            "doc_id": doc_id,
-            "doc_name": doc_name,
-            "page_number": doc.metadata.get("page", 0) + 1,  # 1-indexed
-            "chunk_index": doc.metadata.get("chunk_index", i),
-            "source": "local_pdf",
-            "ingested_at": datetime.utcnow().isoformat()
-        })
+    def with_ids(batch: List[Document]) -> Tuple[List[str], List[Document]]:
+        # Generate unique IDs for each vector
+        ids = [
+            generate_vector_id(doc_id, doc.metadata["page_number"], doc.metadata["chunk_index"])
+            for doc in batch
+        ]
+        # With a docstore, vectors carry slim metadata and the text is stored first,
+        # so a vector is never searchable without its text
+        if docstore is not None:
+            docstore.put(
+                ((vector_id, doc_id, doc.page_content) for vector_id, doc in zip(ids, batch)),
+                namespace=namespace
+            )
+        return ids, batch
+
+    def prepared_batches(batch_size: int) -> Iterator[Tuple[List[str], List[Document]]]:
+        batch = []
+        for i, doc in enumerate(chain([first], documents)):
+            # Prepare documents with required metadata
+            doc.metadata.update({
+                "doc_id": doc_id,
+                "doc_name": doc_name,
+                "page_number": doc.metadata.get("page", 0) + 1,  # 1-indexed
+                "chunk_index": doc.metadata.get("chunk_index", i),
+                "source": "local_pdf",
+                "ingested_at": datetime.utcnow().isoformat()
+            })
+            batch.append(doc)
+            if len(batch) == batch_size:
+                yield with_ids(batch)
+                batch = []
+        if batch:
+            yield with_ids(batch)
+
+    logger.info(f"Adding documents of {doc_name} to vector store")
+
+    retry_queue = get_upsert_retry_queue()
+    queued = []
+
+    def queue_for_retry(records: List[Dict], error: Exception):
+        # Keep the vectors so the retry needs no embedding calls
+        retry_queue.enqueue(records, error=str(error), doc_id=doc_id, namespace=namespace)
+        queued.extend(record["id"] for record in records)
+        start_upsert_retry_worker()
+
+    # Embed batches as float32 arrays while earlier batches are being upserted
+    pipeline = EmbedUpsertPipeline(
+        embed=embeddings.embed_documents_array,
+        upsert=lambda records: upsert_records(records, index=index, namespace=namespace),
+        queue_size=Config.INGEST_PIPELINE_QUEUE_SIZE,
+        upsert_workers=Config.INGEST_UPSERT_WORKERS,
+        text_key=TEXT_KEY if docstore is None else None,
+        on_upsert_failure=queue_for_retry if retry_queue is not None else None
+    )
+    all_ids = pipeline.run(prepared_batches(Config.PINECONE_BATCH_SIZE), stats=stats)
+
+    if stats is not None:
+        stats["queued_for_retry"] = len(queued)
+    if queued_ids is not None:
+        queued_ids.extend(queued)
+
+    logger.info(f"Successfully added {len(all_ids)} documents to vector store")
+    if queued:
+        logger.warning(f"{len(queued)} vectors queued for upsert retry")
+    return all_ids
+
+
+def get_upsert_retry_queue() -> Optional[UpsertRetryQueue]:
+    """
+    Get or open the durable queue of failed upsert batches.
+
+    Returns:
+        UpsertRetryQueue instance, or None if disabled
+    """
+    global _retry_queue
+
+    if _retry_queue is None and Config.UPSERT_RETRY_ENABLED:
+        _retry_queue = UpsertRetryQueue(
+            path=Config.UPSERT_RETRY_QUEUE_PATH,
+            backoff_base=Config.UPSERT_RETRY_BACKOFF_SECONDS,
+            max_attempts=Config.UPSERT_RETRY_MAX_ATTEMPTS
+        )
+
+    return _retry_queue
+
+
+def _retry_upsert(records: List[Dict], namespace: Optional[str] = None) -> int:
+    count = upsert_records(records, namespace=namespace)
+    # Replayed vectors may be new or overwrite existing ones
+    get_index_stats_cache().invalidate()
+    return count
+
+
+def start_upsert_retry_worker():
+    """Start the background thread that retries queued upserts with backoff."""
+    global _retry_worker
+
+    retry_queue = get_upsert_retry_queue()
+    if retry_queue is None:
+        return
+
+    if _retry_worker is None:
+        _retry_worker = RetryWorker(retry_queue, _retry_upsert, interval=Config.UPSERT_RETRY_INTERVAL_SECONDS)
+    _retry_worker.start()
+
+
+def replay_failed_upserts(due_only: bool = False, limit: int = 1000) -> Dict:
+    """
+    Retry queued upsert batches now.
+
+    Args:
+        due_only: Only retry batches whose backoff has expired
+        limit: Maximum batches to retry
+
+    Returns:
+        Dict with retried, succeeded and failed batch counts and vectors restored
+    """
+    retry_queue = get_upsert_retry_queue()
+    if retry_queue is None:
+        return {"retried": 0, "succeeded": 0, "failed": 0, "vectors": 0}
+
+    return retry_queue.replay(_retry_upsert, due_only=due_only, limit=limit)
+
+
+def estimate_record_bytes(record: Dict, grpc: bool = False) -> int:
+    """
+    Estimate the serialized size of one upsert record.
+
+    Args:
+        record: Dict with id, values and metadata
+        grpc: True for protobuf encoding (4 bytes per value),
+            False for JSON (float32 values widened to Python floats print
+            up to 23 characters, plus the ", " separator)
+
+    Returns:
+        Estimated size in bytes
+    """
+    per_value = 5 if grpc else 25
+    metadata = record.get("metadata") or {}
+    # The REST client escapes non-ASCII characters in the JSON body
+    return (
+        len(record["id"].encode("utf-8"))
+        + len(record["values"]) * per_value
+        + len(json.dumps(metadata, ensure_ascii=not grpc, default=str).encode("utf-8"))
+        + 64
+    )
+
+
+def iter_upsert_batches(
+    records: List[Dict],
+    max_bytes: int = MAX_UPSERT_REQUEST_BYTES,
+    max_records: int = MAX_UPSERT_RECORDS,
+    grpc: bool = False
+) -> Iterator[List[Dict]]:
+    """
+    Split records into upsert requests that stay under Pinecone's
+    request size and record count limits.
+    A record that is too large on its own still gets its own request.
+
+    Args:
+        records: Upsert records
+        max_bytes: Request size budget
+        max_records: Maximum records per request
+        grpc: Size records for the gRPC transport
+
+    Yields:
+        Lists of records
+    """
+    batch: List[Dict] = []
+    size = 0
+
+    for record in records:
+        record_size = estimate_record_bytes(record, grpc)
+
+        if batch and (len(batch) >= max_records or size + record_size > max_bytes):
+            yield batch
+            batch, size = [], 0
+
+        batch.append(record)
+        size += record_size
+
+    if batch:
+        yield batch
+
+
+def _wait_request(request):
+    """Wait for an async request (REST ApplyResult or gRPC future) and return its response."""
+    return request.result() if hasattr(request, "result") else request.get()
 
-    # Generate unique IDs for each vector
-    ids = [
-        f"{doc_id}_{doc.metadata['page_number']}_{doc.metadata['chunk_index']}"
-        for doc in documents
-    ]
 
-    logger.info(f"Adding {len(documents)} documents to vector store")
+def _send_parallel(send, batches: Iterable[List]) -> List:
+    """
+    Send one async request per batch, keeping at most
+    PINECONE_UPSERT_CONCURRENCY requests in flight.
 
-    # Add documents in batches
-    batch_size = Config.PINECONE_BATCH_SIZE
-    all_ids = []
+    Args:
+        send: Function starting the async request for a batch
+        batches: Batches to send
 
-    for i in range(0, len(documents), batch_size):
-        batch_docs = documents[i:i + batch_size]
-        batch_ids = ids[i:i + batch_size]
+    Returns:
+        Responses in batch order
+
+    Raises:
+        Exception: The first failed request, after all requests have finished
+    """
+    window = max(1, Config.PINECONE_UPSERT_CONCURRENCY)
+    in_flight = deque()
+    responses = []
+    errors = []
 
+    def collect():
         try:
-            vector_store.add_documents(documents=batch_docs, ids=batch_ids)
-            all_ids.extend(batch_ids)
-            logger.debug(f"Added batch {i // batch_size + 1}: {len(batch_docs)} documents")
+            responses.append(_wait_request(in_flight.popleft()))
         except Exception as e:
-            logger.error(f"Failed to add batch {i // batch_size + 1}: {str(e)}")
-            continue
+            errors.append(e)
 
-    logger.info(f"Successfully added {len(all_ids)} documents to vector store")
-    return all_ids
+    for batch in batches:
+        if len(in_flight) >= window:
+            collect()
+        in_flight.append(send(batch))
+
+    while in_flight:
+        collect()
+
+    if errors:
+        logger.error(f"{len(errors)} Pinecone request(s) failed: {str(errors[0])}")
+        raise errors[0]
+
+    return responses
 
 
-def delete_by_doc_id(doc_id: str) -> bool:
+def upsert_records(records: List[Dict], index=None, namespace: Optional[str] = None) -> int:
+    """
+    Upsert precomputed vectors directly through the index client.
+    Records are packed into payload-sized requests which are sent in
+    parallel, keeping at most PINECONE_UPSERT_CONCURRENCY in flight.
+
+    Args:
+        records: Dicts with id, values (list or float32 array) and metadata
+        index: Index handle (defaults to get_index())
+        namespace: Optional Pinecone namespace
+
+    Returns:
+        Number of vectors upserted
+
+    Raises:
+        Exception: The first failed request, after all requests have finished
+    """
+    if not records:
+        return 0
+
+    index = index or get_index()
+    kwargs = {"namespace": namespace} if namespace else {}
+    responses = _send_parallel(
+        lambda batch: index.upsert(vectors=batch, async_req=True, **kwargs),
+        iter_upsert_batches(
+            records,
+            max_bytes=Config.PINECONE_UPSERT_MAX_BYTES,
+            max_records=Config.PINECONE_UPSERT_MAX_RECORDS,
+            grpc=use_grpc()
+        )
+    )
+    return sum(response.upserted_count for response in responses)
+
+
+def list_ids_by_prefix(prefix: str, index=None, namespace: Optional[str] = None) -> List[str]:
+    """
+    List all vector IDs starting with a prefix.
+
+    Args:
+        prefix: ID prefix
+        index: Index handle (defaults to get_index())
+        namespace: Optional Pinecone namespace
+
+    Returns:
+        Matching vector IDs
+    """
+    index = index or get_index()
+    kwargs = {"namespace": namespace} if namespace else {}
+    ids: List[str] = []
+
+    for page in index.list(prefix=prefix, **kwargs):
+        ids.extend(page)
+
+    return ids
+
+
+def delete_ids(ids: List[str], index=None, namespace: Optional[str] = None) -> int:
+    """
+    Delete vectors by ID in parallel batches of up to 1000 IDs.
+
+    Args:
+        ids: Vector IDs to delete
+        index: Index handle (defaults to get_index())
+        namespace: Optional Pinecone namespace
+
+    Returns:
+        Number of IDs deleted
+    """
+    if not ids:
+        return 0
+
+    index = index or get_index()
+
+    # Queued retries would otherwise bring the deleted vectors back
+    retry_queue = get_upsert_retry_queue()
+    if retry_queue is not None:
+        dropped = retry_queue.discard_ids(ids, namespace=namespace)
+        if dropped:
+            logger.info(f"Dropped {dropped} deleted vectors from queued upsert retries")
+
+    kwargs = {"namespace": namespace} if namespace else {}
+    _send_parallel(
+        lambda batch: index.delete(ids=batch, async_req=True, **kwargs),
+        (ids[i:i + MAX_DELETE_IDS] for i in range(0, len(ids), MAX_DELETE_IDS))
+    )
+    adjust_index_stats(namespace, -len(ids))
+
+    docstore = get_docstore()
+    if docstore is not None:
+        docstore.delete(ids, namespace=namespace)
+    return len(ids)
+
+
+def delete_by_doc_id(doc_id: str, namespace: Optional[str] = None) -> int:
     """
     Delete all vectors for a specific document.
+    Vector IDs are "{doc_id}_{page}_{chunk}", so the document's vectors
+    are listed by ID prefix and deleted by ID. Indexes that cannot list
+    IDs (pod-based) fall back to a metadata filter delete.
 
     Args:
         doc_id: The document ID to delete vectors for
+        namespace: Optional Pinecone namespace
 
     Returns:
-        True if successful
+        Number of vectors deleted (-1 if unknown after a filter delete)
     """
-    client = get_pinecone_client()
-    index = client.Index(Config.PINECONE_INDEX_NAME)
+    index = get_index()
+
+    # Queued retries would otherwise bring the deleted vectors back
+    retry_queue = get_upsert_retry_queue()
+    if retry_queue is not None and retry_queue.discard(doc_id):
+        logger.info(f"Dropped queued upsert retries for doc_id: {doc_id}")
 
     try:
-        index.delete(filter={"doc_id": {"$eq": doc_id}})
-        logger.info(f"Deleted vectors for doc_id: {doc_id}")
-        return True
+        ids = list_ids_by_prefix(f"{doc_id}_", index=index, namespace=namespace)
+    except Exception as e:
+        logger.warning(f"Listing vector IDs failed ({str(e)}), deleting doc_id {doc_id} by metadata filter")
+        try:
+            kwargs = {"namespace": namespace} if namespace else {}
+            index.delete(filter={"doc_id": {"$eq": doc_id}}, **kwargs)
+            get_index_stats_cache().invalidate()
+            if get_docstore() is not None:
+                get_docstore().delete_document(doc_id, namespace=namespace)
+            logger.info(f"Deleted vectors for doc_id: {doc_id}")
+            return -1
+        except Exception as e:
+            logger.error(f"Failed to delete vectors for doc_id {doc_id}: {str(e)}")
+            raise
+
+    try:
+        deleted = delete_ids(ids, index=index, namespace=namespace)
     except Exception as e:
         logger.error(f"Failed to delete vectors for doc_id {doc_id}: {str(e)}")
         raise
 
+    logger.info(f"Deleted {deleted} vectors for doc_id: {doc_id}")
+    return deleted
+
 
-def get_index_stats() -> Dict:
+def get_index_stats_cache() -> IndexStatsCache:
+    """
+    Get or create the index statistics cache of this process.
+
+    Returns:
+        IndexStatsCache instance
+    """
+    global _stats_cache
+
+    if _stats_cache is None:
+        _stats_cache = IndexStatsCache(
+            lambda: get_index().describe_index_stats(),
+            ttl=Config.INDEX_STATS_TTL_SECONDS,
+            max_stale=Config.INDEX_STATS_MAX_STALE_SECONDS,
+            changed_at=_last_ingest_finished_at
+        )
+
+    return _stats_cache
+
+
+def _last_ingest_finished_at() -> Optional[float]:
+    # Ingestion jobs may run in another web worker or ingest_worker.py, whose count adjustments this process never sees
+    from app.services.ingest_jobs import get_ingest_job_queue
+    return get_ingest_job_queue().last_finished_at()
+
+
+def get_index_stats(refresh: bool = False) -> Dict:
     """
     Get statistics about the Pinecone index.
+    Served from a cache that is refreshed in the background after
+    INDEX_STATS_TTL_SECONDS; the "cache" section reports its staleness.
+
+    Args:
+        refresh: Fetch fresh stats from the index before returning
 
     Returns:
         Dict with index statistics
     """
-    client = get_pinecone_client()
-    index = client.Index(Config.PINECONE_INDEX_NAME)
-    stats = index.describe_index_stats()
-
-    return {
-        "total_vector_count": stats.total_vector_count,
-        "dimension": stats.dimension,
-        "namespaces": dict(stats.namespaces) if stats.namespaces else {}
-    }
+    return get_index_stats_cache().get(refresh=refresh)
+
+
+def adjust_index_stats(namespace: Optional[str], delta: int):
+    """
+    Update the cached vector count after vectors were added or deleted.
+
+    Args:
+        namespace: Namespace of the change (None for the default namespace)
+        delta: Vectors added (positive) or deleted (negative)
+    """
+    get_index_stats_cache().adjust(namespace, delta)
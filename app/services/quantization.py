@@ -0,0 +1,100 @@
+"""
+Compact embedding representations.
+Cohere v3 models can return int8 and packed binary embeddings; these helpers
+validate and dequantize them so vectors stay compact in the embedding caches
+and are only expanded to float32 where floats are required.
+"""
+from typing import Dict
+import numpy as np
+
+# EMBEDDING_QUANTIZATION setting -> Cohere embedding type
+EMBEDDING_TYPES: Dict[str, str] = {
+    "none": "float",
+    "int8": "int8",
+    "binary": "ubinary"
+}
+
+# Storage dtype of each Cohere embedding type
+CODE_DTYPES: Dict[str, type] = {
+    "float": np.float32,
+    "int8": np.int8,
+    "ubinary": np.uint8
+}
+
+
+def embedding_type_for(quantization: str) -> str:
+    """
+    Map a quantization mode to the Cohere embedding type to request.
+
+    Args:
+        quantization: "none", "int8" or "binary"
+
+    Returns:
+        Cohere embedding type ("float", "int8" or "ubinary")
+
+    Raises:
+        ValueError: If the mode is unknown
+    """
+    if quantization not in EMBEDDING_TYPES:
+        raise ValueError(
+            f"Unknown embedding quantization '{quantization}'. "
+            f"Available: {', '.join(EMBEDDING_TYPES)}"
+        )
+    return EMBEDDING_TYPES[quantization]
+
+
+def to_codes(values, embedding_type: str) -> np.ndarray:
+    """
+    Convert raw embeddings (e.g. parsed JSON) to a contiguous code array.
+
+    Args:
+        values: Nested list or array of embeddings
+        embedding_type: Cohere embedding type
+
+    Returns:
+        2-D array with the storage dtype of embedding_type
+    """
+    return np.ascontiguousarray(values, dtype=CODE_DTYPES[embedding_type])
+
+
+def code_dimension(codes: np.ndarray, embedding_type: str) -> int:
+    """
+    Get the logical embedding dimension of a code array.
+
+    Args:
+        codes: Array of codes (last axis is the code axis)
+        embedding_type: Cohere embedding type
+
+    Returns:
+        Number of embedding dimensions the codes represent
+    """
+    width = codes.shape[-1]
+    return width * 8 if embedding_type == "ubinary" else width
+
+
+def dequantize(codes: np.ndarray, embedding_type: str) -> np.ndarray:
+    """
+    Expand codes to L2-normalized float32 vectors.
+    Float input is returned unchanged.
+
+    Args:
+        codes: Code array of shape (n, width) or (width,)
+        embedding_type: Cohere embedding type
+
+    Returns:
+        float32 array of shape (n, dimension) or (dimension,)
+    """
+    if embedding_type == "float":
+        return codes
+
+    if embedding_type == "ubinary":
+        vectors = np.unpackbits(codes, axis=-1).astype(np.float32)
+        vectors *= 2
+        vectors -= 1
+    else:
+        vectors = codes.astype(np.float32)
+
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    vectors /= norms
+    return vectors
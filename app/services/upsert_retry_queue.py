@@ -0,0 +1,308 @@
+"""
+Durable retry queue for failed Pinecone upserts.
+Failed batches are stored with their precomputed vectors in a local SQLite
+file, so recovering them costs one upsert per batch and no embedding calls.
+"""
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class UpsertRetryQueue:
+    """
+    SQLite-backed queue of upsert batches waiting to be retried.
+
+    Each entry holds the record IDs and metadata as JSON and the vectors as
+    one float32 blob. Entries are retried with exponential backoff; after
+    max_attempts they stay in the queue and are only replayed on demand.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        backoff_base: float = 30.0,
+        backoff_max: float = 3600.0,
+        max_attempts: int = 10
+    ):
+        """
+        Open (or create) the queue.
+
+        Args:
+            path: Path to the SQLite queue file
+            backoff_base: Delay before the first automatic retry (seconds)
+            backoff_max: Upper bound for a retry delay (seconds)
+            max_attempts: Automatic retries before an entry needs a manual replay
+        """
+        self.path = path
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS failed_upserts ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " doc_id TEXT,"
+            " namespace TEXT,"
+            " records TEXT NOT NULL,"
+            " vectors BLOB NOT NULL,"
+            " dimension INTEGER NOT NULL,"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " next_attempt_at REAL NOT NULL,"
+            " last_error TEXT,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_failed_upserts_next ON failed_upserts(next_attempt_at)"
+        )
+        self._conn.commit()
+
+    def _delay(self, attempts: int) -> float:
+        """Jittered exponential backoff after the given number of failed attempts."""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** max(attempts - 1, 0)))
+        return delay * random.uniform(0.5, 1.0)
+
+    def enqueue(self, records: List[Dict], error: str = "", doc_id: Optional[str] = None, namespace: Optional[str] = None):
+        """
+        Persist a failed batch.
+
+        Args:
+            records: Upsert records (id, values, metadata)
+            error: Error message of the failed attempt
+            doc_id: Document the records belong to
+            namespace: Pinecone namespace of the upsert
+        """
+        if not records:
+            return
+
+        vectors = np.vstack([np.asarray(r["values"], dtype=np.float32) for r in records])
+        payload = json.dumps(
+            [{"id": r["id"], "metadata": r.get("metadata") or {}} for r in records],
+            default=str
+        )
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO failed_upserts"
+                " (doc_id, namespace, records, vectors, dimension, attempts, next_attempt_at, last_error, created_at)"
+                " VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?)",
+                (doc_id, namespace, payload, vectors.tobytes(), vectors.shape[1],
+                 now + self._delay(1), error[:1000], now)
+            )
+            self._conn.commit()
+
+        logger.warning(f"Queued {len(records)} vectors for upsert retry (doc_id: {doc_id})")
+
+    def _claim(self, due_only: bool, limit: int) -> List[tuple]:
+        """
+        Reserve entries for this process by pushing their next attempt forward,
+        so other workers sharing the file skip them meanwhile.
+        """
+        now = time.time()
+        with self._lock:
+            if due_only:
+                rows = self._conn.execute(
+                    "SELECT id, doc_id, namespace, records, vectors, dimension, attempts FROM failed_upserts"
+                    " WHERE next_attempt_at <= ? AND attempts <= ? ORDER BY id LIMIT ?",
+                    (now, self.max_attempts, limit)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT id, doc_id, namespace, records, vectors, dimension, attempts FROM failed_upserts"
+                    " ORDER BY id LIMIT ?",
+                    (limit,)
+                ).fetchall()
+
+            self._conn.executemany(
+                "UPDATE failed_upserts SET next_attempt_at = ? WHERE id = ?",
+                [(now + 300, row[0]) for row in rows]
+            )
+            self._conn.commit()
+        return rows
+
+    def replay(
+        self,
+        upsert: Callable[[List[Dict], Optional[str]], int],
+        due_only: bool = True,
+        limit: int = 100
+    ) -> Dict:
+        """
+        Retry queued batches.
+
+        Args:
+            upsert: Function upserting (records, namespace)
+            due_only: Only retry entries whose backoff has expired
+            limit: Maximum entries to retry in this call
+
+        Returns:
+            Dict with retried, succeeded and failed batch counts and vectors restored
+        """
+        result = {"retried": 0, "succeeded": 0, "failed": 0, "vectors": 0}
+
+        for entry_id, doc_id, namespace, payload, blob, dimension, attempts in self._claim(due_only, limit):
+            items = json.loads(payload)
+            vectors = np.frombuffer(blob, dtype=np.float32).reshape(-1, dimension)
+            records = [
+                {"id": item["id"], "values": values, "metadata": item["metadata"]}
+                for item, values in zip(items, vectors)
+            ]
+            result["retried"] += 1
+
+            try:
+                upsert(records, namespace)
+            except Exception as e:
+                result["failed"] += 1
+                with self._lock:
+                    self._conn.execute(
+                        "UPDATE failed_upserts SET attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                        (attempts + 1, time.time() + self._delay(attempts + 1), str(e)[:1000], entry_id)
+                    )
+                    self._conn.commit()
+                logger.warning(f"Upsert retry {entry_id} failed (attempt {attempts + 1}): {str(e)}")
+                continue
+
+            with self._lock:
+                self._conn.execute("DELETE FROM failed_upserts WHERE id = ?", (entry_id,))
+                self._conn.commit()
+            result["succeeded"] += 1
+            result["vectors"] += len(records)
+            logger.info(f"Upsert retry {entry_id} succeeded: {len(records)} vectors (doc_id: {doc_id})")
+
+        return result
+
+    def discard(self, doc_id: str) -> int:
+        """
+        Drop queued batches of a document, e.g. when it is deleted or re-ingested.
+
+        Args:
+            doc_id: Document ID
+
+        Returns:
+            Number of batches removed
+        """
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM failed_upserts WHERE doc_id = ?", (doc_id,)
+            ).rowcount
+            self._conn.commit()
+        return removed
+
+    def discard_ids(self, ids: List[str], namespace: Optional[str] = None) -> int:
+        """
+        Drop individual vectors from queued batches, e.g. when they are deleted.
+        Batches left empty are removed.
+
+        Args:
+            ids: Vector IDs
+            namespace: Pinecone namespace of the vectors
+
+        Returns:
+            Number of vectors removed
+        """
+        ids = set(ids)
+        if not ids:
+            return 0
+
+        removed = 0
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, records, vectors, dimension FROM failed_upserts WHERE COALESCE(namespace, '') = ?",
+                (namespace or "",)
+            ).fetchall()
+            for entry_id, payload, blob, dimension in rows:
+                items = json.loads(payload)
+                keep = [i for i, item in enumerate(items) if item["id"] not in ids]
+                if len(keep) == len(items):
+                    continue
+                removed += len(items) - len(keep)
+                if not keep:
+                    self._conn.execute("DELETE FROM failed_upserts WHERE id = ?", (entry_id,))
+                    continue
+                vectors = np.frombuffer(blob, dtype=np.float32).reshape(-1, dimension)[keep]
+                self._conn.execute(
+                    "UPDATE failed_upserts SET records = ?, vectors = ? WHERE id = ?",
+                    (json.dumps([items[i] for i in keep]), vectors.tobytes(), entry_id)
+                )
+            self._conn.commit()
+        return removed
+
+    def pending(self) -> int:
+        """Number of queued batches."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM failed_upserts").fetchone()[0]
+
+    def stats(self) -> Dict:
+        """
+        Get queue statistics.
+
+        Returns:
+            Dict with queued batches and vectors, exhausted entries and oldest entry age
+        """
+        with self._lock:
+            batches, oldest = self._conn.execute(
+                "SELECT COUNT(*), MIN(created_at) FROM failed_upserts"
+            ).fetchone()
+            exhausted = self._conn.execute(
+                "SELECT COUNT(*) FROM failed_upserts WHERE attempts > ?", (self.max_attempts,)
+            ).fetchone()[0]
+            vector_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(vectors) / (4 * dimension)), 0) FROM failed_upserts"
+            ).fetchone()[0]
+
+        return {
+            "path": self.path,
+            "queued_batches": batches,
+            "queued_vectors": vector_bytes,
+            "exhausted_batches": exhausted,
+            "oldest_age_seconds": round(time.time() - oldest, 1) if oldest else None
+        }
+
+
+class RetryWorker:
+    """Background thread that periodically replays due batches."""
+
+    def __init__(self, retry_queue: UpsertRetryQueue, upsert: Callable[[List[Dict], Optional[str]], int], interval: float = 60.0):
+        """
+        Args:
+            retry_queue: Queue to drain
+            upsert: Function upserting (records, namespace)
+            interval: Seconds between replay rounds
+        """
+        self.retry_queue = retry_queue
+        self.upsert = upsert
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker thread once per process (again after a fork)."""
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="upsert-retry", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                result = self.retry_queue.replay(self.upsert)
+                if result["retried"]:
+                    logger.info(f"Upsert retry round: {result}")
+            except Exception as e:
+                logger.error(f"Upsert retry round failed: {str(e)}")
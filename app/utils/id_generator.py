@@ -29,6 +29,20 @@ def generate_doc_id(filename: str, content_hash: Optional[str] = None) -> str:
         return str(uuid.uuid4())
 
 
+def generate_stable_doc_id(filename: str) -> str:
+    """
+    Generate a document ID that stays the same across versions of a file,
+    so a re-ingest can update the document's vectors in place.
+
+    Args:
+        filename: Name of the document file
+
+    Returns:
+        Deterministic document ID string
+    """
+    return hashlib.sha256(filename.encode()).hexdigest()[:32]
+
+
 def generate_vector_id(doc_id: str, page_number: int, chunk_index: int) -> str:
     """
     Generate a unique vector ID following the format:
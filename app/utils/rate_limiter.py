@@ -0,0 +1,147 @@
+"""
+Token-bucket rate limiting utilities.
+Used to keep outbound API calls within provider quotas.
+"""
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at a fixed rate.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate_per_minute: Tokens added per minute (<= 0 disables limiting)
+            capacity: Maximum burst size (defaults to one minute of tokens)
+        """
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else max(rate_per_minute, 1)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """
+        Take tokens if they are available right now.
+
+        Args:
+            tokens: Number of tokens to take (clamped to capacity)
+
+        Returns:
+            0 if the tokens were taken, otherwise seconds to wait before retrying
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        tokens = min(tokens, self.capacity)
+
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1):
+        """
+        Block until the requested number of tokens is available.
+
+        Args:
+            tokens: Number of tokens to take (clamped to capacity)
+        """
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1):
+        """
+        Wait without blocking the event loop until tokens are available.
+
+        Args:
+            tokens: Number of tokens to take (clamped to capacity)
+        """
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def drain(self, seconds: float) -> bool:
+        """
+        Empty the bucket and pause refilling, e.g. after a 429 with Retry-After.
+
+        Args:
+            seconds: How long to hold off before tokens accrue again
+
+        Returns:
+            True if callers are paused, False if limiting is disabled
+        """
+        if self.rate <= 0:
+            return False
+
+        with self._lock:
+            self._tokens = 0
+            self._updated = max(self._updated, time.monotonic() + seconds)
+        return True
+
+
+class RateLimiter:
+    """
+    Combined request-rate and item-rate limiter.
+    Each call consumes one request token and one token per item.
+    """
+
+    def __init__(self, requests_per_minute: float, items_per_minute: float):
+        """
+        Args:
+            requests_per_minute: Maximum API calls per minute (<= 0 for unlimited)
+            items_per_minute: Maximum items (e.g. texts) per minute (<= 0 for unlimited)
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.items = TokenBucket(items_per_minute)
+
+    def acquire(self, items: int = 1):
+        """
+        Block until a request carrying the given number of items may be sent.
+
+        Args:
+            items: Number of items in the request
+        """
+        self.requests.acquire(1)
+        self.items.acquire(items)
+
+    async def acquire_async(self, items: int = 1):
+        """
+        Async counterpart of acquire().
+
+        Args:
+            items: Number of items in the request
+        """
+        await self.requests.acquire_async(1)
+        await self.items.acquire_async(items)
+
+    def backoff(self, seconds: float) -> bool:
+        """
+        Pause all callers, e.g. when the server signals throttling.
+
+        Args:
+            seconds: Pause duration
+
+        Returns:
+            True if callers are paused, False if both limits are disabled
+        """
+        requests_paused = self.requests.drain(seconds)
+        items_paused = self.items.drain(seconds)
+        return requests_paused or items_paused
@@ -0,0 +1,177 @@
+"""
+Worker warm-up and readiness tracking.
+Builds the lazily initialized clients (Pinecone index, vector store, LLMs,
+prompt templates, langdetect profiles, database pool) ahead of traffic so
+the first user request is as fast as the steady state.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Warm-up state of this process (reset in each forked worker)
+_lock = threading.Lock()
+_ready = threading.Event()
+_thread: Optional[threading.Thread] = None
+_pid: Optional[int] = None
+_status: Dict = {"state": "pending", "steps": {}}
+
+
+def _warm_embeddings():
+    from app.services.embeddings import preload_model
+    preload_model()
+
+
+def _warm_pinecone():
+    from app.services.pinecone_client import (
+        get_index, get_upsert_retry_queue, get_vector_store, start_upsert_retry_worker
+    )
+    get_index()
+    get_vector_store()
+
+    # Resume retrying upserts left over from a previous run
+    retry_queue = get_upsert_retry_queue()
+    if retry_queue is not None and retry_queue.pending():
+        start_upsert_retry_worker()
+
+
+def _warm_llms():
+    from app.rag.generator import get_llm
+    from app.services.language_service import get_translation_llm
+    get_llm()
+    get_translation_llm()
+
+
+def _warm_prompts():
+    from app.rag.generator import get_rag_prompt
+    from app.rag.history_aware import get_history_aware_retriever
+    from app.services.language_service import INDIAN_LANGUAGES
+    for lang_code in ["en", *INDIAN_LANGUAGES]:
+        get_rag_prompt(lang_code)
+    get_history_aware_retriever()
+
+
+def _warm_language_detection():
+    # langdetect loads its language profiles from disk on first use
+    from app.services.language_service import detect_language
+    detect_language("What is the allocation for education in the Union Budget?")
+
+
+def _warm_database():
+    from sqlalchemy import text
+    from app.db.session import get_engine
+    with get_engine().connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+
+# (name, function) in execution order; later steps reuse clients built earlier
+WARMUP_STEPS: List[Tuple[str, Callable[[], None]]] = [
+    ("language_detection", _warm_language_detection),
+    ("embeddings", _warm_embeddings),
+    ("pinecone", _warm_pinecone),
+    ("llm", _warm_llms),
+    ("prompts", _warm_prompts),
+    ("database", _warm_database),
+]
+
+
+def warm_up() -> Dict:
+    """
+    Run every warm-up step in the current thread.
+    A failing step is logged and recorded but does not stop the others;
+    the component is then initialized lazily on first use as before.
+
+    Returns:
+        Warm-up status dict
+    """
+    started = time.monotonic()
+    _status.update({"state": "warming", "steps": {}})
+    logger.info("Warming up worker")
+
+    try:
+        for name, step in WARMUP_STEPS:
+            step_started = time.monotonic()
+            try:
+                step()
+                result = {"ok": True}
+            except Exception as e:
+                logger.warning(f"Warm-up step '{name}' failed: {str(e)}")
+                result = {"ok": False, "error": str(e)}
+            result["seconds"] = round(time.monotonic() - step_started, 3)
+            _status["steps"][name] = result
+    finally:
+        # Even a step that escapes the handler above (e.g. SystemExit) must not
+        # leave the worker reporting "starting" forever
+        failed = [name for name, result in _status["steps"].items() if not result["ok"]]
+        _status.update({
+            "state": "degraded" if failed or len(_status["steps"]) < len(WARMUP_STEPS) else "ready",
+            "seconds": round(time.monotonic() - started, 3)
+        })
+        _ready.set()
+
+    logger.info(
+        f"Worker warm-up finished in {_status['seconds']}s"
+        + (f" (failed: {', '.join(failed)})" if failed else "")
+    )
+    return _status
+
+
+def start_warmup() -> threading.Thread:
+    """
+    Start warm-up in a background thread, once per process.
+    Safe to call again after a fork: the child gets its own warm-up.
+
+    Returns:
+        The warm-up thread
+    """
+    global _thread, _pid
+
+    with _lock:
+        if _pid != os.getpid():
+            _pid = os.getpid()
+            _ready.clear()
+            _status.update({"state": "pending", "steps": {}})
+            _thread = threading.Thread(target=warm_up, name="warmup", daemon=True)
+            _thread.start()
+
+    return _thread
+
+
+def wait_until_ready(timeout: Optional[float] = None) -> bool:
+    """
+    Block until warm-up has finished.
+
+    Args:
+        timeout: Maximum seconds to wait (None waits indefinitely)
+
+    Returns:
+        True if warm-up finished within the timeout
+    """
+    return _ready.wait(timeout)
+
+
+def is_ready() -> bool:
+    """
+    Check whether this process can serve traffic at steady-state latency.
+
+    Returns:
+        True once warm-up has finished (or if warm-up is disabled)
+    """
+    return not Config.WARMUP_ENABLED or _ready.is_set()
+
+
+def get_warmup_status() -> Dict:
+    """
+    Get the warm-up state and per-step timings of this process.
+
+    Returns:
+        Dict with state ("pending", "warming", "ready", "degraded" or "disabled") and steps
+    """
+    if not Config.WARMUP_ENABLED:
+        return {"state": "disabled", "steps": {}}
+    return {**_status, "steps": dict(_status["steps"])}
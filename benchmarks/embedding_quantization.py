@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Benchmark compact (int8 / binary) embeddings against float32.
+
+Embeds the budget corpus and a set of budget questions, then reports for
+each embedding type the storage and transfer size per vector, the search
+latency, and recall@k against exact float32 search - both when scoring
+the compact codes directly and after dequantizing to float (what Pinecone
+and the local vector store see).
+
+With the Cohere backend all three types come from a single API call per
+batch; with the offline hashing backend the float vectors are quantized
+locally using a corpus-calibrated int8 scale.
+
+Usage:
+    python benchmarks/embedding_quantization.py
+    python benchmarks/embedding_quantization.py --backend hashing --top-k 5
+    python benchmarks/embedding_quantization.py --output quantization.json
+"""
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import Config
+from app.services.chunker import chunk_documents
+from app.services.embeddings import CohereEmbeddings, get_http_client, normalize_rows
+from app.services.pdf_loader import load_pdf
+from app.services.quantization import CODE_DTYPES, dequantize, to_codes
+from app.utils.file_scanner import scan_pdf_directory
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+EMBEDDING_TYPES = ["float", "int8", "ubinary"]
+
+DEFAULT_QUERIES = [
+    "What is the fiscal deficit target for 2026-27?",
+    "How much has been allocated for capital expenditure?",
+    "What are the changes to personal income tax slabs?",
+    "What is the budget allocation for defence?",
+    "What measures were announced for agriculture and farmers?",
+    "How much is allocated to railways?",
+    "What support is given to MSMEs?",
+    "What are the customs duty changes?",
+    "What is the allocation for health and family welfare?",
+    "What schemes were announced for education and skilling?",
+    "How will the government finance the deficit through market borrowings?",
+    "What is the nominal GDP growth assumption?",
+    "What are the announcements for infrastructure and roads?",
+    "What incentives are there for the energy sector and renewables?",
+    "What is the allocation for rural development?",
+    "What was said about the new income tax law?",
+    "What are the major receipts of the government?",
+    "What is the total expenditure of the union government?",
+    "What reforms were announced for the financial sector?",
+    "What support is given to states through transfers?",
+]
+
+
+def bytes_per_vector(dimension: int, embedding_type: str) -> int:
+    """
+    Get the storage size of one vector.
+
+    Args:
+        dimension: Embedding dimension
+        embedding_type: Cohere embedding type
+
+    Returns:
+        Size in bytes
+    """
+    if embedding_type == "ubinary":
+        return (dimension + 7) // 8
+    return dimension * np.dtype(CODE_DTYPES[embedding_type]).itemsize
+
+
+def int8_scale(vectors: np.ndarray) -> np.ndarray:
+    """
+    Calibrate a symmetric per-dimension int8 scale on a set of vectors.
+
+    Args:
+        vectors: float32 array of shape (n, dimension)
+
+    Returns:
+        float32 array of shape (dimension,) with the max magnitude per dimension
+    """
+    scale = np.abs(np.asarray(vectors, dtype=np.float32)).max(axis=0)
+    scale[scale == 0] = 1.0
+    return scale
+
+
+def quantize(vectors: np.ndarray, embedding_type: str, scale: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Quantize float vectors locally, for backends that only produce floats.
+    int8 uses a symmetric per-dimension scale; binary keeps the sign bit.
+
+    Args:
+        vectors: float32 array of shape (n, dimension)
+        embedding_type: Cohere embedding type
+        scale: int8 calibration from int8_scale() (calibrated on vectors if None);
+            pass the corpus scale when quantizing queries
+
+    Returns:
+        Code array with the storage dtype of embedding_type
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+
+    if embedding_type == "float":
+        return vectors
+    if embedding_type == "ubinary":
+        return np.packbits(vectors > 0, axis=-1)
+
+    if scale is None:
+        scale = int8_scale(vectors)
+    return np.clip(np.rint(vectors / scale * 127), -128, 127).astype(np.int8)
+
+
+def similarity(query_codes: np.ndarray, codes: np.ndarray, embedding_type: str) -> np.ndarray:
+    """
+    Score a query against stored codes without expanding them to float.
+    int8 uses an integer dot product, binary uses negated Hamming distance.
+
+    Args:
+        query_codes: Codes of one query, shape (width,)
+        codes: Stored codes, shape (n, width)
+        embedding_type: Cohere embedding type
+
+    Returns:
+        Scores of shape (n,), higher is more similar
+    """
+    if embedding_type == "ubinary":
+        distance = np.unpackbits(np.bitwise_xor(codes, query_codes), axis=-1).sum(axis=-1)
+        return -distance.astype(np.float32)
+
+    if embedding_type == "int8":
+        return (codes.astype(np.int32) @ query_codes.astype(np.int32)).astype(np.float32)
+
+    return codes @ query_codes
+
+
+def load_corpus(source_dir: str, limit: int) -> List[str]:
+    """Load and chunk every PDF in source_dir, exactly as ingestion does."""
+    texts = []
+    for pdf_info in scan_pdf_directory(source_dir):
+        for doc in chunk_documents(load_pdf(pdf_info["path"])):
+            texts.append(doc.page_content)
+            if limit and len(texts) >= limit:
+                return texts
+    return texts
+
+
+def embed_cohere(texts: List[str], input_type: str) -> Dict[str, np.ndarray]:
+    """Request float, int8 and ubinary embeddings in one call per batch."""
+    http = get_http_client()
+    results = {t: [] for t in EMBEDDING_TYPES}
+    response_bytes = {t: 0 for t in EMBEDDING_TYPES}
+
+    for i in range(0, len(texts), CohereEmbeddings.BATCH_SIZE):
+        batch = texts[i:i + CohereEmbeddings.BATCH_SIZE]
+        response = http.post({
+            "texts": batch,
+            "model": Config.EMBEDDING_MODEL_NAME,
+            "input_type": input_type,
+            "embedding_types": EMBEDDING_TYPES
+        }, items=len(batch))
+        response.raise_for_status()
+        embeddings = response.json()["embeddings"]
+        for embedding_type in EMBEDDING_TYPES:
+            results[embedding_type].append(to_codes(embeddings[embedding_type], embedding_type))
+            response_bytes[embedding_type] += len(json.dumps(embeddings[embedding_type]))
+
+    codes = {t: np.vstack(rows) for t, rows in results.items()}
+    codes["float"] = normalize_rows(codes["float"])
+    codes["_response_bytes"] = response_bytes
+    return codes
+
+
+def embed_local(corpus_vectors: np.ndarray, query_vectors: np.ndarray):
+    """Quantize float vectors locally, calibrating int8 on the corpus."""
+    scale = int8_scale(corpus_vectors)
+    corpus = {t: quantize(corpus_vectors, t, scale) for t in EMBEDDING_TYPES}
+    queries = {t: quantize(query_vectors, t, scale) for t in EMBEDDING_TYPES}
+    for codes in (corpus, queries):
+        codes["_response_bytes"] = {
+            t: len(json.dumps(codes[t].tolist())) for t in EMBEDDING_TYPES
+        }
+    return corpus, queries
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores."""
+    k = min(k, len(scores))
+    return np.argpartition(-scores, k - 1)[:k]
+
+
+def recall(found: np.ndarray, exact: np.ndarray) -> float:
+    """Fraction of the exact top-k that was found."""
+    return len(set(found.tolist()) & set(exact.tolist())) / len(exact)
+
+
+def run(args) -> Dict:
+    texts = load_corpus(args.dir, args.limit)
+    if not texts:
+        raise SystemExit(f"No chunks found in {args.dir}")
+
+    queries = DEFAULT_QUERIES
+    if args.queries:
+        queries = [q.strip() for q in Path(args.queries).read_text().splitlines() if q.strip()]
+
+    started = time.perf_counter()
+    if args.backend == "cohere":
+        corpus = embed_cohere(texts, "search_document")
+        query_codes = embed_cohere(queries, "search_query")
+    else:
+        from app.services.local_embeddings import HashingEmbeddings
+        encoder = HashingEmbeddings(dimension=Config.EMBEDDING_DIMENSION)
+        corpus, query_codes = embed_local(
+            encoder.embed_documents_array(texts),
+            encoder.embed_documents_array(queries)
+        )
+    embed_seconds = time.perf_counter() - started
+
+    dimension = corpus["float"].shape[1]
+    exact = [top_k(corpus["float"] @ q, args.top_k) for q in query_codes["float"]]
+    report = {
+        "backend": args.backend,
+        "model": Config.EMBEDDING_MODEL_NAME if args.backend == "cohere" else "hashing",
+        "chunks": len(texts),
+        "queries": len(queries),
+        "dimension": dimension,
+        "top_k": args.top_k,
+        "embed_seconds": round(embed_seconds, 2),
+        "types": {}
+    }
+
+    float_bytes = bytes_per_vector(dimension, "float")
+    for embedding_type in EMBEDDING_TYPES:
+        codes = corpus[embedding_type]
+        vector_bytes = bytes_per_vector(dimension, embedding_type)
+
+        started = time.perf_counter()
+        compact = [
+            top_k(similarity(q, codes, embedding_type), args.top_k)
+            for q in query_codes[embedding_type]
+        ]
+        search_ms = (time.perf_counter() - started) * 1000 / len(queries)
+
+        expanded_corpus = dequantize(codes, embedding_type)
+        expanded_queries = dequantize(query_codes[embedding_type], embedding_type)
+        dequantized = [top_k(expanded_corpus @ q, args.top_k) for q in expanded_queries]
+
+        report["types"][embedding_type] = {
+            "bytes_per_vector": vector_bytes,
+            "compression": round(float_bytes / vector_bytes, 1),
+            "corpus_mb": round(vector_bytes * len(texts) / 1e6, 3),
+            "response_bytes_per_vector": round(corpus["_response_bytes"][embedding_type] / len(texts), 1),
+            "search_ms_per_query": round(search_ms, 3),
+            f"recall@{args.top_k}_compact": round(float(np.mean([recall(f, e) for f, e in zip(compact, exact)])), 4),
+            f"recall@{args.top_k}_dequantized": round(float(np.mean([recall(f, e) for f, e in zip(dequantized, exact)])), 4)
+        }
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark int8/binary embeddings against float32')
+    parser.add_argument('--backend', choices=['cohere', 'hashing'], default='cohere',
+                        help='Embedding source (hashing runs offline with local quantization)')
+    parser.add_argument('--dir', '-d', default=Config.PDF_SOURCE_DIR,
+                        help=f'Directory containing PDFs (default: {Config.PDF_SOURCE_DIR})')
+    parser.add_argument('--limit', type=int, default=0, help='Maximum number of chunks (0 = all)')
+    parser.add_argument('--queries', help='File with one query per line (default: built-in budget questions)')
+    parser.add_argument('--top-k', type=int, default=10, help='Recall cut-off')
+    parser.add_argument('--output', '-o', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    if args.backend == "cohere" and not Config.COHERE_API_KEY:
+        parser.error("COHERE_API_KEY is required for --backend cohere (use --backend hashing offline)")
+
+    report = run(args)
+    output = json.dumps(report, indent=2)
+    print(output)
+
+    if args.output:
+        Path(args.output).write_text(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Embedding throughput benchmark against a local Cohere stand-in.
+
+Starts benchmarks/fake_cohere_server.py in-process (or targets --url) and
+drives CohereEmbeddings over a grid of batch sizes, concurrency levels and
+text lengths built from the chunks of the PDFs in docs/. Reports texts/sec,
+per-request p50/p95/p99 latency and retry counts as JSON, so runs can be
+compared to catch regressions. No API quota is used.
+
+Usage:
+    python benchmarks/embedding_throughput.py
+    python benchmarks/embedding_throughput.py --batch-sizes 32,96 --concurrency 1,8 --throttle-rate 0.05
+    python benchmarks/embedding_throughput.py --mode async --output throughput.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import Config
+from app.services.chunker import chunk_documents
+from app.services.embedding_batcher import AdaptiveBatcher
+from app.services.embeddings import CohereEmbeddings, CohereHTTPClient, CircuitBreaker
+from app.services.pdf_loader import load_pdf
+from app.utils.file_scanner import scan_pdf_directory
+from benchmarks.fake_cohere_server import FakeCohereServer
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+# Retries are counted in the report; don't log each one
+logging.getLogger("app.services.embeddings").setLevel(logging.ERROR)
+
+
+class FixedBatcher(AdaptiveBatcher):
+    """Batcher pinned to one batch size that keeps every request latency."""
+
+    def __init__(self, batch_size: int):
+        super().__init__(
+            max_texts=batch_size,
+            min_texts=batch_size,
+            initial_texts=batch_size,
+            max_tokens=10 ** 9,
+            max_bytes=10 ** 12
+        )
+        self.latencies: List[float] = []
+
+    def record(self, texts: List[str], latency: float, throttled: bool = False, failed: bool = False):
+        self.latencies.append(latency)
+        super().record(texts, latency, throttled, failed)
+
+
+def load_chunks(source_dir: str, limit: int) -> List[str]:
+    """Chunk every PDF in source_dir, exactly as ingestion does."""
+    chunks = []
+    for pdf_info in scan_pdf_directory(source_dir):
+        chunks.extend(doc.page_content for doc in chunk_documents(load_pdf(pdf_info["path"])))
+        if len(chunks) >= limit:
+            break
+    return chunks[:limit]
+
+
+def text_sets(chunks: List[str]) -> Dict[str, List[str]]:
+    """Short (sentence-sized), chunk-sized and long (three chunks joined) inputs."""
+    return {
+        "short": [chunk[:120] for chunk in chunks],
+        "chunk": chunks,
+        "long": [" ".join(chunks[i:i + 3]) for i in range(len(chunks))]
+    }
+
+
+def percentile(values: List[float], p: float):
+    if not values:
+        return None
+    return round(float(np.percentile(values, p)) * 1000, 1)
+
+
+def run_scenario(url: str, texts: List[str], batch_size: int, concurrency: int, args) -> Dict:
+    """Embed texts once with a fresh client and report throughput."""
+    http = CohereHTTPClient(
+        api_url=url,
+        headers={"Authorization": "Bearer benchmark", "Content-Type": "application/json"},
+        pool_size=concurrency * 2,
+        max_retries=args.max_retries,
+        backoff_base=args.backoff_base,
+        request_timeout=30.0,
+        deadline=120.0,
+        circuit_breaker=CircuitBreaker(failure_threshold=10 ** 6)
+    )
+    batcher = FixedBatcher(batch_size)
+    embeddings = CohereEmbeddings(
+        api_key="benchmark",
+        max_concurrency=concurrency,
+        http_client=http,
+        batcher=batcher
+    )
+
+    failed = None
+    started = time.perf_counter()
+    try:
+        if args.mode == "async":
+            async def embed():
+                try:
+                    return await embeddings.aembed_documents_array(texts)
+                finally:
+                    await http.aclose()
+            asyncio.run(embed())
+        else:
+            embeddings.embed_documents_array(texts)
+    except RuntimeError as e:
+        failed = str(e)
+    elapsed = time.perf_counter() - started
+
+    client_stats = http.stats()
+    http.session.close()
+
+    return {
+        "batch_size": batch_size,
+        "concurrency": concurrency,
+        "texts": len(texts),
+        "avg_text_chars": round(sum(len(t) for t in texts) / len(texts), 1),
+        "seconds": round(elapsed, 3),
+        "texts_per_sec": round(len(texts) / elapsed, 1) if not failed else 0.0,
+        "requests": client_stats["requests_sent"],
+        "retries": client_stats["retries"],
+        "latency_ms_p50": percentile(batcher.latencies, 50),
+        "latency_ms_p95": percentile(batcher.latencies, 95),
+        "latency_ms_p99": percentile(batcher.latencies, 99),
+        "connections_opened": client_stats["connections_opened"],
+        "failed": failed
+    }
+
+
+def parse_ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark embedding throughput against a local Cohere stand-in')
+    parser.add_argument('--dir', '-d', default=Config.PDF_SOURCE_DIR,
+                        help=f'Directory containing PDFs (default: {Config.PDF_SOURCE_DIR})')
+    parser.add_argument('--texts', type=int, default=480, help='Texts embedded per scenario')
+    parser.add_argument('--batch-sizes', type=parse_ints, default=[16, 48, 96])
+    parser.add_argument('--concurrency', type=parse_ints, default=[1, 4, 8])
+    parser.add_argument('--lengths', default='short,chunk,long', help='Comma-separated subset of short,chunk,long')
+    parser.add_argument('--mode', choices=['sync', 'async'], default='sync')
+    parser.add_argument('--url', help='Use an already running server instead of starting one')
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='Fake server latency per request')
+    parser.add_argument('--per-text-ms', type=float, default=0.5, help='Fake server latency per text')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of injected HTTP 500s')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of injected HTTP 429s')
+    parser.add_argument('--retry-after', type=float, default=0.2, help='Retry-After seconds on injected 429s')
+    parser.add_argument('--max-retries', type=int, default=Config.COHERE_MAX_RETRIES)
+    parser.add_argument('--backoff-base', type=float, default=0.05, help='Client backoff base (seconds)')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for error injection')
+    parser.add_argument('--output', '-o', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    chunks = load_chunks(args.dir, args.texts)
+    if not chunks:
+        parser.error(f"No chunks found in {args.dir}")
+    inputs = text_sets(chunks)
+    lengths = [name for name in args.lengths.split(",") if name in inputs]
+
+    server = None
+    url = args.url
+    if url is None:
+        server = FakeCohereServer(
+            dimension=Config.EMBEDDING_DIMENSION,
+            latency_ms=args.latency_ms,
+            per_text_ms=args.per_text_ms,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            retry_after=args.retry_after,
+            seed=args.seed
+        ).start()
+        url = server.url
+
+    runs = []
+    try:
+        for length in lengths:
+            for batch_size in args.batch_sizes:
+                for concurrency in args.concurrency:
+                    if server is not None:
+                        server.reset_stats()
+                    result = {"text_length": length, **run_scenario(url, inputs[length], batch_size, concurrency, args)}
+                    if server is not None:
+                        result["server"] = server.stats()
+                    runs.append(result)
+                    print(
+                        f"{length:>5} batch={batch_size:<3} concurrency={concurrency:<2} "
+                        f"{result['texts_per_sec']:>8} texts/s  p95={result['latency_ms_p95']}ms  "
+                        f"retries={result['retries']}",
+                        file=sys.stderr
+                    )
+    finally:
+        if server is not None:
+            server.stop()
+
+    report = {
+        "benchmark": "embedding_throughput",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "config": {
+            "mode": args.mode,
+            "url": args.url or "in-process fake server",
+            "latency_ms": args.latency_ms,
+            "per_text_ms": args.per_text_ms,
+            "error_rate": args.error_rate,
+            "throttle_rate": args.throttle_rate,
+            "max_retries": args.max_retries,
+            "dimension": Config.EMBEDDING_DIMENSION
+        },
+        "runs": runs
+    }
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        Path(args.output).write_text(output)
+
+
+if __name__ == "__main__":
+    main()
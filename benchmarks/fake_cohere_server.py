@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Cohere /v1/embed endpoint.
+
+Returns deterministic pseudo-random embeddings (one seed per text) after a
+configurable latency, and injects 500 errors and 429 throttling at
+configurable rates so client retry and backoff behaviour can be measured
+without spending API quota.
+
+Usage:
+    python benchmarks/fake_cohere_server.py --port 8099 --latency-ms 80 --throttle-rate 0.05
+    COHERE_API_URL=http://127.0.0.1:8099/v1/embed python ingest.py
+"""
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAX_TEXTS = 96
+
+
+class FakeCohereServer:
+    """
+    Threaded HTTP server emulating Cohere's embed endpoint.
+    Each request sleeps latency_ms + per_text_ms * len(texts) (with jitter).
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        dimension: int = 384,
+        latency_ms: float = 50.0,
+        per_text_ms: float = 0.5,
+        jitter: float = 0.2,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float = 0.5,
+        seed: Optional[int] = None
+    ):
+        """
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free port)
+            dimension: Embedding dimension to return
+            latency_ms: Fixed latency per request
+            per_text_ms: Additional latency per text in the request
+            jitter: Relative latency jitter (0.2 = +/-20%)
+            error_rate: Fraction of requests answered with HTTP 500
+            throttle_rate: Fraction of requests answered with HTTP 429
+            retry_after: Retry-After seconds sent with 429 responses
+            seed: Seed for error injection (None for random)
+        """
+        self.dimension = dimension
+        self.latency_ms = latency_ms
+        self.per_text_ms = per_text_ms
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+
+        self.requests = 0
+        self.texts = 0
+        self.errors = 0
+        self.throttled = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Embed endpoint URL of the running server."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1/embed"
+
+    def start(self) -> "FakeCohereServer":
+        """Serve in a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-cohere", daemon=True)
+        self._thread.start()
+        logger.info(f"Fake Cohere server listening on {self.url}")
+        return self
+
+    def stop(self):
+        """Shut the server down."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def reset_stats(self):
+        """Zero the request counters."""
+        with self._lock:
+            self.requests = self.texts = self.errors = self.throttled = 0
+
+    def stats(self) -> Dict:
+        """
+        Get server-side counters.
+
+        Returns:
+            Dict with requests, texts, injected errors and 429s
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "texts": self.texts,
+                "errors_injected": self.errors,
+                "throttled_injected": self.throttled
+            }
+
+    def embed(self, texts: List[str], embedding_types: List[str]) -> Dict:
+        """Build a Cohere-shaped response body with deterministic vectors."""
+        vectors = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for i, text in enumerate(texts):
+            rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+            vectors[i] = rng.standard_normal(self.dimension, dtype=np.float32)
+
+        if not embedding_types:
+            return {"embeddings": vectors.round(5).tolist()}
+
+        embeddings = {}
+        for embedding_type in embedding_types:
+            if embedding_type == "float":
+                embeddings["float"] = vectors.round(5).tolist()
+            elif embedding_type == "int8":
+                embeddings["int8"] = np.clip(np.rint(vectors * 40), -128, 127).astype(int).tolist()
+            elif embedding_type == "ubinary":
+                embeddings["ubinary"] = np.packbits(vectors > 0, axis=-1).astype(int).tolist()
+        return {"embeddings": embeddings}
+
+    def _outcome(self, texts: int) -> Optional[int]:
+        """Decide on an injected failure and account for the request."""
+        with self._lock:
+            self.requests += 1
+            roll = self._random.random()
+            if roll < self.throttle_rate:
+                self.throttled += 1
+                return 429
+            if roll < self.throttle_rate + self.error_rate:
+                self.errors += 1
+                return 500
+            self.texts += texts
+            return None
+
+    def _sleep(self, texts: int):
+        latency = (self.latency_ms + self.per_text_ms * texts) / 1000
+        time.sleep(max(0.0, latency * (1 + self._random.uniform(-self.jitter, self.jitter))))
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status: int, body: Dict, headers: Optional[Dict] = None):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/v1/embed":
+                    self._reply(404, {"message": f"unknown path {self.path}"})
+                    return
+
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                texts = payload.get("texts") or []
+
+                if not texts or len(texts) > MAX_TEXTS:
+                    self._reply(400, {"message": f"texts must contain 1-{MAX_TEXTS} items"})
+                    return
+
+                server._sleep(len(texts))
+                status = server._outcome(len(texts))
+
+                if status == 429:
+                    self._reply(429, {"message": "rate limited"}, {"Retry-After": str(server.retry_after)})
+                elif status == 500:
+                    self._reply(500, {"message": "injected error"})
+                else:
+                    self._reply(200, {
+                        "id": "fake",
+                        "texts": texts,
+                        **server.embed(texts, payload.get("embedding_types") or [])
+                    })
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local Cohere /v1/embed stand-in')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8099)
+    parser.add_argument('--dimension', type=int, default=384)
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='Fixed latency per request')
+    parser.add_argument('--per-text-ms', type=float, default=0.5, help='Extra latency per text')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of HTTP 500 responses')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of HTTP 429 responses')
+    parser.add_argument('--retry-after', type=float, default=0.5, help='Retry-After seconds on 429')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = FakeCohereServer(
+        host=args.host,
+        port=args.port,
+        dimension=args.dimension,
+        latency_ms=args.latency_ms,
+        per_text_ms=args.per_text_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after
+    ).start()
+
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
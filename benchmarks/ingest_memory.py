@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark peak memory of PDF ingestion against document size.
+
+Generates synthetic budget-style PDFs of increasing page counts and ingests
+each one in a fresh child process, once through the streaming pipeline
+(ingest_single_pdf: pages -> chunks -> embed/upsert batches) and once with
+every page and chunk materialized up front as before. Reports the peak RSS
+of each run and its growth over the child's baseline after imports.
+Streaming runs still keep each chunk's vector ID and content hash for the
+manifest diff (a few hundred bytes per chunk); page text, chunks and
+vectors are limited to the pipeline's batch window.
+
+Runs fully offline: embeddings come from the hashing backend and upserts
+are counted and discarded, so only the ingestion pipeline's own memory is
+measured.
+
+Usage:
+    python benchmarks/ingest_memory.py
+    python benchmarks/ingest_memory.py --pages 100 400 1600
+    python benchmarks/ingest_memory.py --modes streaming --output ingest_memory.json
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+PARAGRAPH = (
+    "Allocation for the Ministry of {ministry} in {year} is Rs {amount} crore, "
+    "an increase of {growth} per cent over the revised estimates. The outlay covers "
+    "capital expenditure on infrastructure, grants-in-aid to States and centrally "
+    "sponsored schemes, with {schemes} new schemes announced in the budget speech. "
+)
+MINISTRIES = ["Railways", "Defence", "Agriculture", "Health", "Education", "Road Transport"]
+
+
+def make_pdf(path: str, pages: int, paragraphs_per_page: int = 12):
+    """Write a synthetic PDF whose pages hold distinct budget-style text."""
+    import pymupdf
+
+    pdf = pymupdf.open()
+    for number in range(pages):
+        text = "\n\n".join(
+            PARAGRAPH.format(
+                ministry=MINISTRIES[(number + i) % len(MINISTRIES)],
+                year=2000 + (number + i) % 30,
+                amount=1000 + number * 37 + i,
+                growth=(number * 7 + i) % 40,
+                schemes=(number + i) % 9
+            )
+            for i in range(paragraphs_per_page)
+        )
+        page = pdf.new_page()
+        page.insert_textbox(pymupdf.Rect(36, 36, 576, 806), text, fontsize=7)
+    pdf.save(path)
+    pdf.close()
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def current_rss_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return peak_rss_mb()
+
+
+def child(mode: str, pdf_path: str) -> Dict:
+    """Ingest one PDF in this process and report its memory use."""
+    from app.config import Config
+    from app.services import pinecone_client
+
+    upserted = []
+    pinecone_client.upsert_records = lambda records, index=None, namespace=None: upserted.append(len(records))
+
+    from app.ingest_runner import ingest_single_pdf
+    from app.services.chunker import chunk_documents
+    from app.services.embeddings import preload_model
+    from app.services.pdf_loader import load_pdf
+
+    preload_model()
+    baseline = current_rss_mb()
+    started = time.perf_counter()
+
+    if mode == "streaming":
+        result = ingest_single_pdf(pdf_path, force=True)
+        chunks = result.get("chunks", 0)
+    else:
+        documents = load_pdf(pdf_path)
+        chunked_docs = chunk_documents(documents)
+        pinecone_client.add_documents(chunked_docs, "benchmark", Path(pdf_path).name)
+        chunks = len(chunked_docs)
+
+    peak = peak_rss_mb()
+    return {
+        "mode": mode,
+        "chunks": chunks,
+        "vectors_upserted": sum(upserted),
+        "batch_size": Config.PINECONE_BATCH_SIZE,
+        "seconds": round(time.perf_counter() - started, 2),
+        "baseline_rss_mb": round(baseline, 1),
+        "peak_rss_mb": round(peak, 1),
+        "growth_mb": round(peak - baseline, 1)
+    }
+
+
+def run(args) -> Dict:
+    workdir = tempfile.mkdtemp(prefix="ingest_memory_")
+    env = {
+        **os.environ,
+        "EMBEDDING_BACKEND": "hashing",
+        "EMBEDDING_CACHE_ENABLED": "0",
+        "VECTOR_STORE_BACKEND": "local",
+        "LOCAL_VECTOR_STORE_PATH": os.path.join(workdir, "vectors"),
+        "UPSERT_RETRY_ENABLED": "0",
+        "DOCSTORE_BACKEND": "none",
+        "INGEST_MANIFEST_DIR": os.path.join(workdir, "manifests")
+    }
+
+    results = []
+    for pages in args.pages:
+        pdf_path = os.path.join(workdir, f"budget_{pages}.pdf")
+        make_pdf(pdf_path, pages)
+        size_mb = os.path.getsize(pdf_path) / 1024 / 1024
+
+        for mode in args.modes:
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode, pdf_path],
+                env=env, cwd=workdir, capture_output=True, text=True, check=True
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            results.append({"pages": pages, "pdf_mb": round(size_mb, 2), **result})
+
+    return {
+        "embedding": "hashing (offline)",
+        "upserts": "discarded",
+        "results": results
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark peak memory of streaming and materialized PDF ingestion')
+    parser.add_argument('--pages', type=int, nargs='+', default=[50, 200, 800], help='Page counts of the synthetic PDFs')
+    parser.add_argument('--modes', nargs='+', choices=['streaming', 'materialized'],
+                        default=['streaming', 'materialized'])
+    parser.add_argument('--child', nargs=2, metavar=('MODE', 'PDF'), help=argparse.SUPPRESS)
+    parser.add_argument('--output', '-o', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(*args.child)))
+        return
+
+    report = run(args)
+    output = json.dumps(report, indent=2)
+    print(output)
+
+    if args.output:
+        Path(args.output).write_text(output)
+
+
+if __name__ == "__main__":
+    main()
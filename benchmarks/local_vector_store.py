@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark the in-process vector store: flat (exact) against IVF search.
+
+Builds a LocalIndex from synthetic clustered vectors (default) or from the
+budget corpus embedded with the offline hashing backend, then reports build
+and training time, query latency percentiles and recall@k of IVF against
+exact search for a range of probe counts. Runs fully offline.
+
+Usage:
+    python benchmarks/local_vector_store.py
+    python benchmarks/local_vector_store.py --vectors 200000 --dimension 1024
+    python benchmarks/local_vector_store.py --source corpus --top-k 5
+    python benchmarks/local_vector_store.py --output local_store.json
+"""
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.config import Config
+from app.services.local_vector_store import LocalIndex
+
+logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+def synthetic_vectors(count: int, dimension: int, queries: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Clustered Gaussian vectors, with queries perturbed from corpus points."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, count // 500), dimension))
+    corpus = centers[rng.integers(0, len(centers), count)] + 0.5 * rng.normal(size=(count, dimension))
+    picks = corpus[rng.integers(0, count, queries)]
+    return corpus.astype(np.float32), (picks + 0.2 * rng.normal(size=picks.shape)).astype(np.float32)
+
+
+def corpus_vectors(source_dir: str, queries: int, seed: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Budget corpus chunks embedded with the hashing backend; queries are sampled chunks."""
+    from app.services.chunker import chunk_documents
+    from app.services.local_embeddings import HashingEmbeddings
+    from app.services.pdf_loader import load_pdf
+    from app.utils.file_scanner import scan_pdf_directory
+
+    texts = [
+        doc.page_content
+        for pdf in scan_pdf_directory(source_dir)
+        for doc in chunk_documents(load_pdf(pdf["path"]))
+    ]
+    if not texts:
+        raise SystemExit(f"No chunks found in {source_dir}")
+
+    encoder = HashingEmbeddings(dimension=Config.EMBEDDING_DIMENSION)
+    corpus = encoder.embed_documents_array(texts)
+    rng = np.random.default_rng(seed)
+    return corpus, corpus[rng.integers(0, len(corpus), queries)]
+
+
+def build(path: str, corpus: np.ndarray, mode: str, probe: int, batch: int) -> Tuple[LocalIndex, float]:
+    index = LocalIndex(path, corpus.shape[1], mode=mode, ivf_probe=probe, ivf_min_vectors=0)
+    started = time.perf_counter()
+    for start in range(0, len(corpus), batch):
+        index.upsert([
+            {"id": str(i), "values": corpus[i], "metadata": {"group": i % 10}}
+            for i in range(start, min(start + batch, len(corpus)))
+        ])
+    return index, time.perf_counter() - started
+
+
+def search(index: LocalIndex, queries: np.ndarray, top_k: int, metadata_filter=None) -> Tuple[List[set], List[float]]:
+    found, latencies = [], []
+    for query in queries:
+        started = time.perf_counter()
+        matches = index.query(vector=query, top_k=top_k, filter=metadata_filter)["matches"]
+        latencies.append((time.perf_counter() - started) * 1000)
+        found.append({match["id"] for match in matches})
+    return found, latencies
+
+
+def latency_summary(latencies: List[float]) -> Dict:
+    return {
+        "p50_ms": round(float(np.percentile(latencies, 50)), 3),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 3)
+    }
+
+
+def recall(found: List[set], exact: List[set]) -> float:
+    return round(float(np.mean([len(f & e) / len(e) for f, e in zip(found, exact) if e])), 4)
+
+
+def run(args) -> Dict:
+    if args.source == "corpus":
+        corpus, queries = corpus_vectors(args.dir, args.queries, args.seed)
+    else:
+        corpus, queries = synthetic_vectors(args.vectors, args.dimension, args.queries, args.seed)
+
+    report = {
+        "source": args.source,
+        "vectors": len(corpus),
+        "dimension": int(corpus.shape[1]),
+        "queries": len(queries),
+        "top_k": args.top_k,
+        "results": {}
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        flat, build_seconds = build(f"{tmp}/flat", corpus, "flat", 0, args.batch)
+        exact, latencies = search(flat, queries, args.top_k)
+        exact_filtered, filtered_latencies = search(flat, queries, args.top_k, {"group": 3})
+        report["results"]["flat"] = {
+            "build_seconds": round(build_seconds, 3),
+            **latency_summary(latencies),
+            "filtered": latency_summary(filtered_latencies)
+        }
+
+        ivf, build_seconds = build(f"{tmp}/ivf", corpus, "ivf", args.probes[0], args.batch)
+        started = time.perf_counter()
+        ivf.query(vector=queries[0], top_k=args.top_k)  # trains the clusters
+        train_seconds = time.perf_counter() - started
+
+        for probe in args.probes:
+            ivf.ivf_probe = probe
+            found, latencies = search(ivf, queries, args.top_k)
+            found_filtered, filtered_latencies = search(ivf, queries, args.top_k, {"group": 3})
+            report["results"][f"ivf_probe_{probe}"] = {
+                "build_seconds": round(build_seconds, 3),
+                "train_seconds": round(train_seconds, 3),
+                **latency_summary(latencies),
+                f"recall@{args.top_k}": recall(found, exact),
+                "filtered": {
+                    **latency_summary(filtered_latencies),
+                    f"recall@{args.top_k}": recall(found_filtered, exact_filtered)
+                }
+            }
+
+        started = time.perf_counter()
+        flat.flush()
+        report["flush_seconds"] = round(time.perf_counter() - started, 3)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark flat and IVF search in the local vector store')
+    parser.add_argument('--source', choices=['synthetic', 'corpus'], default='synthetic',
+                        help='Synthetic clustered vectors or the PDF corpus embedded offline')
+    parser.add_argument('--dir', '-d', default=Config.PDF_SOURCE_DIR,
+                        help=f'Directory containing PDFs for --source corpus (default: {Config.PDF_SOURCE_DIR})')
+    parser.add_argument('--vectors', type=int, default=100000, help='Synthetic corpus size')
+    parser.add_argument('--dimension', type=int, default=Config.EMBEDDING_DIMENSION, help='Synthetic vector dimension')
+    parser.add_argument('--queries', type=int, default=200, help='Number of queries')
+    parser.add_argument('--top-k', type=int, default=10, help='Matches per query (recall cut-off)')
+    parser.add_argument('--probes', type=int, nargs='+', default=[1, 4, 8, 16], help='IVF probe counts to try')
+    parser.add_argument('--batch', type=int, default=1000, help='Vectors per upsert call')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', '-o', help='Write the JSON report to this file')
+    args = parser.parse_args()
+
+    report = run(args)
+    output = json.dumps(report, indent=2)
+    print(output)
+
+    if args.output:
+        Path(args.output).write_text(output)
+
+
+if __name__ == "__main__":
+    main()
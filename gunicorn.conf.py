@@ -13,6 +13,9 @@ backlog = 2048
 # Set WEB_CONCURRENCY env var to override
 workers = int(os.getenv('WEB_CONCURRENCY', 1))
 worker_class = 'sync'
+# Threads per worker; gunicorn switches to the gthread worker when > 1.
+# Needed for EMBEDDING_COALESCE_WINDOW_MS to batch concurrent chat queries.
+threads = int(os.getenv('GUNICORN_THREADS', 1))
 worker_connections = 1000
 timeout = 120
 keepalive = 5
@@ -59,8 +62,25 @@ def post_fork(server, worker):
     server.log.info("Worker spawned (pid: %s)", worker.pid)
 
 def post_worker_init(worker):
-    """Called just after a worker has initialized the application."""
-    pass
+    """
+    Called just after a worker has initialized the application.
+    Starts the worker's background services (after the fork, so nothing is
+    inherited from the master) and waits for warm-up before the worker
+    accepts connections, so the first request is served at steady-state latency.
+    """
+    from app.app import start_background_services
+    from app.config import Config
+    from app.warmup import wait_until_ready
+
+    start_background_services()
+    if not Config.WARMUP_ENABLED:
+        return
+
+    if wait_until_ready(Config.WARMUP_TIMEOUT):
+        worker.log.info("Worker warmed up (pid: %s)", worker.pid)
+    else:
+        worker.log.warning("Worker warm-up still running after %ss, accepting traffic (pid: %s)",
+                           Config.WARMUP_TIMEOUT, worker.pid)
 
 def worker_abort(worker):
     """Called when a worker times out."""
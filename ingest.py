@@ -6,6 +6,9 @@ Usage:
     python ingest.py              # Ingest all PDFs in the docs folder
     python ingest.py --force      # Force re-ingest all files
     python ingest.py --file path  # Ingest a specific file
+    python ingest.py --workers 4  # Ingest up to 4 files in parallel
+    python ingest.py --clear-embedding-cache  # Drop cached embeddings first
+    python ingest.py --replay-failed  # Retry queued failed upserts (no re-embedding)
 """
 import argparse
 import sys
@@ -17,7 +20,8 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 from app.config import Config
 from app.ingest_runner import run_ingestion, ingest_single_pdf
-from app.services.embeddings import preload_model
+from app.services.embeddings import preload_model, get_embeddings
+from app.services.pinecone_client import get_upsert_retry_queue, replay_failed_upserts
 
 # Configure logging
 logging.basicConfig(
@@ -48,6 +52,28 @@ def main():
         default=None,
         help=f'Directory containing PDFs (default: {Config.PDF_SOURCE_DIR})'
     )
+    parser.add_argument(
+        '--namespace', '-n',
+        type=str,
+        default=None,
+        help='Pinecone namespace (collection) to ingest into (default: PINECONE_NAMESPACE_MODE)'
+    )
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=None,
+        help=f'Number of files to ingest in parallel (default: {Config.INGEST_WORKERS})'
+    )
+    parser.add_argument(
+        '--clear-embedding-cache',
+        action='store_true',
+        help='Clear the persistent embedding cache before ingesting'
+    )
+    parser.add_argument(
+        '--replay-failed',
+        action='store_true',
+        help='Retry upsert batches that failed in earlier runs, then exit'
+    )
 
     args = parser.parse_args()
 
@@ -62,12 +88,27 @@ def main():
     print("\n" + "=" * 60)
     print("  Union Budget RAG - PDF to Pinecone Ingestion Pipeline")
     print("=" * 60)
-    print(f"  Embedding Model: {Config.EMBEDDING_MODEL_NAME}")
+    print(f"  Embedding:       {Config.EMBEDDING_BACKEND} ({Config.EMBEDDING_MODEL_NAME})")
     print(f"  Pinecone Index:  {Config.PINECONE_INDEX_NAME}")
     print(f"  Source Dir:      {args.dir or Config.PDF_SOURCE_DIR}")
     print("=" * 60 + "\n")
 
     try:
+        if args.clear_embedding_cache:
+            cache = getattr(get_embeddings(), "cache", None)
+            if cache is not None:
+                cache.clear()
+
+        if args.replay_failed:
+            result = replay_failed_upserts()
+            print(f"\nReplayed failed upserts:")
+            print(f"  Batches retried:   {result['retried']}")
+            print(f"  Batches succeeded: {result['succeeded']}")
+            print(f"  Vectors restored:  {result['vectors']}")
+            if result['failed']:
+                print(f"  Still failing:     {result['failed']}")
+            sys.exit(1 if result['failed'] else 0)
+
         if args.file:
             # Ingest single file
             file_path = Path(args.file)
@@ -80,7 +121,7 @@ def main():
                 sys.exit(1)
 
             preload_model()
-            result = ingest_single_pdf(str(file_path), force=args.force)
+            result = ingest_single_pdf(str(file_path), force=args.force, namespace=args.namespace)
 
             if result:
                 print(f"\nResult: {result['status']}")
@@ -92,7 +133,12 @@ def main():
         else:
             # Ingest all files in directory
             source_dir = args.dir or Config.PDF_SOURCE_DIR
-            result = run_ingestion(source_dir=source_dir, force=args.force)
+            result = run_ingestion(
+                source_dir=source_dir,
+                force=args.force,
+                namespace=args.namespace,
+                workers=args.workers
+            )
 
             print(f"\nIngestion Complete!")
             print(f"  Status: {result['status']}")
@@ -101,6 +147,10 @@ def main():
             if result.get('errors', 0) > 0:
                 print(f"  Errors: {result['errors']}")
 
+        retry_queue = get_upsert_retry_queue()
+        if retry_queue is not None and retry_queue.pending():
+            print(f"\n  {retry_queue.pending()} failed upsert batch(es) queued - run: python ingest.py --replay-failed")
+
     except KeyboardInterrupt:
         print("\n\nIngestion cancelled by user")
         sys.exit(0)
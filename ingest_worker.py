@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Background worker for ingestion jobs queued by the upload API.
+Runs ingestion in its own process instead of the default worker thread in
+each web process, so ingests do not compete with chat requests for CPU and
+memory. The web and worker processes must share the job database
+(INGEST_JOBS_URL), and web processes should then set INGEST_WORKER_IN_PROCESS=0.
+
+Usage:
+    python ingest_worker.py          # Run jobs until stopped
+    python ingest_worker.py --drain  # Run queued jobs, then exit
+"""
+import argparse
+import logging
+import signal
+import sys
+from pathlib import Path
+
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.config import Config
+from app.ingest_worker import IngestWorker
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Run ingestion jobs queued by the upload API'
+    )
+    parser.add_argument(
+        '--drain',
+        action='store_true',
+        help='Exit once the job queue is empty'
+    )
+    parser.add_argument(
+        '--poll',
+        type=float,
+        default=None,
+        help=f'Seconds between polls of an empty queue (default: {Config.INGEST_JOB_POLL_SECONDS})'
+    )
+
+    args = parser.parse_args()
+
+    # Validate configuration
+    try:
+        Config.validate()
+    except ValueError as e:
+        logger.error(f"Configuration error: {e}")
+        sys.exit(1)
+
+    # The default job queue is a local file the web processes on other machines never see
+    if not Config.INGEST_JOBS_URL:
+        logger.error(
+            "Configuration error: INGEST_JOBS_URL is required for a separate worker process; "
+            "set it to a database shared with the web processes (e.g. DATABASE_URL)"
+        )
+        sys.exit(1)
+
+    worker = IngestWorker(poll_seconds=args.poll)
+
+    def shutdown(signum, _):
+        # The running job is requeued after its current file
+        logger.info(f"Received signal {signum}, stopping after the current file")
+        worker.stop()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    worker.run_forever(drain=args.drain)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,13 +5,14 @@ Run the Union Budget RAG Flask API server.
 Usage:
     python run.py
 """
+import os
 import sys
 from pathlib import Path
 
 # Add app to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from app.app import app
+from app.app import app, start_background_services
 from app.config import Config
 
 if __name__ == '__main__':
@@ -23,6 +24,10 @@ if __name__ == '__main__':
     print(f"  Port:           {Config.FLASK_PORT}")
     print("=" * 60 + "\n")
 
+    # With the debug reloader, only the child process serves requests
+    if not Config.FLASK_DEBUG or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        start_background_services()
+
     app.run(
         host='0.0.0.0',
         port=Config.FLASK_PORT,
@@ -0,0 +1,78 @@
+"""
+Tests for per-document chunk manifests.
+"""
+from app.config import Config
+from app.ingest_runner import _previous_chunks
+from app.services.chunk_manifest import (
+    chunk_hash,
+    delete_manifest,
+    diff_chunks,
+    embedding_signature,
+    load_manifest,
+    save_manifest
+)
+
+
+def test_diff_splits_changed_unchanged_and_vanished():
+    previous = {"d-0": chunk_hash("a"), "d-1": chunk_hash("b"), "d-2": chunk_hash("c")}
+    current = {"d-0": chunk_hash("a"), "d-1": chunk_hash("B"), "d-3": chunk_hash("d")}
+
+    changed, unchanged, vanished = diff_chunks(previous, current)
+
+    assert changed == ["d-1", "d-3"]
+    assert unchanged == ["d-0"]
+    assert vanished == ["d-2"]
+
+
+def test_diff_treats_unknown_hashes_as_changed():
+    changed, unchanged, vanished = diff_chunks({"d-0": None}, {"d-0": chunk_hash("a")})
+
+    assert (changed, unchanged, vanished) == (["d-0"], [], [])
+
+
+def test_signature_tracks_backend_model_and_quantization(monkeypatch):
+    monkeypatch.setattr(Config, "EMBEDDING_BACKEND", "cohere")
+    monkeypatch.setattr(Config, "EMBEDDING_MODEL_NAME", "embed-english-light-v3.0")
+    monkeypatch.setattr(Config, "EMBEDDING_QUANTIZATION", "none")
+    original = embedding_signature()
+
+    assert original == "cohere:embed-english-light-v3.0:none"
+
+    monkeypatch.setattr(Config, "EMBEDDING_QUANTIZATION", "int8")
+    assert embedding_signature() != original
+
+    monkeypatch.setattr(Config, "EMBEDDING_QUANTIZATION", "none")
+    monkeypatch.setattr(Config, "EMBEDDING_MODEL_NAME", "embed-english-v3.0")
+    assert embedding_signature() != original
+
+
+def test_manifest_round_trip(tmp_path):
+    chunks = {"d-0": chunk_hash("a")}
+
+    save_manifest("d", "doc.pdf", "filehash", chunks, namespace="tenant", directory=str(tmp_path))
+    manifest = load_manifest("d", directory=str(tmp_path))
+
+    assert manifest["chunks"] == chunks
+    assert manifest["namespace"] == "tenant"
+    assert manifest["embedding"] == embedding_signature()
+    assert list(tmp_path.iterdir()) == [tmp_path / "d.json"]
+
+    delete_manifest("d", directory=str(tmp_path))
+    assert load_manifest("d", directory=str(tmp_path)) is None
+
+
+def test_unreadable_manifest_loads_as_missing(tmp_path):
+    (tmp_path / "d.json").write_text("{not json")
+
+    assert load_manifest("d", directory=str(tmp_path)) is None
+
+
+def test_manifest_from_another_embedding_setup_forces_re_embedding(monkeypatch):
+    chunks = {"d-0": chunk_hash("a"), "d-1": chunk_hash("b")}
+    manifest = {"filename": "doc.pdf", "embedding": embedding_signature(), "chunks": chunks}
+
+    assert _previous_chunks("d", manifest, force=False) == chunks
+    assert _previous_chunks("d", manifest, force=True) == {"d-0": None, "d-1": None}
+
+    monkeypatch.setattr(Config, "EMBEDDING_QUANTIZATION", "binary")
+    assert _previous_chunks("d", manifest, force=False) == {"d-0": None, "d-1": None}
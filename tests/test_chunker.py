@@ -0,0 +1,49 @@
+"""
+Tests for splitting pages into chunks.
+"""
+from langchain_core.documents import Document
+
+from app.services.chunker import chunk_documents, iter_chunks
+
+
+def page(text: str, number: int, source: str = "budget.pdf") -> Document:
+    return Document(page_content=text, metadata={"source": source, "page": number})
+
+
+def test_chunk_index_counts_per_page():
+    pages = [page("alpha beta gamma delta", 0), page("epsilon zeta", 1), page("eta theta iota", 0, "other.pdf")]
+
+    chunks = list(iter_chunks(pages, chunk_size=12, chunk_overlap=0))
+
+    assert [(doc.metadata["source"], doc.metadata["page"], doc.metadata["chunk_index"]) for doc in chunks] == [
+        ("budget.pdf", 0, 0), ("budget.pdf", 0, 1),
+        ("budget.pdf", 1, 0),
+        ("other.pdf", 0, 0), ("other.pdf", 0, 1)
+    ]
+    assert [doc.page_content for doc in chunks[:2]] == ["alpha beta", "gamma delta"]
+
+
+def test_pages_are_consumed_lazily():
+    consumed = []
+
+    def pages():
+        for number, text in enumerate(["alpha beta gamma delta", "epsilon zeta"]):
+            consumed.append(number)
+            yield page(text, number)
+
+    chunks = iter_chunks(pages(), chunk_size=12, chunk_overlap=0)
+    assert consumed == []
+
+    next(chunks)
+    next(chunks)
+    assert consumed == [0]
+
+    next(chunks)
+    assert consumed == [0, 1]
+
+
+def test_chunk_documents_matches_the_stream():
+    pages = [page("alpha beta gamma delta", 0), page("epsilon zeta", 1)]
+
+    assert chunk_documents(pages, chunk_size=12, chunk_overlap=0) == list(iter_chunks(pages, chunk_size=12, chunk_overlap=0))
+    assert chunk_documents([]) == []
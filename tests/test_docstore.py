@@ -0,0 +1,107 @@
+"""
+Tests for the chunk-text docstore and the vector store that reads from it.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app.config import Config
+from app.db.session import create_sqlite_engine
+from app.services.docstore import Docstore
+from app.services.local_embeddings import HashingEmbeddings
+from app.services.local_vector_store import LocalIndex
+from app.services.pinecone_client import TEXT_KEY, DocstoreVectorStore
+
+DIMENSION = 64
+TEXTS = [
+    "The budget allocates funds to rural roads.",
+    "Income tax slabs are unchanged this year.",
+    "Defence spending rises by eight percent.",
+    "Rural roads and village bridges get new funds."
+]
+
+
+class AsyncIndex:
+    """Async facade over LocalIndex, standing in for Pinecone's asyncio index."""
+
+    def __init__(self, index: LocalIndex):
+        self.index = index
+
+    async def query(self, **kwargs):
+        return self.index.query(**kwargs)
+
+
+@pytest.fixture
+def docstore(tmp_path):
+    return Docstore(create_sqlite_engine(str(tmp_path / "docstore.sqlite3")))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch, docstore):
+    monkeypatch.setattr(Config, "EMBEDDING_DIMENSION", DIMENSION)
+    embeddings = HashingEmbeddings(DIMENSION)
+    index = LocalIndex(str(tmp_path / "vectors"), DIMENSION, flush_seconds=60)
+
+    vectors = embeddings.embed_documents(TEXTS)
+    records = [
+        {"id": f"doc_{i}", "values": vector, "metadata": {"doc_id": "doc", "page_number": i + 1}}
+        for i, vector in enumerate(vectors)
+    ]
+    # doc_2 predates the docstore and still carries its text; doc_3 has no text anywhere
+    records[2]["metadata"][TEXT_KEY] = TEXTS[2]
+    index.upsert(records, namespace="budget")
+    docstore.put([("doc_0", "doc", TEXTS[0]), ("doc_1", "doc", TEXTS[1])], namespace="budget")
+
+    store = DocstoreVectorStore(index=index, embedding=embeddings, text_key=TEXT_KEY, docstore=docstore)
+
+    @asynccontextmanager
+    async def async_index_context():
+        yield AsyncIndex(index)
+
+    monkeypatch.setattr(store, "_async_index_context", async_index_context)
+    return store
+
+
+def test_docstore_round_trip_per_namespace(docstore):
+    docstore.put([("a_0", "a", "first"), ("a_1", "a", "second"), ("b_0", "b", "other")])
+    docstore.put([("a_0", "a", "first, edited")])
+    docstore.put([("a_0", "a", "elsewhere")], namespace="tenant")
+
+    assert docstore.get_many(["a_0", "a_1", "missing"]) == {"a_0": "first, edited", "a_1": "second"}
+    assert docstore.get_many(["a_0"], namespace="tenant") == {"a_0": "elsewhere"}
+
+    assert docstore.delete_document("a") == 2
+    assert docstore.delete(["b_0", "missing"]) == 1
+    assert docstore.get_many(["a_0", "b_0"]) == {}
+    assert docstore.get_many(["a_0"], namespace="tenant") == {"a_0": "elsewhere"}
+
+
+def test_similarity_search_reads_text_from_the_docstore(store):
+    results = store.similarity_search_with_score("rural roads funds", k=4, namespace="budget")
+
+    texts = [doc.page_content for doc, _ in results]
+    assert texts[0] == TEXTS[0]
+    assert sorted(texts) == sorted(TEXTS[:3])
+    assert all(TEXT_KEY not in doc.metadata for doc, _ in results)
+    assert results[0][0].metadata["page_number"] == 1
+
+
+def test_mmr_search_reads_text_from_the_docstore(store):
+    docs = store.max_marginal_relevance_search("rural roads funds", k=2, fetch_k=4, namespace="budget")
+
+    assert [doc.page_content for doc in docs][0] == TEXTS[0]
+    assert all(doc.page_content in TEXTS[:3] for doc in docs)
+
+
+def test_async_searches_read_text_from_the_docstore(store):
+    async def search():
+        scored = await store.asimilarity_search_with_score("income tax", k=2, namespace="budget")
+        mmr = await store.amax_marginal_relevance_search("income tax", k=2, fetch_k=4, namespace="budget")
+        return scored, mmr
+
+    scored, mmr = asyncio.run(search())
+
+    assert scored[0][0].page_content == TEXTS[1]
+    assert mmr[0].page_content == TEXTS[1]
+    assert all(doc.page_content for doc in mmr)
@@ -0,0 +1,95 @@
+"""
+Tests for adaptive embedding batching.
+"""
+from app.services.embedding_batcher import AdaptiveBatcher, estimate_tokens
+
+
+def test_batches_respect_text_limit():
+    batcher = AdaptiveBatcher(max_texts=4, min_texts=1, initial_texts=3)
+
+    batches = list(batcher.batches([f"t{i}" for i in range(7)]))
+
+    assert [len(b) for b in batches] == [3, 3, 1]
+    assert sum(batches, []) == [f"t{i}" for i in range(7)]
+
+
+def test_batches_respect_token_and_byte_budgets():
+    text = "x" * 40
+    assert estimate_tokens(text) == 11
+
+    by_tokens = AdaptiveBatcher(initial_texts=96, max_tokens=25)
+    assert [len(b) for b in by_tokens.batches([text] * 5)] == [2, 2, 1]
+
+    by_bytes = AdaptiveBatcher(initial_texts=96, max_bytes=100)
+    assert [len(b) for b in by_bytes.batches([text] * 5)] == [2, 2, 1]
+
+
+def test_oversized_text_still_gets_its_own_batch():
+    batcher = AdaptiveBatcher(max_bytes=10)
+
+    assert list(batcher.batches(["a" * 50, "b"])) == [["a" * 50], ["b"]]
+
+
+def test_limit_grows_on_fast_batches_up_to_max():
+    batcher = AdaptiveBatcher(max_texts=20, min_texts=4, initial_texts=10, increase_step=8, target_latency=1.0)
+
+    batcher.record(["a"], latency=0.1)
+    assert batcher.batch_limit == 18
+    batcher.record(["a"], latency=0.1)
+    assert batcher.batch_limit == 20
+
+
+def test_limit_shrinks_on_throttling_timeouts_and_slowness():
+    batcher = AdaptiveBatcher(max_texts=96, min_texts=8, initial_texts=64, target_latency=1.0)
+
+    batcher.record(["a"], latency=0.1, throttled=True)
+    assert batcher.batch_limit == 32
+    batcher.record(["a"], latency=0.1, timed_out=True)
+    assert batcher.batch_limit == 16
+    batcher.record(["a"], latency=2.5)
+    assert batcher.batch_limit == 12
+    batcher.record(["a"], latency=1.5)
+    assert batcher.batch_limit == 12
+    batcher.record(["a"], latency=0.1, throttled=True)
+    assert batcher.batch_limit == 8
+
+
+def test_only_consecutive_failures_shrink_the_limit():
+    batcher = AdaptiveBatcher(max_texts=96, min_texts=8, initial_texts=64, target_latency=1.0, failure_threshold=2)
+
+    batcher.record(["a"], latency=0.1, failed=True)
+    assert batcher.batch_limit == 64
+    batcher.record(["a"], latency=0.1)
+    batcher.record(["a"], latency=0.1, failed=True)
+    assert batcher.batch_limit == 72
+
+    batcher.record(["a"], latency=0.1, failed=True)
+    assert batcher.batch_limit == 36
+    batcher.record(["a"], latency=0.1, failed=True)
+    assert batcher.batch_limit == 18
+    assert batcher.stats()["failed_batches"] == 4
+
+
+def test_later_batches_use_the_updated_limit():
+    batcher = AdaptiveBatcher(max_texts=96, min_texts=2, initial_texts=4)
+    batches = batcher.batches([str(i) for i in range(10)])
+
+    first = next(batches)
+    batcher.record(first, latency=0.1, throttled=True)
+
+    assert len(first) == 4
+    assert [len(b) for b in batches] == [2, 2, 2]
+
+
+def test_stats_totals():
+    batcher = AdaptiveBatcher()
+    batcher.record(["a", "b"], latency=0.2)
+    batcher.record(["c"], latency=0.4, throttled=True)
+
+    stats = batcher.stats()
+
+    assert stats["total_batches"] == 2
+    assert stats["total_texts"] == 3
+    assert stats["throttled_batches"] == 1
+    assert stats["latency_ms_p50"] == 400.0
+    assert len(stats["recent_batches"]) == 2
@@ -0,0 +1,92 @@
+"""
+Tests for the persistent and query embedding caches.
+"""
+import numpy as np
+
+from app.services import embedding_cache
+from app.services.embedding_cache import EmbeddingCache, QueryEmbeddingCache
+
+
+def test_cache_round_trips_vectors_per_input_type(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"), "model-a")
+    vectors = np.array([[1, 2], [3, 4]], dtype=np.float32)
+
+    cache.put_many(["a", "b"], vectors, "search_document")
+    found = cache.get_many(["b", "c", "a"], "search_document")
+
+    np.testing.assert_array_equal(found[0], vectors[1])
+    assert found[1] is None
+    np.testing.assert_array_equal(found[2], vectors[0])
+    assert cache.get_many(["a"], "search_query") == [None]
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+def test_cache_evicts_least_recently_used(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(embedding_cache, "time", clock)
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"), "model-a", max_entries=2)
+
+    cache.put_many(["a", "b"], np.zeros((2, 2), dtype=np.float32), "search_document")
+    clock.advance(1)
+    cache.get_many(["a"], "search_document")
+    clock.advance(1)
+    cache.put_many(["c"], np.zeros((1, 2), dtype=np.float32), "search_document")
+
+    found = cache.get_many(["a", "b", "c"], "search_document")
+    assert [f is not None for f in found] == [True, False, True]
+    assert cache.evictions == 1
+
+
+def test_cache_is_cleared_when_the_model_changes(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    EmbeddingCache(path, "model-a").put_many(["a"], np.ones((1, 2), dtype=np.float32), "search_document")
+
+    assert EmbeddingCache(path, "model-a").get_many(["a"], "search_document")[0] is not None
+    assert EmbeddingCache(path, "model-b").get_many(["a"], "search_document") == [None]
+
+
+def test_cache_keeps_quantized_dtype(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite"), "model-a:int8", dtype=np.int8)
+    cache.put_many(["a"], np.array([[-5, 7, 127]], dtype=np.int8), "search_document")
+
+    vector = cache.get_many(["a"], "search_document")[0]
+    assert vector.dtype == np.int8
+    assert vector.tolist() == [-5, 7, 127]
+
+
+def test_query_cache_normalizes_whitespace_and_expires(monkeypatch, clock):
+    monkeypatch.setattr(embedding_cache, "time", clock)
+    cache = QueryEmbeddingCache("model-a", ttl_seconds=10)
+    cache.put("what is  RAG?", np.array([0.5, 0.25]))
+
+    vector = cache.get(" what is RAG? ")
+    assert vector.dtype == np.float32
+    assert not vector.flags.writeable
+
+    clock.advance(10)
+    assert cache.get("what is RAG?") is None
+    assert (cache.local_hits, cache.misses) == (1, 1)
+
+
+def test_query_cache_local_tier_is_lru_bounded():
+    cache = QueryEmbeddingCache("model-a", max_entries=2)
+    for text in ["a", "b"]:
+        cache.put(text, np.zeros(2))
+    cache.get("a")
+    cache.put("c", np.zeros(2))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_query_cache_shared_tier_is_seen_by_other_instances(tmp_path):
+    path = str(tmp_path / "queries.sqlite")
+    writer = QueryEmbeddingCache("model-a", shared_path=path)
+    reader = QueryEmbeddingCache("model-a", shared_path=path)
+    other_model = QueryEmbeddingCache("model-b", shared_path=path)
+
+    writer.put("hello", np.array([1.0, 2.0]))
+
+    assert reader.get("hello").tolist() == [1.0, 2.0]
+    assert reader.shared_hits == 1
+    assert other_model.get("hello") is None
@@ -0,0 +1,304 @@
+"""
+Tests for the Cohere HTTP client, its circuit breaker and query coalescing.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from app.services import embeddings
+from app.config import Config
+from app.services.embedding_batcher import AdaptiveBatcher
+from app.services.embeddings import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CohereEmbeddings,
+    CohereHTTPClient,
+    QueryCoalescer,
+    normalize_rows
+)
+from app.utils import rate_limiter
+from app.utils.rate_limiter import RateLimiter
+from benchmarks.fake_cohere_server import FakeCohereServer
+
+PAYLOAD = {"texts": ["hello"], "model": "m", "input_type": "search_query", "embedding_types": ["float"]}
+
+
+@pytest.fixture
+def server():
+    server = FakeCohereServer(latency_ms=0, per_text_ms=0, jitter=0, seed=1).start()
+    yield server
+    server.stop()
+
+
+def make_client(server, **kwargs) -> CohereHTTPClient:
+    kwargs.setdefault("backoff_base", 0.001)
+    kwargs.setdefault("backoff_max", 0.001)
+    return CohereHTTPClient(api_url=server.url, headers={"Authorization": "Bearer test"}, **kwargs)
+
+
+def test_breaker_opens_after_threshold(monkeypatch, clock):
+    monkeypatch.setattr(embeddings, "time", clock)
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    assert breaker.open_events == 1
+
+
+def test_breaker_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == "closed"
+
+
+def test_breaker_half_open_allows_a_single_trial(monkeypatch, clock):
+    monkeypatch.setattr(embeddings, "time", clock)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+
+    clock.advance(10)
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_breaker_failed_trial_reopens(monkeypatch, clock):
+    monkeypatch.setattr(embeddings, "time", clock)
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+
+    clock.advance(10)
+    assert breaker.allow()
+    breaker.record_failure()
+
+    assert breaker.state == "open"
+    assert breaker.open_events == 2
+
+
+def test_client_retries_server_errors_then_returns_last_response(server):
+    server.error_rate = 1.0
+    client = make_client(server, max_retries=2, circuit_breaker=CircuitBreaker(failure_threshold=10))
+    outcome = {}
+
+    response = client.post(PAYLOAD, outcome=outcome)
+
+    assert response.status_code == 500
+    assert outcome == {"attempts": 3, "errors": 3}
+    assert client.stats()["retries"] == 2
+    assert server.stats()["requests"] == 3
+
+
+def test_client_fails_fast_while_circuit_is_open(server):
+    server.error_rate = 1.0
+    client = make_client(server, max_retries=5, circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+    with pytest.raises(CircuitOpenError):
+        client.post(PAYLOAD)
+
+    assert server.stats()["requests"] == 2
+    assert client.stats()["fast_failures"] == 1
+
+
+def test_throttling_does_not_open_the_circuit(server):
+    server.throttle_rate = 1.0
+    server.retry_after = 0
+    client = make_client(server, max_retries=3, circuit_breaker=CircuitBreaker(failure_threshold=1))
+    outcome = {}
+
+    response = client.post(PAYLOAD, outcome=outcome)
+
+    assert response.status_code == 429
+    assert outcome["throttled"] is True
+    assert client.circuit_breaker.state == "closed"
+
+
+def test_retry_after_is_slept_without_a_rate_limiter(server, monkeypatch, clock):
+    monkeypatch.setattr(embeddings, "time", clock)
+    server.throttle_rate = 1.0
+    server.retry_after = 2
+    client = make_client(server, max_retries=1)
+
+    assert client.post(PAYLOAD).status_code == 429
+
+    assert clock.slept == [2.0]
+    assert server.stats()["requests"] == 2
+
+
+def test_retry_after_is_waited_once_in_the_rate_limiter(server, monkeypatch, clock):
+    monkeypatch.setattr(embeddings, "time", clock)
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    server.throttle_rate = 1.0
+    server.retry_after = 2
+    limiter = RateLimiter(requests_per_minute=600, items_per_minute=0)
+    client = make_client(server, max_retries=1, rate_limiter=limiter)
+
+    assert client.post(PAYLOAD).status_code == 429
+
+    # The pause covers Retry-After plus the time to earn a request token; no sleep on top of it
+    assert clock.slept == [pytest.approx(2.1)]
+    assert server.stats()["requests"] == 2
+
+
+def test_client_reuses_pooled_connections(server):
+    client = make_client(server)
+
+    for _ in range(5):
+        assert client.post(PAYLOAD).status_code == 200
+
+    stats = client.stats()
+    assert stats["requests_sent"] == 5
+    assert stats["connections_opened"] == 1
+    assert stats["connections_reused"] == 4
+
+
+def test_async_client_is_closed_when_its_loop_shuts_down(server):
+    client = make_client(server)
+    clients = []
+
+    async def call():
+        response = await client.apost(PAYLOAD)
+        clients.append(await client._get_async_client())
+        return response.status_code
+
+    assert asyncio.run(call()) == 200
+    assert asyncio.run(call()) == 200
+
+    assert clients[0] is not clients[1]
+    assert all(c.is_closed for c in clients)
+    assert client._async_clients == {}
+
+
+def test_aclose_closes_the_running_loops_client(server):
+    client = make_client(server)
+
+    async def call():
+        await client.apost(PAYLOAD)
+        async_client = await client._get_async_client()
+        await client.aclose()
+        return async_client
+
+    assert asyncio.run(call()).is_closed
+    assert client._async_clients == {}
+
+
+def test_coalescer_batches_concurrent_queries_and_routes_rows():
+    calls = []
+    release = threading.Event()
+
+    def embed_batch(texts):
+        calls.append(list(texts))
+        release.wait(5)
+        return np.array([[float(len(t))] for t in texts], dtype=np.float32)
+
+    coalescer = QueryCoalescer(embed_batch, window_seconds=0.2, max_batch=8)
+    texts = ["a", "bb", "ccc", "bb"]
+
+    with ThreadPoolExecutor(max_workers=len(texts)) as pool:
+        futures = [pool.submit(coalescer.submit, t) for t in texts]
+        time.sleep(0.1)
+        release.set()
+        results = [f.result(5) for f in futures]
+
+    assert [r[0] for r in results] == [1.0, 2.0, 3.0, 2.0]
+    assert len(calls) == 1
+    assert sorted(calls[0]) == ["a", "bb", "ccc"]
+    assert coalescer.stats()["deduplicated"] == 1
+
+
+def test_coalescer_flushes_when_max_batch_is_reached():
+    calls = []
+
+    def embed_batch(texts):
+        calls.append(len(texts))
+        return np.zeros((len(texts), 1), dtype=np.float32)
+
+    coalescer = QueryCoalescer(embed_batch, window_seconds=5, max_batch=2)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(coalescer.submit, ["a", "b"]))
+
+    assert calls == [2]
+
+
+def test_coalescer_propagates_errors_to_every_caller():
+    def embed_batch(texts):
+        raise RuntimeError("boom")
+
+    coalescer = QueryCoalescer(embed_batch, window_seconds=0.05)
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        futures = [pool.submit(coalescer.submit, t) for t in ["a", "b"]]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="boom"):
+                future.result(5)
+
+
+def test_normalize_rows_leaves_zero_rows_alone():
+    vectors = np.array([[3, 4], [0, 0]], dtype=np.float32)
+
+    normalize_rows(vectors)
+
+    np.testing.assert_allclose(vectors, [[0.6, 0.8], [0, 0]])
+
+
+def test_cohere_embeddings_return_normalized_float32_arrays(server, monkeypatch):
+    monkeypatch.setattr(Config, "EMBEDDING_DIMENSION", server.dimension)
+    model = CohereEmbeddings(api_key="test", http_client=make_client(server))
+
+    documents = model.embed_documents_array(["a", "b", "c"])
+    query = model.embed_query_array("a")
+
+    assert documents.dtype == np.float32 and documents.shape == (3, server.dimension)
+    assert query.dtype == np.float32 and query.shape == (server.dimension,)
+    np.testing.assert_allclose(np.linalg.norm(documents, axis=1), 1.0, rtol=1e-5)
+    np.testing.assert_allclose(query, documents[0], rtol=1e-5)
+    assert model.embed_documents(["a"])[0] == pytest.approx(documents[0].tolist())
+
+
+def test_dimension_mismatch_is_rejected(server, monkeypatch):
+    monkeypatch.setattr(Config, "EMBEDDING_DIMENSION", server.dimension + 1)
+    model = CohereEmbeddings(api_key="test", http_client=make_client(server))
+
+    with pytest.raises(RuntimeError, match="EMBEDDING_DIMENSION"):
+        model.embed_documents_array(["a"])
+
+
+def test_error_recovered_by_a_retry_does_not_shrink_batches(server, monkeypatch):
+    monkeypatch.setattr(Config, "EMBEDDING_DIMENSION", server.dimension)
+    client = make_client(server, max_retries=2)
+    send = client.session.post
+
+    def send_then_recover(*args, **kwargs):
+        response = send(*args, **kwargs)
+        server.error_rate = 0.0
+        return response
+
+    # The first request gets a 500 and its retry succeeds
+    server.error_rate = 1.0
+    monkeypatch.setattr(client.session, "post", send_then_recover)
+    batcher = AdaptiveBatcher(max_texts=96, min_texts=8, initial_texts=32, target_latency=10.0)
+    model = CohereEmbeddings(api_key="test", http_client=client, batcher=batcher)
+
+    model.embed_documents_array(["a"])
+
+    assert server.stats()["errors_injected"] == 1
+    assert batcher.batch_limit > 32
+    assert batcher.stats()["failed_batches"] == 0
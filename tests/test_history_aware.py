@@ -0,0 +1,44 @@
+"""
+Tests for history-aware retrieval and its namespace routing.
+"""
+import pytest
+from langchain_core.language_models import FakeListLLM
+
+from app.config import Config
+from app.rag import history_aware
+
+
+@pytest.fixture
+def searches(monkeypatch):
+    calls = []
+
+    def retrieve_documents(query, metadata_filter=None, namespaces=None):
+        calls.append({"query": query, "metadata_filter": metadata_filter, "namespaces": namespaces})
+        return []
+
+    monkeypatch.setattr(Config, "ROUTER_ENABLED", True)
+    monkeypatch.setattr(history_aware, "get_llm", lambda: FakeListLLM(responses=["unused"]))
+    monkeypatch.setattr(history_aware, "route_query", lambda query: ["budget-speech"])
+    monkeypatch.setattr(history_aware, "retrieve_documents", retrieve_documents)
+    monkeypatch.setattr(history_aware, "_history_aware_retriever", None)
+    return calls
+
+
+def test_query_is_routed_without_an_explicit_scope(searches):
+    history_aware.retrieve_with_history("Summarize the budget speech", [])
+
+    assert searches == [{"query": "Summarize the budget speech", "metadata_filter": None, "namespaces": ["budget-speech"]}]
+
+
+def test_explicit_namespaces_are_not_routed(searches):
+    history_aware.retrieve_with_history("Summarize the budget speech", [], namespaces=["annual-report"])
+
+    assert searches[0]["namespaces"] == ["annual-report"]
+
+
+def test_metadata_filter_searches_every_namespace(searches):
+    metadata_filter = {"doc_name": {"$eq": "annual-report.pdf"}}
+
+    history_aware.retrieve_with_history("Summarize the budget speech", [], metadata_filter=metadata_filter)
+
+    assert searches == [{"query": "Summarize the budget speech", "metadata_filter": metadata_filter, "namespaces": None}]
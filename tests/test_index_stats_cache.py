@@ -0,0 +1,176 @@
+"""
+Tests for the cached index statistics.
+"""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import index_stats_cache
+from app.services.index_stats_cache import IndexStatsCache
+
+
+class FakeIndex:
+    """describe_index_stats() stand-in whose counts and timing tests control."""
+
+    def __init__(self, **namespaces):
+        self.namespaces = dict(namespaces)
+        self.calls = 0
+        self.fail = False
+        self.entered = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def fetch(self):
+        self.calls += 1
+        snapshot = dict(self.namespaces)
+        self.entered.set()
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("index unavailable")
+        return SimpleNamespace(
+            total_vector_count=sum(snapshot.values()),
+            dimension=4,
+            namespaces={name: {"vector_count": count} for name, count in snapshot.items()}
+        )
+
+    def hold(self):
+        self.entered.clear()
+        self.release.clear()
+
+
+def counts(stats):
+    return {name: summary["vector_count"] for name, summary in stats["namespaces"].items()}
+
+
+def test_adjust_updates_cached_counts_without_fetching():
+    index = FakeIndex(a=10)
+    cache = IndexStatsCache(index.fetch)
+    cache.get()
+
+    cache.adjust("a", 5)
+    cache.adjust("b", 3)
+    cache.adjust(None, 2)
+    stats = cache.get()
+
+    assert counts(stats) == {"a": 15, "b": 3, "__default__": 2}
+    assert stats["total_vector_count"] == 20
+    assert stats["cache"]["adjusted"] is True
+    assert index.calls == 1
+
+
+def test_deletes_never_go_below_zero():
+    cache = IndexStatsCache(FakeIndex(a=2).fetch)
+    cache.get()
+
+    cache.adjust("a", -5)
+
+    assert counts(cache.get()) == {}
+    assert cache.get()["total_vector_count"] == 0
+
+
+def test_adjustments_before_a_refresh_are_not_applied_twice():
+    index = FakeIndex(a=10)
+    cache = IndexStatsCache(index.fetch)
+    cache.get()
+
+    cache.adjust("a", 5)
+    index.namespaces["a"] = 15
+    stats = cache.get(refresh=True)
+
+    assert counts(stats) == {"a": 15}
+    assert stats["cache"]["adjusted"] is False
+    assert cache._deltas == [cache._deltas[0]] and cache._deltas[0][1] == {}
+
+
+def test_adjustments_during_a_refresh_are_reapplied_to_its_result():
+    index = FakeIndex(a=10)
+    cache = IndexStatsCache(index.fetch)
+    cache.get()
+
+    index.hold()
+    refresh = threading.Thread(target=cache.get, kwargs={"refresh": True})
+    refresh.start()
+    assert index.entered.wait(5)
+
+    # Written after the index was read, so missing from the fetched stats
+    cache.adjust("a", 4)
+    index.release.set()
+    refresh.join(5)
+
+    assert counts(cache.get()) == {"a": 14}
+    assert len(cache._deltas) == 1
+
+
+def test_failed_refreshes_do_not_accumulate_delta_epochs():
+    index = FakeIndex(a=10)
+    cache = IndexStatsCache(index.fetch)
+    cache.get()
+    index.fail = True
+
+    for _ in range(5):
+        cache.adjust("a", 1)
+        cache.get(refresh=True)
+
+    stats = cache.get()
+    assert counts(stats) == {"a": 15}
+    assert stats["cache"]["last_error"] == "index unavailable"
+    assert len(cache._deltas) == 1
+
+    index.fail = False
+    index.namespaces["a"] = 15
+    assert counts(cache.get(refresh=True)) == {"a": 15}
+
+
+def test_first_fetch_error_is_raised():
+    index = FakeIndex()
+    index.fail = True
+
+    with pytest.raises(RuntimeError):
+        IndexStatsCache(index.fetch).get()
+
+
+def test_expired_stats_are_served_stale_while_refreshing(monkeypatch, clock):
+    monkeypatch.setattr(index_stats_cache, "time", clock)
+    index = FakeIndex(a=1)
+    cache = IndexStatsCache(index.fetch, ttl=30, max_stale=600)
+    cache.get()
+
+    index.namespaces["a"] = 2
+    index.hold()
+    clock.advance(31)
+    stats = cache.get()
+
+    assert counts(stats) == {"a": 1}
+    assert stats["cache"]["stale"] is True
+    assert index.entered.wait(5)
+    index.release.set()
+
+    for _ in range(100):
+        if cache.refreshes == 2:
+            break
+        time.sleep(0.01)
+    assert counts(cache.get()) == {"a": 2}
+
+
+def test_changes_made_by_other_processes_expire_the_stats(monkeypatch, clock):
+    monkeypatch.setattr(index_stats_cache, "time", clock)
+    changed = [None]
+    cache = IndexStatsCache(FakeIndex(a=1).fetch, changed_at=lambda: changed[0], check_interval=5)
+    cache.get()
+
+    # A change from before the fetch is already included
+    changed[0] = clock.time() - 1
+    clock.advance(5)
+    cache._check_changed()
+    assert cache.snapshot()["cache"]["stale"] is False
+
+    # A later change is only noticed once check_interval has passed
+    changed[0] = clock.time()
+    cache._check_changed()
+    assert cache.snapshot()["cache"]["stale"] is False
+
+    clock.advance(5)
+    cache._check_changed()
+    assert cache.snapshot()["cache"]["stale"] is True
@@ -0,0 +1,146 @@
+"""
+Tests for the background ingestion job queue.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.db.session import create_sqlite_engine
+from app.services.ingest_jobs import PRIORITY_BULK, PRIORITY_INTERACTIVE, IngestJobQueue
+
+
+@pytest.fixture
+def jobs(tmp_path):
+    return IngestJobQueue(create_sqlite_engine(str(tmp_path / "jobs.sqlite3")), lease_seconds=60, max_attempts=2)
+
+
+def expire_lease(jobs: IngestJobQueue, job_id: str):
+    with jobs.engine.begin() as connection:
+        connection.execute(
+            update(jobs.table)
+            .where(jobs.table.c.id == job_id)
+            .values(heartbeat_at=datetime.utcnow() - timedelta(seconds=jobs.lease_seconds + 1))
+        )
+
+
+def test_claims_follow_priority_then_age(jobs):
+    bulk = jobs.enqueue("all", {}, priority=PRIORITY_BULK)
+    first = jobs.enqueue("files", {}, priority=PRIORITY_INTERACTIVE)
+    second = jobs.enqueue("files", {}, priority=PRIORITY_INTERACTIVE)
+
+    assert jobs.get(second["id"])["queue_position"] == 2
+    assert jobs.get(bulk["id"])["queue_position"] == 3
+    assert jobs.has_waiting(above_priority=PRIORITY_BULK)
+
+    claimed = [jobs.claim("w1")["id"] for _ in range(3)]
+
+    assert claimed == [first["id"], second["id"], bulk["id"]]
+    assert jobs.claim("w1") is None
+    assert not jobs.has_waiting(above_priority=PRIORITY_BULK)
+
+
+def test_concurrent_workers_never_claim_the_same_job(jobs):
+    queued = {jobs.enqueue("all", {})["id"] for _ in range(5)}
+    barrier = threading.Barrier(8)
+    claimed = []
+
+    def work(worker_id):
+        barrier.wait()
+        while True:
+            job = jobs.claim(worker_id)
+            if job is None:
+                return
+            claimed.append(job["id"])
+
+    threads = [threading.Thread(target=work, args=(f"w{i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(claimed) == sorted(queued)
+
+
+def test_only_the_holding_worker_can_update_a_job(jobs):
+    job = jobs.enqueue("all", {})
+    jobs.claim("w1")
+
+    assert not jobs.heartbeat(job["id"], "w2")
+    assert not jobs.finish(job["id"], "w2", "success")
+    assert jobs.heartbeat(job["id"], "w1", progress={"files_done": 1})
+    assert jobs.finish(job["id"], "w1", "success", result={"files": 1})
+
+    finished = jobs.get(job["id"])
+    assert finished["status"] == "success"
+    assert finished["progress"] == {"files_done": 1}
+    assert finished["result"] == {"files": 1}
+    assert not jobs.heartbeat(job["id"], "w1")
+
+
+def test_job_with_a_silent_worker_is_taken_over(jobs):
+    job = jobs.enqueue("all", {})
+    jobs.claim("w1")
+
+    assert jobs.claim("w2") is None
+    expire_lease(jobs, job["id"])
+    taken = jobs.claim("w2")
+
+    assert taken["id"] == job["id"]
+    assert taken["worker_id"] == "w2"
+    assert taken["attempts"] == 2
+    assert not jobs.finish(job["id"], "w1", "success")
+
+
+def test_job_is_failed_after_max_attempts_and_its_uploads_deleted(jobs):
+    job = jobs.enqueue("files", {}, uploads=[("a.pdf", b"%PDF-1.4 a")])
+    upload_id = job["payload"]["uploads"][0]["id"]
+
+    for worker_id in ("w1", "w2"):
+        assert jobs.claim(worker_id)["id"] == job["id"]
+        expire_lease(jobs, job["id"])
+
+    assert jobs.claim("w3") is None
+    failed = jobs.get(job["id"])
+    assert failed["status"] == "error"
+    assert failed["error"] == "Worker stopped responding"
+    with pytest.raises(KeyError):
+        jobs.upload_data(upload_id)
+
+
+def test_requeue_does_not_count_as_an_attempt(jobs):
+    job = jobs.enqueue("all", {})
+    jobs.claim("w1")
+
+    assert jobs.requeue(job["id"], "w1", progress={"files_done": 3})
+    requeued = jobs.get(job["id"])
+    assert requeued["status"] == "queued"
+    assert requeued["attempts"] == 0
+    assert requeued["progress"] == {"files_done": 3}
+
+
+def test_uploads_are_stored_with_the_job(jobs):
+    job = jobs.enqueue("files", {"force": True}, priority=PRIORITY_INTERACTIVE, uploads=[
+        ("a.pdf", b"first"), ("b.pdf", b"second")
+    ])
+
+    uploads = job["payload"]["uploads"]
+    assert job["payload"]["force"] is True
+    assert [u["filename"] for u in uploads] == ["a.pdf", "b.pdf"]
+    assert job["progress"]["files_total"] == 2
+    assert jobs.upload_data(uploads[1]["id"]) == b"second"
+
+    assert jobs.delete_uploads(job["id"]) == 2
+    with pytest.raises(KeyError):
+        jobs.upload_data(uploads[0]["id"])
+
+
+def test_last_finished_at_is_a_wall_clock_timestamp(jobs):
+    assert jobs.last_finished_at() is None
+    job = jobs.enqueue("all", {})
+    jobs.claim("w1")
+    jobs.finish(job["id"], "w1", "success")
+
+    assert jobs.last_finished_at() == pytest.approx(time.time(), abs=5)
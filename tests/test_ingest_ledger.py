@@ -0,0 +1,108 @@
+"""
+Tests for the transactional ingestion ledger.
+"""
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+from app.db.session import create_sqlite_engine
+from app.services.ingest_ledger import IngestLedger
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return IngestLedger(create_sqlite_engine(str(tmp_path / "ledger.sqlite3")), lease_seconds=60)
+
+
+def expire_claim(ledger: IngestLedger, filename: str):
+    with ledger.engine.begin() as connection:
+        connection.execute(
+            update(ledger.table)
+            .where(ledger.table.c.filename == filename)
+            .values(started_at=datetime.utcnow() - timedelta(seconds=ledger.lease_seconds + 1))
+        )
+
+
+def test_success_is_recorded_and_skips_same_content(ledger):
+    claim = ledger.begin("a.pdf", "h1", "doc-a")
+
+    assert ledger.finish("a.pdf", claim, "success", chunks=2, vector_ids=["doc-a_0", "doc-a_1"])
+    assert ledger.is_processed("a.pdf", "h1")
+    assert not ledger.is_processed("a.pdf", "h2")
+
+    record = ledger.get("a.pdf")
+    assert record["status"] == "success"
+    assert record["vector_ids"] == ["doc-a_0", "doc-a_1"]
+    assert record["claim_id"] is None and record["duration_seconds"] >= 0
+
+    assert ledger.begin("a.pdf", "h1", "doc-a") is None
+    assert ledger.begin("a.pdf", "h1", "doc-a", force=True) is not None
+
+
+def test_changed_content_and_failed_ingests_can_be_reclaimed(ledger):
+    claim = ledger.begin("a.pdf", "h1", "doc-a")
+    ledger.finish("a.pdf", claim, "success")
+    claim = ledger.begin("a.pdf", "h2", "doc-a")
+    assert claim is not None
+
+    ledger.finish("a.pdf", claim, "error", error="boom")
+    assert ledger.get("a.pdf")["error"] == "boom"
+    assert ledger.begin("a.pdf", "h2", "doc-a") is not None
+    assert ledger.get("a.pdf")["attempts"] == 3
+
+
+def test_file_in_progress_cannot_be_claimed_twice(ledger):
+    assert ledger.begin("a.pdf", "h1", "doc-a") is not None
+
+    assert ledger.begin("a.pdf", "h1", "doc-a") is None
+    assert ledger.begin("a.pdf", "h2", "doc-a", force=True) is None
+
+
+@pytest.mark.parametrize("existing", [False, True])
+def test_concurrent_claims_have_a_single_winner(ledger, existing):
+    if existing:
+        ledger.finish("a.pdf", ledger.begin("a.pdf", "h1", "doc-a"), "error")
+
+    barrier = threading.Barrier(8)
+    claims = []
+
+    def claim():
+        barrier.wait()
+        claims.append(ledger.begin("a.pdf", "h2", "doc-a"))
+
+    threads = [threading.Thread(target=claim) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    winners = [c for c in claims if c is not None]
+    assert len(claims) == 8
+    assert len(winners) == 1
+    assert ledger.get("a.pdf")["claim_id"] == winners[0]
+
+
+def test_expired_claim_is_taken_over_and_the_old_finish_is_rejected(ledger):
+    stale = ledger.begin("a.pdf", "h1", "doc-a")
+    expire_claim(ledger, "a.pdf")
+
+    fresh = ledger.begin("a.pdf", "h1", "doc-a")
+
+    assert fresh is not None and fresh != stale
+    assert not ledger.finish("a.pdf", stale, "success")
+    assert ledger.get("a.pdf")["status"] == "processing"
+    assert ledger.finish("a.pdf", fresh, "success")
+
+
+def test_import_json_keeps_existing_records(ledger, tmp_path):
+    ledger.finish("a.pdf", ledger.begin("a.pdf", "h1", "doc-a"), "error")
+    legacy = tmp_path / ".processed_files.json"
+    legacy.write_text(json.dumps({"a.pdf": "h0", "b.pdf": "h2"}))
+
+    assert ledger.import_json(str(legacy)) == 1
+    assert ledger.get("a.pdf")["status"] == "error"
+    assert ledger.is_processed("b.pdf", "h2")
+    assert [r["filename"] for r in ledger.records(status="success")] == ["b.pdf"]
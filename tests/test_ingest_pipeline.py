@@ -0,0 +1,110 @@
+"""
+Tests for the pipelined embed-and-upsert ingestion stage.
+"""
+import random
+import threading
+import time
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from app.services.ingest_pipeline import EmbedUpsertPipeline
+
+
+def make_batches(count: int, size: int = 2):
+    return [
+        (
+            [f"v{b}-{i}" for i in range(size)],
+            [Document(page_content=f"text {b}-{i}", metadata={"batch": b}) for i in range(size)]
+        )
+        for b in range(count)
+    ]
+
+
+def embed(texts):
+    return np.array([[float(len(t))] for t in texts], dtype=np.float32)
+
+
+def test_returns_ids_in_input_order_despite_out_of_order_upserts():
+    def upsert(records):
+        # Finish batches in a scrambled order
+        time.sleep(random.uniform(0, 0.01))
+
+    pipeline = EmbedUpsertPipeline(embed, upsert, upsert_workers=4)
+    batches = make_batches(10)
+
+    ids = pipeline.run(batches)
+
+    assert ids == [vector_id for batch_ids, _ in batches for vector_id in batch_ids]
+
+
+def test_records_carry_vectors_and_text_metadata():
+    upserted = []
+    lock = threading.Lock()
+
+    def upsert(records):
+        with lock:
+            upserted.extend(records)
+
+    EmbedUpsertPipeline(embed, upsert).run(make_batches(1))
+    EmbedUpsertPipeline(embed, upsert, text_key=None).run(make_batches(1))
+
+    assert upserted[0]["id"] == "v0-0"
+    assert upserted[0]["values"].tolist() == [8.0]
+    assert upserted[0]["metadata"] == {"batch": 0, "text": "text 0-0"}
+    assert upserted[2]["metadata"] == {"batch": 0}
+
+
+def test_failed_batches_are_excluded_and_handed_off():
+    failed = []
+
+    def flaky_embed(texts):
+        if texts[0].startswith("text 1-"):
+            raise RuntimeError("embed failed")
+        return embed(texts)
+
+    def flaky_upsert(records):
+        if records[0]["id"].startswith("v2-"):
+            raise RuntimeError("upsert failed")
+
+    pipeline = EmbedUpsertPipeline(
+        flaky_embed,
+        flaky_upsert,
+        on_upsert_failure=lambda records, error: failed.append(([r["id"] for r in records], str(error)))
+    )
+    stats = {}
+
+    ids = pipeline.run(make_batches(4), stats=stats)
+
+    assert ids == ["v0-0", "v0-1", "v3-0", "v3-1"]
+    assert failed == [(["v2-0", "v2-1"], "upsert failed")]
+    assert stats["embed"]["failed_batches"] == 1
+    assert stats["upsert"]["failed_batches"] == 1
+    assert stats["upsert"]["items"] == 4
+
+
+def test_failing_failure_handler_does_not_stop_the_pipeline():
+    def upsert(records):
+        if records[0]["id"].startswith("v0-"):
+            raise RuntimeError("upsert failed")
+
+    def on_failure(records, error):
+        raise OSError("retry queue unavailable")
+
+    ids = EmbedUpsertPipeline(embed, upsert, on_upsert_failure=on_failure).run(make_batches(2))
+
+    assert ids == ["v1-0", "v1-1"]
+
+
+def test_error_in_batch_source_still_stops_the_workers():
+    def batches():
+        yield make_batches(1)[0]
+        raise ValueError("bad source")
+
+    pipeline = EmbedUpsertPipeline(embed, lambda records: None)
+
+    with pytest.raises(ValueError, match="bad source"):
+        pipeline.run(batches())
+
+    assert not any(t.name.startswith("ingest-") for t in threading.enumerate())
@@ -0,0 +1,256 @@
+"""
+Tests for the ingestion runner: manifests, ledger records, failed upserts
+and parallel ingestion.
+"""
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pymupdf
+import pytest
+
+from app import ingest_runner
+from app.config import Config
+from app.db.session import create_sqlite_engine
+from app.services import docstore, embeddings, ingest_ledger, pinecone_client
+from app.services.chunk_manifest import load_manifest
+from app.services.ingest_ledger import IngestLedger
+from app.services.local_embeddings import HashingEmbeddings
+from app.services.local_vector_store import LocalIndex
+from app.services.pdf_loader import chunk_pdf
+from app.utils.id_generator import generate_stable_doc_id
+
+DIMENSION = 32
+PAGES = [
+    "The budget allocates funds to rural roads.",
+    "Income tax slabs are unchanged this year.",
+    "Defence spending rises by eight percent."
+]
+
+
+class FlakyIndex:
+    """LocalIndex whose upserts fail for vectors of the given pages."""
+
+    def __init__(self, index: LocalIndex, failing_pages=()):
+        self.index = index
+        self.failing_pages = set(failing_pages)
+
+    def upsert(self, vectors, **kwargs):
+        if any(vector["metadata"]["page_number"] in self.failing_pages for vector in vectors):
+            raise ConnectionError("upsert failed")
+        return self.index.upsert(vectors, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.index, name)
+
+
+def write_pdf(path, pages=PAGES):
+    pdf = pymupdf.open()
+    for text in pages:
+        pdf.new_page().insert_text((72, 72), text)
+    pdf.save(str(path))
+    pdf.close()
+    return str(path)
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "EMBEDDING_DIMENSION", DIMENSION)
+    monkeypatch.setattr(Config, "INGEST_MANIFEST_DIR", str(tmp_path / "manifests"))
+    monkeypatch.setattr(Config, "PINECONE_BATCH_SIZE", 1)
+    monkeypatch.setattr(Config, "PINECONE_USE_GRPC", "0")
+    monkeypatch.setattr(Config, "PINECONE_NAMESPACE_MODE", "single")
+    monkeypatch.setattr(Config, "DOCSTORE_BACKEND", "none")
+    monkeypatch.setattr(Config, "UPSERT_RETRY_QUEUE_PATH", str(tmp_path / "retry.sqlite3"))
+
+    index = FlakyIndex(LocalIndex(str(tmp_path / "vectors"), DIMENSION, flush_seconds=60))
+    monkeypatch.setattr(pinecone_client, "_index", index)
+    monkeypatch.setattr(pinecone_client, "_retry_queue", None)
+    monkeypatch.setattr(pinecone_client, "_stats_cache", None)
+    monkeypatch.setattr(pinecone_client, "start_upsert_retry_worker", lambda: None)
+    monkeypatch.setattr(docstore, "_docstore", None)
+    monkeypatch.setattr(embeddings, "_embeddings", HashingEmbeddings(DIMENSION))
+    monkeypatch.setattr(
+        ingest_ledger, "_ledger",
+        IngestLedger(create_sqlite_engine(str(tmp_path / "ledger.sqlite3")), lease_seconds=60)
+    )
+    return index
+
+
+def stored_ids(index: FlakyIndex):
+    return sorted(vector_id for page in index.list(prefix="") for vector_id in page)
+
+
+def is_processed(filename: str, pdf_path: str) -> bool:
+    return ingest_runner.is_file_processed(filename, ingest_runner.generate_file_hash(pdf_path))
+
+
+def test_ingest_records_every_chunk(index, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "UPSERT_RETRY_ENABLED", False)
+    pdf_path = write_pdf(tmp_path / "budget.pdf")
+    doc_id = generate_stable_doc_id("budget.pdf")
+
+    result = ingest_runner.ingest_single_pdf(pdf_path)
+
+    assert result["status"] == "success"
+    assert result["vectors_added"] == 3
+    assert sorted(load_manifest(doc_id)["chunks"]) == stored_ids(index)
+    assert sorted(ingest_ledger.get_ingest_ledger().get("budget.pdf")["vector_ids"]) == stored_ids(index)
+    assert is_processed("budget.pdf", pdf_path)
+
+
+def test_lost_upsert_is_partial_and_retried_on_next_run(index, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "UPSERT_RETRY_ENABLED", False)
+    pdf_path = write_pdf(tmp_path / "budget.pdf")
+    doc_id = generate_stable_doc_id("budget.pdf")
+    index.failing_pages = {2}
+
+    result = ingest_runner.ingest_single_pdf(pdf_path)
+
+    assert result["status"] == "partial"
+    assert result["vectors_queued"] == 0
+    # The lost chunk is neither in the manifest nor in the ledger, so it is not taken as stored
+    assert sorted(load_manifest(doc_id)["chunks"]) == stored_ids(index)
+    record = ingest_ledger.get_ingest_ledger().get("budget.pdf")
+    assert "failed to upsert" in record["error"]
+    assert sorted(record["vector_ids"]) == stored_ids(index) and len(stored_ids(index)) == 2
+    assert not is_processed("budget.pdf", pdf_path)
+
+    index.failing_pages = set()
+    result = ingest_runner.ingest_single_pdf(pdf_path)
+
+    assert result["status"] == "success"
+    assert result["vectors_added"] == 1 and result["chunks_unchanged"] == 2
+    assert len(stored_ids(index)) == 3
+
+
+def test_queued_upsert_is_tracked_so_a_reingest_can_delete_it(index, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "UPSERT_RETRY_ENABLED", True)
+    pdf_path = write_pdf(tmp_path / "budget.pdf")
+    doc_id = generate_stable_doc_id("budget.pdf")
+    index.failing_pages = {3}
+
+    result = ingest_runner.ingest_single_pdf(pdf_path)
+
+    assert result["status"] == "partial"
+    assert result["vectors_added"] == 2 and result["vectors_queued"] == 1
+    manifest_ids = sorted(load_manifest(doc_id)["chunks"])
+    assert len(manifest_ids) == 3
+    assert sorted(ingest_ledger.get_ingest_ledger().get("budget.pdf")["vector_ids"]) == manifest_ids
+
+    # The background retry writes the queued vector
+    index.failing_pages = set()
+    assert pinecone_client.replay_failed_upserts()["vectors"] == 1
+    assert stored_ids(index) == manifest_ids
+
+    # Page 3 is removed: its retried vector is deleted as vanished
+    write_pdf(tmp_path / "budget.pdf", PAGES[:2])
+    result = ingest_runner.ingest_single_pdf(pdf_path)
+
+    assert result["status"] == "success"
+    assert result["vectors_deleted"] == 1
+    assert stored_ids(index) == sorted(load_manifest(doc_id)["chunks"]) and len(stored_ids(index)) == 2
+
+
+class RecordingPool(ThreadPoolExecutor):
+    """Thread pool that keeps the futures it hands out."""
+
+    futures = []
+
+    def submit(self, *args, **kwargs):
+        future = super().submit(*args, **kwargs)
+        self.futures.append(future)
+        return future
+
+
+@pytest.fixture
+def parallel(monkeypatch):
+    """Run _ingest_parallel with a recorded thread pool and no shared clients."""
+    for name in ("get_index", "get_docstore", "get_upsert_retry_queue", "get_ingest_ledger", "preload_model"):
+        monkeypatch.setattr(ingest_runner, name, lambda: None)
+    monkeypatch.setattr(RecordingPool, "futures", [])
+    monkeypatch.setattr(ingest_runner, "ThreadPoolExecutor", RecordingPool)
+    started = []
+
+    def use(ingest):
+        def ingest_single_pdf(path, force=False, namespace=None, parser=None):
+            started.append(path)
+            return ingest(path)
+        monkeypatch.setattr(ingest_runner, "ingest_single_pdf", ingest_single_pdf)
+        return started
+
+    return use
+
+
+def test_parallel_results_follow_input_order(parallel):
+    last_done = threading.Event()
+
+    def ingest(path):
+        # The first file finishes last
+        if path == "a.pdf":
+            assert last_done.wait(5)
+        elif path == "c.pdf":
+            last_done.set()
+        return {"status": "success", "filename": path}
+
+    parallel(ingest)
+
+    results = list(ingest_runner._ingest_parallel(["a.pdf", "b.pdf", "c.pdf"], workers=3))
+
+    assert [result["filename"] for result in results] == ["a.pdf", "b.pdf", "c.pdf"]
+
+
+def test_parallel_error_is_isolated_to_its_file(parallel):
+    def ingest(path):
+        if path == "b.pdf":
+            raise RuntimeError("disk error")
+        return None if path == "c.pdf" else {"status": "success", "filename": path}
+
+    parallel(ingest)
+
+    results = list(ingest_runner._ingest_parallel(["a.pdf", "b.pdf", "c.pdf"], workers=2))
+
+    assert results == [
+        {"status": "success", "filename": "a.pdf"},
+        {"status": "error", "filename": "b.pdf", "error": "disk error"},
+        None
+    ]
+
+
+def test_failing_progress_callback_cancels_pending_files(parallel):
+    paths = [f"{name}.pdf" for name in "abcde"]
+
+    def ingest(path):
+        # Files after the first hold their workers until the pending files are cancelled
+        if path != "a.pdf":
+            for _ in range(500):
+                if RecordingPool.futures[-1].cancelled():
+                    break
+                time.sleep(0.01)
+        return {"status": "success", "filename": path}
+
+    started = parallel(ingest)
+    progress = []
+
+    def on_progress(path, result):
+        progress.append(path)
+        raise RuntimeError("stopped")
+
+    with pytest.raises(RuntimeError, match="stopped"):
+        ingest_runner.run_ingestion(pdf_paths=paths, workers=2, on_progress=on_progress)
+
+    # c.pdf may have been picked up by the free worker before the cancellation
+    assert progress == ["a.pdf"]
+    assert {"a.pdf", "b.pdf"} <= set(started) <= {"a.pdf", "b.pdf", "c.pdf"}
+    assert [future.cancelled() for future in RecordingPool.futures[3:]] == [True, True]
+
+
+def test_parse_worker_returns_the_chunks(tmp_path):
+    pdf_path = write_pdf(tmp_path / "budget.pdf")
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as parser:
+        chunks = parser.submit(chunk_pdf, pdf_path).result()
+
+    assert [chunk.page_content for chunk in chunks] == PAGES
+    assert [(chunk.metadata["page"], chunk.metadata["chunk_index"]) for chunk in chunks] == [(0, 0), (1, 0), (2, 0)]
@@ -0,0 +1,78 @@
+"""
+Tests for the background ingestion worker.
+"""
+from pathlib import Path
+
+import pytest
+
+from app import ingest_worker
+from app.config import Config
+from app.db.session import create_sqlite_engine
+from app.ingest_worker import IngestWorker
+from app.services.ingest_jobs import PRIORITY_BULK, PRIORITY_INTERACTIVE, IngestJobQueue
+
+
+@pytest.fixture
+def jobs(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "INGEST_UPLOAD_DIR", str(tmp_path / "uploads"))
+    return IngestJobQueue(create_sqlite_engine(str(tmp_path / "jobs.sqlite3")))
+
+
+@pytest.fixture
+def ingested(monkeypatch):
+    """Replaces run_ingestion; records the file contents each call saw."""
+    calls = []
+
+    def run_ingestion(force, namespace, pdf_paths, on_progress):
+        calls.append({path: Path(path).read_bytes() for path in pdf_paths})
+        for path in pdf_paths:
+            on_progress(path, {"status": "success", "chunks": 1})
+
+    monkeypatch.setattr(ingest_worker, "run_ingestion", run_ingestion)
+    return calls
+
+
+def test_uploads_with_the_same_name_do_not_overwrite_each_other(jobs, ingested):
+    first = jobs.enqueue("files", {}, uploads=[("report.pdf", b"first")])
+    second = jobs.enqueue("files", {}, uploads=[("report.pdf", b"second")])
+    worker = IngestWorker(queue=jobs, worker_id="w1")
+
+    first_paths = worker._upload_paths(jobs.claim("w1"), set())
+    second_paths = worker._upload_paths(jobs.claim("w1"), set())
+
+    assert first_paths != second_paths
+    assert Path(first_paths[0]).read_bytes() == b"first"
+    assert Path(second_paths[0]).read_bytes() == b"second"
+    assert not list(Path(first_paths[0]).parent.glob("*.part"))
+    assert {first["id"], second["id"]} == {Path(p[0]).parent.name for p in (first_paths, second_paths)}
+
+
+def test_finished_job_drops_its_uploads(jobs, ingested):
+    job = jobs.enqueue("files", {}, priority=PRIORITY_INTERACTIVE, uploads=[("a.pdf", b"a"), ("b.pdf", b"b")])
+    worker = IngestWorker(queue=jobs, worker_id="w1")
+
+    assert worker.run_once()
+
+    finished = jobs.get(job["id"])
+    assert finished["status"] == "success"
+    assert finished["result"]["documents_ingested"] == 2
+    assert list(ingested[0].values()) == [b"a", b"b"]
+    assert not (Path(Config.INGEST_UPLOAD_DIR) / job["id"]).exists()
+    with pytest.raises(KeyError):
+        jobs.upload_data(job["payload"]["uploads"][0]["id"])
+
+
+def test_job_yields_to_higher_priority_work_and_resumes(jobs, ingested):
+    bulk = jobs.enqueue("files", {}, priority=PRIORITY_BULK, uploads=[("a.pdf", b"a"), ("b.pdf", b"b")])
+    worker = IngestWorker(queue=jobs, worker_id="w1")
+    claimed = jobs.claim("w1")
+    jobs.enqueue("files", {}, priority=PRIORITY_INTERACTIVE, uploads=[("c.pdf", b"c")])
+
+    assert worker.run_job(claimed) == "queued"
+    assert jobs.get(bulk["id"])["progress"]["files_done"] == 1
+
+    while worker.run_once():
+        pass
+
+    assert jobs.get(bulk["id"])["status"] == "success"
+    assert [sorted(Path(p).name for p in call) for call in ingested] == [["a.pdf", "b.pdf"], ["c.pdf"], ["b.pdf"]]
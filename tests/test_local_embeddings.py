@@ -0,0 +1,67 @@
+"""
+Tests for the embedding backend registry and the local hashing encoder.
+"""
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.config import Config
+from app.services import embeddings
+from app.services.local_embeddings import HashingEmbeddings
+
+
+@pytest.fixture
+def fresh_backend(monkeypatch):
+    monkeypatch.setattr(embeddings, "_embeddings", None)
+    monkeypatch.setattr(Config, "EMBEDDING_DIMENSION", 128)
+
+
+def test_hashing_vectors_are_deterministic_unit_float32(fresh_backend):
+    model = HashingEmbeddings(128)
+
+    documents = model.embed_documents_array(["rural roads", "income tax", "rural roads"])
+
+    assert documents.dtype == np.float32 and documents.shape == (3, 128)
+    np.testing.assert_allclose(np.linalg.norm(documents, axis=1), 1.0, rtol=1e-5)
+    np.testing.assert_array_equal(documents[0], documents[2])
+    np.testing.assert_array_equal(model.embed_query_array("rural roads"), documents[0])
+
+
+def test_hashing_similarity_follows_shared_words(fresh_backend):
+    model = HashingEmbeddings(128)
+    query = model.embed_query_array("funds for rural roads")
+    related, unrelated = model.embed_documents_array(["new rural roads get funds", "defence spending rises"])
+
+    assert query @ related > query @ unrelated
+
+
+def test_async_methods_match_sync(fresh_backend):
+    model = HashingEmbeddings(128)
+
+    vectors = asyncio.run(model.aembed_documents(["a b c"]))
+
+    assert vectors == model.embed_documents(["a b c"])
+
+
+def test_backend_is_selected_from_config(fresh_backend, monkeypatch):
+    monkeypatch.setattr(Config, "EMBEDDING_BACKEND", "hashing")
+
+    backend = embeddings.get_embeddings()
+
+    assert isinstance(backend, HashingEmbeddings)
+    assert embeddings.get_embeddings() is backend
+
+
+def test_registered_backends_are_selectable(fresh_backend, monkeypatch):
+    monkeypatch.setitem(embeddings._BACKENDS, "test", lambda: HashingEmbeddings(128))
+    monkeypatch.setattr(Config, "EMBEDDING_BACKEND", "test")
+
+    assert isinstance(embeddings.get_embeddings(), HashingEmbeddings)
+
+
+def test_unknown_backend_is_rejected(fresh_backend, monkeypatch):
+    monkeypatch.setattr(Config, "EMBEDDING_BACKEND", "nope")
+
+    with pytest.raises(ValueError, match="Available: .*hashing"):
+        embeddings.get_embeddings()
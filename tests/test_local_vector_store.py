@@ -0,0 +1,154 @@
+"""
+Tests for the in-process NumPy vector store.
+"""
+import numpy as np
+import pytest
+
+from app.services.local_vector_store import LocalIndex, matches_filter
+
+DIMENSION = 16
+
+
+def random_vectors(count: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).standard_normal((count, DIMENSION)).astype(np.float32)
+
+
+def records(vectors: np.ndarray, prefix: str = "v", **metadata):
+    return [
+        {"id": f"{prefix}{i}", "values": vector.tolist(), "metadata": {"n": i, **metadata}}
+        for i, vector in enumerate(vectors)
+    ]
+
+
+@pytest.fixture
+def index(tmp_path):
+    return LocalIndex(str(tmp_path / "store"), DIMENSION, flush_seconds=60)
+
+
+def ids(result):
+    return [match["id"] for match in result["matches"]]
+
+
+def test_filter_operators():
+    metadata = {"source": "a.pdf", "page": 3, "tags": "x"}
+
+    assert matches_filter(metadata, None)
+    assert matches_filter(metadata, {"source": "a.pdf"})
+    assert matches_filter(metadata, {"page": {"$gte": 3, "$lt": 4}})
+    assert matches_filter(metadata, {"source": {"$in": ["a.pdf", "b.pdf"]}})
+    assert matches_filter(metadata, {"$or": [{"page": 1}, {"tags": {"$ne": "y"}}]})
+    assert matches_filter(metadata, {"missing": {"$exists": False}})
+    assert not matches_filter(metadata, {"$and": [{"page": 3}, {"source": {"$nin": ["a.pdf"]}}]})
+    assert not matches_filter(metadata, {"missing": {"$gt": 1}})
+    with pytest.raises(ValueError):
+        matches_filter(metadata, {"page": {"$regex": "3"}})
+
+
+def test_query_returns_exact_cosine_ranking(index):
+    vectors = random_vectors(200)
+    index.upsert(records(vectors))
+    query = vectors[7] + 0.01
+
+    result = index.query(vector=query.tolist(), top_k=5, include_metadata=True)
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5]
+    assert ids(result) == [f"v{i}" for i in expected]
+    assert result["matches"][0]["metadata"] == {"n": 7}
+    assert result["matches"][0]["score"] == pytest.approx(1.0, abs=1e-3)
+
+
+def test_query_applies_metadata_filter(index):
+    vectors = random_vectors(50)
+    index.upsert(records(vectors[:25], prefix="a", source="a.pdf"))
+    index.upsert(records(vectors[25:], prefix="b", source="b.pdf"))
+
+    result = index.query(vector=vectors[0].tolist(), top_k=10, filter={"source": "b.pdf"}, include_metadata=True)
+
+    assert len(result["matches"]) == 10
+    assert {m["metadata"]["source"] for m in result["matches"]} == {"b.pdf"}
+
+
+def test_query_by_id_uses_the_stored_vector(index):
+    vectors = random_vectors(20)
+    index.upsert(records(vectors), namespace="budget")
+
+    result = index.query(id="v3", top_k=3, namespace="budget")
+
+    assert ids(result)[0] == "v3"
+    assert index.query(id="missing", top_k=3, namespace="budget") == {"matches": [], "namespace": "budget"}
+    assert index.query(id="v3", top_k=3) == {"matches": [], "namespace": ""}
+
+
+def test_delete_keeps_remaining_rows_consistent(index):
+    vectors = random_vectors(10)
+    index.upsert(records(vectors))
+
+    index.delete(ids=["v0", "v5", "missing"])
+    index.delete(filter={"n": {"$gte": 8}})
+
+    remaining = sorted(sum(index.list(), []), key=lambda i: int(i[1:]))
+    assert remaining == ["v1", "v2", "v3", "v4", "v6", "v7"]
+    for vector_id in remaining:
+        top = index.query(vector=vectors[int(vector_id[1:])].tolist(), top_k=1, include_metadata=True)
+        assert ids(top) == [vector_id]
+        assert top["matches"][0]["metadata"]["n"] == int(vector_id[1:])
+
+
+def test_upsert_overwrites_and_namespaces_are_separate(index):
+    vectors = random_vectors(3)
+    index.upsert(records(vectors))
+    index.upsert([{"id": "v0", "values": vectors[2].tolist(), "metadata": {"n": 99}}])
+    index.upsert(records(vectors[:1]), namespace="tenant")
+
+    fetched = index.fetch(["v0"]).vectors["v0"]
+    stats = index.describe_index_stats()
+
+    assert fetched.metadata == {"n": 99}
+    assert stats.namespaces == {"__default__": {"vector_count": 3}, "tenant": {"vector_count": 1}}
+    assert stats.total_vector_count == 4
+
+
+def test_dimension_mismatch_is_rejected(index):
+    with pytest.raises(ValueError):
+        index.upsert([{"id": "x", "values": [1.0, 2.0]}])
+
+
+def test_flushed_namespaces_are_loaded_by_a_new_instance(index, tmp_path):
+    vectors = random_vectors(5)
+    index.upsert(records(vectors), namespace="tenant")
+    index.flush()
+
+    reopened = LocalIndex(str(tmp_path / "store"), DIMENSION)
+
+    assert sorted(sum(reopened.list(namespace="tenant"), [])) == ["v0", "v1", "v2", "v3", "v4"]
+    assert reopened.fetch(["v3"], namespace="tenant").vectors["v3"].metadata == {"n": 3}
+
+
+def test_ivf_recall_is_close_to_exact_search(tmp_path):
+    rng = np.random.default_rng(1)
+    centers = rng.standard_normal((32, DIMENSION)).astype(np.float32) * 4
+    vectors = (centers[rng.integers(0, 32, 4000)] + rng.standard_normal((4000, DIMENSION))).astype(np.float32)
+    flat = LocalIndex(str(tmp_path / "flat"), DIMENSION, flush_seconds=60)
+    ivf = LocalIndex(str(tmp_path / "ivf"), DIMENSION, mode="ivf", ivf_probe=8, ivf_min_vectors=1000, flush_seconds=60)
+    flat.upsert(records(vectors))
+    ivf.upsert(records(vectors))
+
+    recalls = []
+    for query in vectors[rng.choice(len(vectors), 50, replace=False)] + 0.1:
+        exact = set(ids(flat.query(vector=query.tolist(), top_k=10)))
+        approximate = set(ids(ivf.query(vector=query.tolist(), top_k=10)))
+        recalls.append(len(exact & approximate) / 10)
+
+    assert ivf._namespace(None).centroids is not None
+    assert np.mean(recalls) >= 0.9
+
+
+def test_ivf_falls_back_to_exact_search_for_selective_filters(tmp_path):
+    vectors = random_vectors(2000, seed=2)
+    ivf = LocalIndex(str(tmp_path / "ivf"), DIMENSION, mode="ivf", ivf_lists=40, ivf_probe=1, ivf_min_vectors=100, flush_seconds=60)
+    ivf.upsert(records(vectors))
+
+    result = ivf.query(vector=vectors[0].tolist(), top_k=3, filter={"n": {"$in": [1500, 1600, 1700]}})
+
+    assert sorted(ids(result)) == ["v1500", "v1600", "v1700"]
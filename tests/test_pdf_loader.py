@@ -0,0 +1,53 @@
+"""
+Tests for streaming PDF pages.
+"""
+import pymupdf
+import pytest
+
+from app.services import pdf_loader
+from app.services.pdf_loader import iter_pdf_pages, load_pdf
+
+
+def write_pdf(path, pages):
+    pdf = pymupdf.open()
+    for text in pages:
+        page = pdf.new_page()
+        if text:
+            page.insert_text((72, 72), text)
+    pdf.set_metadata({"title": "Budget"})
+    pdf.save(str(path))
+    pdf.close()
+    return str(path)
+
+
+def test_empty_and_whitespace_pages_are_skipped(tmp_path):
+    pdf_path = write_pdf(tmp_path / "budget.pdf", ["Rural roads", "", "   ", "Income tax"])
+
+    pages = list(iter_pdf_pages(pdf_path))
+
+    assert [page.page_content for page in pages] == ["Rural roads", "Income tax"]
+    assert [page.metadata["page"] for page in pages] == [0, 3]
+    assert all(page.metadata["total_pages"] == 4 and page.metadata["title"] == "Budget" for page in pages)
+    assert [page.page_content for page in load_pdf(pdf_path)] == ["Rural roads", "Income tax"]
+
+
+def test_pages_are_read_on_demand(tmp_path, monkeypatch):
+    pdf_path = write_pdf(tmp_path / "budget.pdf", ["Rural roads", "Income tax", "Defence"])
+    opened = []
+    open_pdf = pymupdf.open
+    monkeypatch.setattr(pdf_loader.pymupdf, "open", lambda path: opened.append(path) or open_pdf(path))
+
+    pages = iter_pdf_pages(pdf_path)
+    assert opened == []
+
+    assert next(pages).page_content == "Rural roads"
+    assert opened == [pdf_path]
+    pages.close()
+
+
+def test_unreadable_pdf_raises(tmp_path):
+    path = tmp_path / "broken.pdf"
+    path.write_text("not a pdf")
+
+    with pytest.raises(Exception):
+        next(iter_pdf_pages(str(path)))
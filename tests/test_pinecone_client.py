@@ -0,0 +1,185 @@
+"""
+Tests for payload-sized, parallel Pinecone upserts and for listing and
+deleting vectors by ID.
+"""
+import json
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.config import Config
+from app.services import docstore, pinecone_client
+from app.services.pinecone_client import (
+    delete_by_doc_id,
+    delete_ids,
+    estimate_record_bytes,
+    iter_upsert_batches,
+    list_ids_by_prefix,
+    upsert_records
+)
+
+
+def make_record(i: int, dimension: int = 8, text: str = "chunk") -> dict:
+    values = np.random.default_rng(i).standard_normal(dimension).astype(np.float32)
+    return {"id": f"doc-{i:04d}", "values": values.tolist(), "metadata": {"text": text}}
+
+
+class FakeIndex:
+    """Index double recording upsert and delete batches and the peak number in flight."""
+
+    def __init__(self, fail_ids=(), ids=(), page_size=100, can_list=True):
+        self.batches = []
+        self.fail_ids = set(fail_ids)
+        self.ids = list(ids)
+        self.page_size = page_size
+        self.can_list = can_list
+        self.deletes = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors, async_req=False, namespace=None):
+        with self._lock:
+            self.batches.append(([v["id"] for v in vectors], namespace))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        index = self
+
+        class Request:
+            def get(self):
+                with index._lock:
+                    index.in_flight -= 1
+                if index.fail_ids & {v["id"] for v in vectors}:
+                    raise RuntimeError("upsert rejected")
+                return SimpleNamespace(upserted_count=len(vectors))
+
+        return Request()
+
+    def list(self, prefix=None, namespace=None):
+        if not self.can_list:
+            raise RuntimeError("listing is not supported by pod-based indexes")
+        matching = [vector_id for vector_id in self.ids if vector_id.startswith(prefix)]
+        for start in range(0, len(matching), self.page_size):
+            yield matching[start:start + self.page_size]
+
+    def delete(self, ids=None, filter=None, async_req=False, namespace=None):
+        self.deletes.append((ids, filter, namespace))
+        self.ids = [vector_id for vector_id in self.ids if vector_id not in set(ids or ())]
+        return SimpleNamespace(get=lambda: {}) if async_req else {}
+
+
+def test_estimate_covers_the_json_request_body():
+    record = make_record(1, dimension=384, text="é" * 50)
+    encoded = len(json.dumps(record).encode("utf-8"))
+
+    assert estimate_record_bytes(record) >= encoded
+    assert estimate_record_bytes(record, grpc=True) < estimate_record_bytes(record)
+
+
+def test_batches_stay_under_the_byte_budget():
+    records = [make_record(i, dimension=64) for i in range(50)]
+    budget = estimate_record_bytes(records[0]) * 7 + 10
+
+    batches = list(iter_upsert_batches(records, max_bytes=budget))
+
+    assert [len(b) for b in batches] == [7] * 7 + [1]
+    assert all(sum(estimate_record_bytes(r) for r in b) <= budget for b in batches)
+    assert [r for b in batches for r in b] == records
+
+
+def test_batches_respect_record_limit():
+    batches = list(iter_upsert_batches([make_record(i) for i in range(25)], max_records=10))
+
+    assert [len(b) for b in batches] == [10, 10, 5]
+
+
+def test_oversized_record_gets_its_own_batch():
+    records = [make_record(0), make_record(1, text="x" * 5000), make_record(2)]
+
+    batches = list(iter_upsert_batches(records, max_bytes=1000))
+
+    assert [[r["id"] for r in b] for b in batches] == [["doc-0000"], ["doc-0001"], ["doc-0002"]]
+
+
+def test_upsert_records_sends_batches_with_bounded_concurrency(monkeypatch):
+    monkeypatch.setattr(Config, "PINECONE_USE_GRPC", "0")
+    monkeypatch.setattr(Config, "PINECONE_UPSERT_MAX_RECORDS", 3)
+    monkeypatch.setattr(Config, "PINECONE_UPSERT_CONCURRENCY", 2)
+    index = FakeIndex()
+
+    count = upsert_records([make_record(i) for i in range(10)], index=index, namespace="tenant")
+
+    assert count == 10
+    assert [len(ids) for ids, _ in index.batches] == [3, 3, 3, 1]
+    assert {namespace for _, namespace in index.batches} == {"tenant"}
+    assert index.max_in_flight == 2
+
+
+def test_upsert_records_raises_after_all_requests_finish(monkeypatch):
+    monkeypatch.setattr(Config, "PINECONE_USE_GRPC", "0")
+    monkeypatch.setattr(Config, "PINECONE_UPSERT_MAX_RECORDS", 2)
+    index = FakeIndex(fail_ids={"doc-0000"})
+
+    with pytest.raises(RuntimeError, match="rejected"):
+        upsert_records([make_record(i) for i in range(6)], index=index)
+
+    assert len(index.batches) == 3
+    assert index.in_flight == 0
+
+
+@pytest.fixture
+def deletes(monkeypatch):
+    """Route deletes to a FakeIndex, without retry queue or docstore."""
+    monkeypatch.setattr(Config, "UPSERT_RETRY_ENABLED", False)
+    monkeypatch.setattr(Config, "DOCSTORE_BACKEND", "none")
+    monkeypatch.setattr(pinecone_client, "_retry_queue", None)
+    monkeypatch.setattr(pinecone_client, "_stats_cache", None)
+    monkeypatch.setattr(docstore, "_docstore", None)
+
+    def use(index):
+        monkeypatch.setattr(pinecone_client, "_index", index)
+        return index
+
+    return use
+
+
+def doc_ids(doc_id: str, count: int):
+    return [f"{doc_id}_{i // 10 + 1}_{i % 10}" for i in range(count)]
+
+
+def test_list_ids_by_prefix_reads_every_page():
+    index = FakeIndex(ids=doc_ids("a", 250) + doc_ids("b", 5), page_size=100)
+
+    assert list_ids_by_prefix("a_", index=index) == doc_ids("a", 250)
+    assert list_ids_by_prefix("c_", index=index) == []
+
+
+def test_delete_ids_sends_batches_of_1000(deletes):
+    index = deletes(FakeIndex(ids=doc_ids("a", 2500)))
+
+    assert delete_ids(doc_ids("a", 2500), namespace="tenant") == 2500
+
+    assert [len(ids) for ids, _, _ in index.deletes] == [1000, 1000, 500]
+    assert {namespace for _, _, namespace in index.deletes} == {"tenant"}
+    assert index.ids == []
+    assert delete_ids([]) == 0
+
+
+def test_delete_by_doc_id_deletes_listed_ids(deletes):
+    index = deletes(FakeIndex(ids=doc_ids("a", 1200) + doc_ids("ab", 3), page_size=100))
+
+    assert delete_by_doc_id("a") == 1200
+
+    assert [len(ids) for ids, _, _ in index.deletes] == [1000, 200]
+    assert index.ids == doc_ids("ab", 3)
+
+
+def test_delete_by_doc_id_falls_back_to_a_filter_delete(deletes):
+    index = deletes(FakeIndex(ids=doc_ids("a", 3), can_list=False))
+
+    # The number of deleted vectors is unknown after a filter delete
+    assert delete_by_doc_id("a", namespace="tenant") == -1
+
+    assert index.deletes == [(None, {"doc_id": {"$eq": "a"}}, "tenant")]
@@ -0,0 +1,39 @@
+"""
+Tests for compact embedding representations.
+"""
+import numpy as np
+import pytest
+
+from app.services.quantization import code_dimension, dequantize, embedding_type_for, to_codes
+
+
+def test_quantization_modes_map_to_cohere_types():
+    assert [embedding_type_for(q) for q in ("none", "int8", "binary")] == ["float", "int8", "ubinary"]
+    with pytest.raises(ValueError):
+        embedding_type_for("fp16")
+
+
+def test_int8_codes_dequantize_to_unit_vectors():
+    codes = to_codes([[3, -4, 0], [0, 0, 0]], "int8")
+
+    vectors = dequantize(codes, "int8")
+
+    assert codes.dtype == np.int8
+    assert vectors.dtype == np.float32
+    np.testing.assert_allclose(vectors, [[0.6, -0.8, 0], [0, 0, 0]])
+
+
+def test_binary_codes_unpack_to_signs():
+    codes = to_codes([[0b10110000]], "ubinary")
+
+    vectors = dequantize(codes, "ubinary")
+
+    assert code_dimension(codes, "ubinary") == 8
+    np.testing.assert_allclose(vectors * np.sqrt(8), [[1, -1, 1, 1, -1, -1, -1, -1]])
+
+
+def test_float_embeddings_pass_through():
+    codes = to_codes([[0.5, 0.25]], "float")
+
+    assert dequantize(codes, "float") is codes
+    assert code_dimension(codes, "float") == 2
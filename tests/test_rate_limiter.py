@@ -0,0 +1,79 @@
+"""
+Tests for the token-bucket rate limiter.
+"""
+import pytest
+
+from app.utils import rate_limiter
+from app.utils.rate_limiter import RateLimiter, TokenBucket
+
+
+@pytest.fixture(autouse=True)
+def fake_time(monkeypatch, clock):
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+def test_bucket_starts_full_and_refills_at_rate(clock):
+    bucket = TokenBucket(rate_per_minute=60, capacity=3)
+
+    assert [bucket.try_acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.try_acquire() == pytest.approx(1.0)
+
+    clock.advance(1.0)
+    assert bucket.try_acquire() == 0.0
+
+
+def test_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket(rate_per_minute=60, capacity=2)
+    bucket.try_acquire(2)
+
+    clock.advance(60)
+    assert bucket.try_acquire(2) == 0.0
+    assert bucket.try_acquire() == pytest.approx(1.0)
+
+
+def test_request_larger_than_capacity_is_clamped():
+    bucket = TokenBucket(rate_per_minute=60, capacity=5)
+
+    assert bucket.try_acquire(50) == 0.0
+    assert bucket.try_acquire(50) == pytest.approx(5.0)
+
+
+def test_zero_rate_disables_limiting():
+    bucket = TokenBucket(rate_per_minute=0)
+
+    assert all(bucket.try_acquire(1000) == 0.0 for _ in range(10))
+
+
+def test_acquire_sleeps_until_tokens_are_available(clock):
+    bucket = TokenBucket(rate_per_minute=30, capacity=1)
+    bucket.acquire()
+    bucket.acquire()
+
+    assert clock.slept == [pytest.approx(2.0)]
+
+
+def test_drain_empties_and_pauses_refill(clock):
+    bucket = TokenBucket(rate_per_minute=60, capacity=10)
+    bucket.drain(5)
+
+    clock.advance(5)
+    assert bucket.try_acquire() == pytest.approx(1.0)
+
+    clock.advance(1)
+    assert bucket.try_acquire() == 0.0
+
+
+def test_rate_limiter_backoff_pauses_both_buckets(clock):
+    limiter = RateLimiter(requests_per_minute=60, items_per_minute=600)
+    assert limiter.backoff(3)
+
+    assert limiter.requests.try_acquire() == pytest.approx(4.0)
+    assert limiter.items.try_acquire() == pytest.approx(3.1)
+
+
+def test_backoff_without_limits_pauses_nobody():
+    limiter = RateLimiter(requests_per_minute=0, items_per_minute=0)
+
+    assert not limiter.backoff(3)
+    assert limiter.requests.try_acquire() == 0.0
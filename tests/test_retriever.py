@@ -0,0 +1,48 @@
+"""
+Tests for request filter parsing in the retriever.
+"""
+import pytest
+
+from app.rag.retriever import parse_filters
+
+
+def test_empty_filters_search_everything():
+    assert parse_filters(None) == (None, None)
+    assert parse_filters({}) == (None, None)
+
+
+def test_documents_pages_and_namespaces():
+    metadata_filter, namespaces = parse_filters({
+        "doc_id": "abc",
+        "doc_name": ["a.pdf", "b.pdf"],
+        "page_from": 2,
+        "page_to": 5,
+        "namespace": ["Budget Speech", "bh1"]
+    })
+
+    assert metadata_filter == {
+        "doc_id": {"$in": ["abc"]},
+        "doc_name": {"$in": ["a.pdf", "b.pdf"]},
+        "page_number": {"$gte": 2, "$lte": 5}
+    }
+    assert namespaces == ["budget-speech", "bh1"]
+
+
+def test_namespace_only_has_no_metadata_filter():
+    assert parse_filters({"namespace": "bh1"}) == (None, ["bh1"])
+
+
+@pytest.mark.parametrize("filters", [
+    ["doc_id"],
+    {"unknown": 1},
+    {"doc_id": ""},
+    {"doc_name": []},
+    {"doc_name": ["a.pdf", 3]},
+    {"page_from": 0},
+    {"page_to": "3"},
+    {"page_from": True},
+    {"namespace": None, "page_to": -1}
+])
+def test_malformed_filters_are_rejected(filters):
+    with pytest.raises(ValueError):
+        parse_filters(filters)
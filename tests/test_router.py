@@ -0,0 +1,36 @@
+"""
+Tests for namespace naming and query routing.
+"""
+from app.config import Config
+from app.rag.router import namespace_for_document, route_query, to_namespace
+
+NAMESPACES = [None, "bh1", "budget-speech", "budget-speech-2024", "annual-report"]
+
+
+def test_to_namespace_normalizes_names():
+    assert to_namespace("Budget Speech.pdf") == "budget-speech"
+    assert to_namespace("  Q3 / Results  ") == "q3-results"
+    assert to_namespace("report.v2.PDF") == "report-v2"
+
+
+def test_namespace_for_document_prefers_explicit_namespace(monkeypatch):
+    monkeypatch.setattr(Config, "PINECONE_NAMESPACE_MODE", "document")
+    assert namespace_for_document("BH1.pdf") == "bh1"
+    assert namespace_for_document("BH1.pdf", "Finance Docs") == "finance-docs"
+
+    monkeypatch.setattr(Config, "PINECONE_NAMESPACE_MODE", "none")
+    assert namespace_for_document("BH1.pdf") is None
+
+
+def test_route_query_matches_whole_words():
+    assert route_query("What does bh1.pdf say about tax?", NAMESPACES) == ["bh1"]
+    assert route_query("Summarize the Budget Speech", NAMESPACES) == ["budget-speech"]
+    assert route_query("compare the budget speech 2024 with the annual report", NAMESPACES) == [
+        "budget-speech", "budget-speech-2024", "annual-report"
+    ]
+
+
+def test_route_query_ignores_partial_words_and_returns_none_without_a_match():
+    assert route_query("what is bh12 about?", NAMESPACES) is None
+    assert route_query("budgets and speeches", NAMESPACES) is None
+    assert route_query("", NAMESPACES) is None
@@ -0,0 +1,82 @@
+"""
+Tests for the durable upsert retry queue.
+"""
+import numpy as np
+import pytest
+
+from app.services import upsert_retry_queue
+from app.services.upsert_retry_queue import UpsertRetryQueue
+
+
+def make_records(prefix: str, count: int = 3):
+    return [
+        {"id": f"{prefix}-{i}", "values": [float(i), float(i) + 0.5], "metadata": {"n": i}}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def retry_queue(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(upsert_retry_queue, "time", clock)
+    monkeypatch.setattr(upsert_retry_queue.random, "uniform", lambda a, b: b)
+    return UpsertRetryQueue(str(tmp_path / "retry.sqlite"), backoff_base=10, max_attempts=2)
+
+
+def test_replay_restores_vectors_and_removes_the_entry(retry_queue, clock):
+    retry_queue.enqueue(make_records("a"), error="timeout", doc_id="a", namespace="tenant")
+    sent = []
+
+    assert retry_queue.replay(lambda records, ns: sent.append((records, ns)))["retried"] == 0
+
+    clock.advance(10)
+    result = retry_queue.replay(lambda records, ns: sent.append((records, ns)))
+
+    assert result == {"retried": 1, "succeeded": 1, "failed": 0, "vectors": 3}
+    records, namespace = sent[0]
+    assert namespace == "tenant"
+    assert [r["id"] for r in records] == ["a-0", "a-1", "a-2"]
+    np.testing.assert_array_equal(records[2]["values"], np.array([2.0, 2.5], dtype=np.float32))
+    assert records[1]["metadata"] == {"n": 1}
+    assert retry_queue.pending() == 0
+
+
+def test_failed_replays_back_off_until_exhausted(retry_queue, clock):
+    retry_queue.enqueue(make_records("a"), doc_id="a")
+
+    def fail(records, namespace):
+        raise RuntimeError("still down")
+
+    clock.advance(10)
+    assert retry_queue.replay(fail)["failed"] == 1
+    clock.advance(10)
+    assert retry_queue.replay(fail)["retried"] == 0
+    clock.advance(10)
+    assert retry_queue.replay(fail)["failed"] == 1
+
+    clock.advance(3600)
+    assert retry_queue.replay(fail)["retried"] == 0
+    assert retry_queue.stats()["exhausted_batches"] == 1
+    assert retry_queue.replay(fail, due_only=False)["retried"] == 1
+
+
+def test_discard_ids_drops_deleted_vectors_from_queued_batches(retry_queue, clock):
+    retry_queue.enqueue(make_records("a"), doc_id="a")
+    retry_queue.enqueue(make_records("b", count=1), doc_id="b")
+    retry_queue.enqueue(make_records("a"), doc_id="a", namespace="tenant")
+
+    assert retry_queue.discard_ids(["a-1", "b-0", "missing"]) == 2
+
+    sent = []
+    clock.advance(10)
+    retry_queue.replay(lambda records, ns: sent.append((ns, [r["id"] for r in records], records)))
+
+    assert [(ns, ids) for ns, ids, _ in sent] == [(None, ["a-0", "a-2"]), ("tenant", ["a-0", "a-1", "a-2"])]
+    np.testing.assert_array_equal(sent[0][2][1]["values"], [2.0, 2.5])
+
+
+def test_discard_drops_a_documents_batches(retry_queue):
+    retry_queue.enqueue(make_records("a"), doc_id="a")
+    retry_queue.enqueue(make_records("b"), doc_id="b")
+
+    assert retry_queue.discard("a") == 1
+    assert retry_queue.stats()["queued_vectors"] == 3
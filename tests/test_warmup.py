@@ -0,0 +1,89 @@
+"""
+Tests for worker warm-up and the readiness of the health endpoint.
+"""
+import threading
+
+import pytest
+
+from app import warmup
+from app.app import app
+from app.config import Config
+
+
+@pytest.fixture
+def steps(monkeypatch):
+    """Fresh warm-up state of this process, with the given steps."""
+    monkeypatch.setattr(Config, "WARMUP_ENABLED", True)
+    monkeypatch.setattr(warmup, "_ready", threading.Event())
+    monkeypatch.setattr(warmup, "_status", {"state": "pending", "steps": {}})
+    monkeypatch.setattr(warmup, "_thread", None)
+    monkeypatch.setattr(warmup, "_pid", None)
+
+    def use(*named_steps):
+        monkeypatch.setattr(warmup, "WARMUP_STEPS", list(named_steps))
+
+    return use
+
+
+def health():
+    response = app.test_client().get("/api/health")
+    return response.status_code, response.get_json()
+
+
+def test_health_is_unavailable_until_warmup_completes(steps):
+    started, release = threading.Event(), threading.Event()
+    steps(("embeddings", lambda: started.set() or release.wait(5)), ("database", lambda: None))
+
+    assert health()[0] == 503
+
+    thread = warmup.start_warmup()
+    assert started.wait(5)
+    status, body = health()
+    assert status == 503
+    assert body["status"] == "starting" and body["warmup"]["state"] == "warming"
+
+    release.set()
+    thread.join(5)
+
+    status, body = health()
+    assert status == 200
+    assert body["ready"] and body["warmup"]["state"] == "ready"
+    assert set(body["warmup"]["steps"]) == {"embeddings", "database"}
+
+
+def test_failing_step_leaves_the_worker_ready_but_degraded(steps):
+    def fail():
+        raise ConnectionError("pinecone unreachable")
+
+    ran = []
+    steps(("pinecone", fail), ("database", lambda: ran.append("database")))
+
+    warmup.start_warmup().join(5)
+
+    status, body = health()
+    assert status == 200
+    assert body["warmup"]["state"] == "degraded"
+    assert body["warmup"]["steps"]["pinecone"]["error"] == "pinecone unreachable"
+    assert ran == ["database"]
+
+
+def test_step_escaping_the_error_handler_still_finishes_warmup(steps):
+    def exit_():
+        raise SystemExit(1)
+
+    steps(("llm", exit_), ("database", lambda: None))
+
+    with pytest.raises(SystemExit):
+        warmup.warm_up()
+
+    assert warmup.wait_until_ready(0)
+    assert warmup.get_warmup_status()["state"] == "degraded"
+    assert health()[0] == 200
+
+
+def test_disabled_warmup_is_always_ready(steps, monkeypatch):
+    monkeypatch.setattr(Config, "WARMUP_ENABLED", False)
+
+    status, body = health()
+    assert status == 200
+    assert body["warmup"]["state"] == "disabled"